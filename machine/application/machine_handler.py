@@ -19,6 +19,18 @@ class MachineHandler:
         self.driver_manager = WebDriverManager()
         self.logger = logging.getLogger(__name__)
 
+    def _holds_lease(self, task_uuid: str) -> bool:
+        """Renew the lease of a task about to be processed, False if it is lost"""
+        try:
+            return self.api_client.renew_lease(task_uuid)
+        except Exception:
+            # Unrenewed, the lease may expire and the task go to another machine
+            self.logger.error(
+                f"Skipping task {task_uuid}: its lease could not be renewed",
+                exc_info=True,
+            )
+            return False
+
     def process_single_invoice_tasks(self, tasks_by_company) -> list[TaskStatusUpdate]:
         """Process single invoice tasks for each company"""
         all_results = []
@@ -49,7 +61,7 @@ class MachineHandler:
 
                         # Execute tasks with worker instance
                         results = task_executor.execute_single_invoice_tasks(
-                            worker, invoice_tasks
+                            worker, invoice_tasks, self._holds_lease
                         )
                         all_results.extend(results)
 
@@ -102,12 +114,17 @@ class MachineHandler:
                     # Login worker
                     login_service.login_worker(worker)
 
-                    # Execute task with worker instance
-
-                    result = task_executor.execute_multiple_invoice_tasks(
-                        worker, invoice_tasks
-                    )
-                    all_results.append(result)
+                    # Execute task with worker instance, if its lease still holds
+                    invoice_tasks = [
+                        task
+                        for task in invoice_tasks
+                        if self._holds_lease(task["task_uuid"])
+                    ]
+                    if invoice_tasks:
+                        result = task_executor.execute_multiple_invoice_tasks(
+                            worker, invoice_tasks
+                        )
+                        all_results.append(result)
 
         except Exception as e:
             self.logger.error(
@@ -126,7 +143,8 @@ class MachineHandler:
         while True:
             try:
                 self.logger.info("Checking for new tasks...")
-                tasks_response = self.api_client.get_tasks()
+                # Long-polls: returns as soon as tasks appear or LONG_POLL_WAIT passes
+                tasks_response = self.api_client.claim_tasks()
 
                 if tasks_response.SingleInvoiceTask:
                     results = self.process_single_invoice_tasks(
@@ -140,6 +158,10 @@ class MachineHandler:
                     )
                     self.api_client.update_task_status(results)
 
+                # The server already waited for tasks, poll again right away
+                if Config.LONG_POLL_WAIT > 0:
+                    continue
+
             except Exception as e:
                 self.logger.error(f"Error in main loop: {str(e)}", exc_info=True)
 
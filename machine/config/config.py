@@ -40,6 +40,18 @@ class Config:
         cls._load_config()
         return int(cls._CONFIG_DATA["api"].get("POLL_INTERVAL", 60))
 
+    @classmethod
+    @property
+    def LONG_POLL_WAIT(cls):
+        cls._load_config()
+        return int(cls._CONFIG_DATA["api"].get("LONG_POLL_WAIT", 30))
+
+    @classmethod
+    @property
+    def TASK_BATCH_SIZE(cls):
+        cls._load_config()
+        return int(cls._CONFIG_DATA["api"].get("TASK_BATCH_SIZE", 10))
+
     @classmethod
     @property
     def TASK_TIMEOUT(cls):
@@ -51,6 +63,14 @@ class Config:
     def get_tasks_endpoint():
         return f"{Config.API_BASE_URL}/machine/tasks"
 
+    @staticmethod
+    def claim_tasks_endpoint():
+        return f"{Config.API_BASE_URL}/machine/tasks/claim"
+
+    @staticmethod
+    def renew_task_lease_endpoint():
+        return f"{Config.API_BASE_URL}/machine/tasks/lease"
+
     @staticmethod
     def update_task_status_endpoint():
         return f"{Config.API_BASE_URL}/tasks/status"
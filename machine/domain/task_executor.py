@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Callable, List, Optional
 from machine.domain.models import TaskStatus
 from machine.domain.exceptions import USBNotFoundException
 from machine.domain.schemas import (
@@ -19,9 +19,17 @@ class TaskExecutor:
         self.logger = logging.getLogger(__name__)
 
     def execute_single_invoice_tasks(
-        self, worker: Worker, tasks: List[SingleInvoiceTask]
+        self,
+        worker: Worker,
+        tasks: List[SingleInvoiceTask],
+        holds_lease: Optional[Callable[[str], bool]] = None,
     ) -> List[TaskStatusUpdate]:
-        """Execute single invoice tasks for a specific company"""
+        """
+        Execute single invoice tasks for a specific company
+
+        holds_lease is asked before each task whether the machine still owns
+        it; tasks it no longer owns are skipped, without a result.
+        """
         self.logger.info(
             f"Processing {len(tasks)} tasks for company {worker.my_company_idno}"
         )
@@ -35,6 +43,9 @@ class TaskExecutor:
 
             # Process each task
             for task in tasks:
+                if holds_lease is not None and not holds_lease(task["task_uuid"]):
+                    self.logger.warning(f"Skipping task no longer leased: {task}")
+                    continue
                 try:
                     self.logger.info(f"Processing task: {task}")
                     buyer_service.sign_invoice(task["seria"], task["number"])
@@ -14,11 +14,19 @@ class APIClient:
             "Content-Type": "application/json",
         }
         self.logger = logging.getLogger(__name__)
+        # Attempt of every claimed task, sent back with its status: the server
+        # ignores results of attempts whose lease expired and were claimed again
+        self.attempts = {}
 
     def get_tasks(self) -> MachineTasksResponse:
         """
         Fetch tasks from server.
 
+        The request long-polls: the server holds it open for up to
+        LONG_POLL_WAIT seconds until tasks appear, so new tasks are received
+        as soon as they are created. At most TASK_BATCH_SIZE tasks are
+        returned, the oldest first.
+
         Returns:
             MachineTasksResponse: Object containing:
                 - SingleInvoiceTask: Dict[str, List[SingleInvoiceTask]] - Tasks grouped by IDNO
@@ -51,7 +59,13 @@ class APIClient:
         self.logger.info("Fetching tasks from server...")
         try:
             response = requests.get(
-                Config.get_tasks_endpoint(), headers=self.headers, timeout=30
+                Config.get_tasks_endpoint(),
+                params={
+                    "limit": Config.TASK_BATCH_SIZE,
+                    "wait": Config.LONG_POLL_WAIT,
+                },
+                headers=self.headers,
+                timeout=Config.LONG_POLL_WAIT + 30,
             )
             response.raise_for_status()
 
@@ -64,6 +78,97 @@ class APIClient:
             self.logger.error(f"Failed to fetch tasks: {str(e)}")
             raise
 
+    def claim_tasks(self) -> MachineTasksResponse:
+        """
+        Claim a batch of waiting tasks from server, long-polling like get_tasks.
+
+        Claimed tasks are moved to PROCESSING on the server and are not handed
+        to other machines polling with the same token, so several machines can
+        serve one company. Their results must be reported through
+        update_task_status before the lease expires, so at most
+        TASK_BATCH_SIZE tasks are claimed: as many as one cycle can process.
+        The lease is renewed through renew_lease before each task.
+
+        Returns:
+            MachineTasksResponse: Claimed tasks, in the same structure as get_tasks
+
+        Raises:
+            requests.exceptions.RequestException: If the API request fails
+        """
+        self.logger.info("Claiming tasks from server...")
+        try:
+            response = requests.post(
+                Config.claim_tasks_endpoint(),
+                params={
+                    "limit": Config.TASK_BATCH_SIZE,
+                    "wait": Config.LONG_POLL_WAIT,
+                },
+                headers=self.headers,
+                timeout=Config.LONG_POLL_WAIT + 30,
+            )
+            response.raise_for_status()
+
+            tasks = response.json()
+            self.logger.debug(f"Successfully claimed tasks: {tasks}")
+            self._remember_attempts(tasks)
+
+            return MachineTasksResponse.model_validate(tasks)
+
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to claim tasks: {str(e)}")
+            raise
+
+    def renew_lease(self, task_uuid: str) -> bool:
+        """
+        Renew the lease of a claimed task before working on it.
+
+        Tasks not claimed through claim_tasks have no lease and are kept.
+
+        Args:
+            task_uuid: UUID of the claimed task
+
+        Returns:
+            bool: Whether the machine still holds the task. If not, its lease
+                expired and it was requeued or claimed by another machine: it
+                must not be processed
+
+        Raises:
+            requests.exceptions.RequestException: If the API request fails
+        """
+        attempt = self.attempts.get(task_uuid, 0)
+        if not attempt:
+            return True
+
+        try:
+            response = requests.post(
+                Config.renew_task_lease_endpoint(),
+                json=[{"task_uuid": task_uuid, "attempt": attempt}],
+                headers=self.headers,
+                timeout=30,
+            )
+            response.raise_for_status()
+
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to renew task lease: {str(e)}")
+            raise
+
+        if task_uuid in response.json()["renewed"]:
+            return True
+        self.attempts.pop(task_uuid, None)
+        self.logger.warning(f"Lease of task {task_uuid} was lost")
+        return False
+
+    def _remember_attempts(self, tasks) -> None:
+        # Walk the person / IDNO grouping down to the tasks themselves
+        if isinstance(tasks, dict) and "task_uuid" in tasks:
+            self.attempts[tasks["task_uuid"]] = tasks.get("attempt", 0)
+        elif isinstance(tasks, dict):
+            for value in tasks.values():
+                self._remember_attempts(value)
+        elif isinstance(tasks, list):
+            for value in tasks:
+                self._remember_attempts(value)
+
     def update_task_status(self, task_updates: List[TaskStatusUpdate]) -> None:
         """
         Update status of tasks on the server.
@@ -89,7 +194,11 @@ class APIClient:
         try:
             # Convert task updates to list of dicts
             payload = [
-                {"task_uuid": str(update.task_uuid), "status": update.status.value}
+                {
+                    "task_uuid": str(update.task_uuid),
+                    "status": update.status.value,
+                    "attempt": self.attempts.get(str(update.task_uuid), 0),
+                }
                 for update in task_updates
             ]
 
@@ -100,6 +209,8 @@ class APIClient:
                 timeout=30,
             )
             response.raise_for_status()
+            for update in task_updates:
+                self.attempts.pop(str(update.task_uuid), None)
 
             self.logger.info("Successfully updated task statuses")
 
@@ -0,0 +1,42 @@
+"""Add idempotency keys of task creation requests
+
+Revision ID: 20261018_idempotency_keys
+Revises: 20261018_partition_tasks
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_idempotency_keys"
+down_revision = "20261018_partition_tasks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Stored responses replayed to retried task creation requests
+    op.create_table(
+        "idempotency_keys",
+        sa.Column(
+            "company_uuid",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("companies.company_uuid"),
+            primary_key=True,
+        ),
+        sa.Column("idempotency_key", sa.String(255), primary_key=True),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("response_status", sa.Integer(), nullable=True),
+        sa.Column("response_body", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_keys_created_at", "idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,148 @@
+"""Partition company tasks by month of creation
+
+Revision ID: 20261018_partition_tasks
+Revises: 20261018_task_poll_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_partition_tasks"
+down_revision = "20261018_task_poll_indexes"
+branch_labels = None
+depends_on = None
+
+# Months created ahead of the current one; the archiver keeps extending them
+PARTITIONS_AHEAD = 3
+
+COLUMNS = (
+    "task_uuid, company_uuid, status, created_at, task_type, "
+    "lease_expires_at, attempts"
+)
+
+
+def _month_start(value: datetime.datetime) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _create_poll_indexes():
+    op.create_index(
+        "ix_company_tasks_company_status_type",
+        "company_tasks",
+        ["company_uuid", "status", "task_type"],
+    )
+    op.create_index(
+        "ix_company_tasks_waiting",
+        "company_tasks",
+        ["company_uuid", "task_type", "created_at", "task_uuid"],
+        postgresql_where="status = 'WAITING'",
+    )
+    op.create_index(
+        "ix_company_tasks_processing_lease",
+        "company_tasks",
+        ["lease_expires_at"],
+        postgresql_where="status = 'PROCESSING'",
+    )
+
+
+def _drop_poll_indexes():
+    op.drop_index("ix_company_tasks_processing_lease", "company_tasks")
+    op.drop_index("ix_company_tasks_waiting", "company_tasks")
+    op.drop_index("ix_company_tasks_company_status_type", "company_tasks")
+
+
+def upgrade():
+    connection = op.get_bind()
+    if connection.dialect.name != "postgresql":
+        return
+
+    # Index and primary key names are schema wide: free them for the new table
+    _drop_poll_indexes()
+    op.rename_table("company_tasks", "company_tasks_unpartitioned")
+    op.execute(
+        "ALTER TABLE company_tasks_unpartitioned "
+        "RENAME CONSTRAINT company_tasks_pkey TO company_tasks_unpartitioned_pkey"
+    )
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE company_tasks (
+            task_uuid UUID NOT NULL,
+            company_uuid UUID NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            task_type VARCHAR(50) NOT NULL,
+            lease_expires_at TIMESTAMP WITHOUT TIME ZONE,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT company_tasks_pkey PRIMARY KEY (task_uuid, created_at),
+            CONSTRAINT fk_company_tasks_company FOREIGN KEY (company_uuid)
+                REFERENCES companies (company_uuid)
+        ) PARTITION BY RANGE (created_at)
+        """)
+    # Catches rows outside the monthly partitions; should stay empty
+    op.execute("CREATE TABLE company_tasks_default PARTITION OF company_tasks DEFAULT")
+
+    oldest = connection.execute(
+        sa.text("SELECT min(created_at) FROM company_tasks_unpartitioned")
+    ).scalar()
+    now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+    month = _month_start(min(oldest or now, now))
+    last_month = _month_start(now)
+    for _ in range(PARTITIONS_AHEAD):
+        last_month = _next_month(last_month)
+    while month <= last_month:
+        next_month = _next_month(month)
+        op.execute(
+            f"CREATE TABLE company_tasks_y{month.year}m{month.month:02d} "
+            f"PARTITION OF company_tasks "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    op.execute(
+        f"INSERT INTO company_tasks ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM company_tasks_unpartitioned"
+    )
+    op.drop_table("company_tasks_unpartitioned")
+    # Created on every partition, current and future
+    _create_poll_indexes()
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    _drop_poll_indexes()
+    op.rename_table("company_tasks", "company_tasks_partitioned")
+    op.execute(
+        "ALTER TABLE company_tasks_partitioned "
+        "RENAME CONSTRAINT company_tasks_pkey TO company_tasks_partitioned_pkey"
+    )
+    op.execute("""
+        CREATE TABLE company_tasks (
+            task_uuid UUID NOT NULL,
+            company_uuid UUID NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            task_type VARCHAR(50) NOT NULL,
+            lease_expires_at TIMESTAMP WITHOUT TIME ZONE,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT company_tasks_pkey PRIMARY KEY (task_uuid),
+            CONSTRAINT fk_company_tasks_company FOREIGN KEY (company_uuid)
+                REFERENCES companies (company_uuid)
+        )
+        """)
+    op.execute(
+        f"INSERT INTO company_tasks ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM company_tasks_partitioned"
+    )
+    # Dropping the parent drops every partition
+    op.drop_table("company_tasks_partitioned")
+    _create_poll_indexes()
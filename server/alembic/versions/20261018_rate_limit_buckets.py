@@ -0,0 +1,37 @@
+"""Add per-company rate limit buckets
+
+Revision ID: 20261018_rate_limit_buckets
+Revises: 20261018_idempotency_keys
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_rate_limit_buckets"
+down_revision = "20261018_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Token buckets shared by the workers when RATE_LIMIT_STORE=database
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column(
+            "company_uuid",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("companies.company_uuid"),
+            primary_key=True,
+        ),
+        sa.Column("budget", sa.String(50), primary_key=True),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("refilled_at", sa.Float(), nullable=False),
+        sa.Column("granted", sa.Boolean(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,42 @@
+"""Order task status events by the transaction that logged them
+
+Revision ID: 20261018_status_event_txid
+Revises: 20261018_rate_limit_buckets
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_status_event_txid"
+down_revision = "20261018_rate_limit_buckets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing events are all committed: 0 sorts them before every new one
+    op.add_column(
+        "task_status_events",
+        sa.Column(
+            "transaction_id", sa.BigInteger(), nullable=False, server_default="0"
+        ),
+    )
+    op.alter_column("task_status_events", "transaction_id", server_default=None)
+    op.drop_index("ix_task_status_events_company_event", "task_status_events")
+    op.create_index(
+        "ix_task_status_events_company_transaction",
+        "task_status_events",
+        ["company_uuid", "transaction_id", "event_id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_task_status_events_company_transaction", "task_status_events")
+    op.create_index(
+        "ix_task_status_events_company_event",
+        "task_status_events",
+        ["company_uuid", "event_id"],
+    )
+    op.drop_column("task_status_events", "transaction_id")
@@ -0,0 +1,27 @@
+"""Add claim attempts to company tasks
+
+Revision ID: 20261018_task_attempts
+Revises: 20261018_task_lease
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_task_attempts"
+down_revision = "20261018_task_lease"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Incremented on every claim; the lease reaper fails tasks past the limit
+    op.add_column(
+        "company_tasks",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_column("company_tasks", "attempts")
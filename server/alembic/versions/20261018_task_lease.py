@@ -0,0 +1,27 @@
+"""Add lease expiry to company tasks
+
+Revision ID: 20261018_task_lease
+Revises: 20261018_unique_task
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_task_lease"
+down_revision = "20261018_unique_task"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Set when a machine claims a task; the claim is void once it is in the past
+    op.add_column(
+        "company_tasks",
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("company_tasks", "lease_expires_at")
@@ -0,0 +1,59 @@
+"""Index company tasks for machine polling
+
+Revision ID: 20261018_task_poll_indexes
+Revises: 20261018_token_invalidations
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "20261018_task_poll_indexes"
+down_revision = "20261018_token_invalidations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so that machines can keep polling and submitting
+    # while the indexes are created on a large company_tasks table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_company_tasks_company_status_type",
+            "company_tasks",
+            ["company_uuid", "status", "task_type"],
+            postgresql_concurrently=True,
+        )
+        # Machine polls and claims only look at the (few) waiting tasks
+        op.create_index(
+            "ix_company_tasks_waiting",
+            "company_tasks",
+            ["company_uuid", "task_type", "created_at", "task_uuid"],
+            postgresql_where="status = 'WAITING'",
+            postgresql_concurrently=True,
+        )
+        # The lease reaper only looks at the tasks being processed
+        op.create_index(
+            "ix_company_tasks_processing_lease",
+            "company_tasks",
+            ["lease_expires_at"],
+            postgresql_where="status = 'PROCESSING'",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_company_tasks_processing_lease",
+            "company_tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_company_tasks_waiting", "company_tasks", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_company_tasks_company_status_type",
+            "company_tasks",
+            postgresql_concurrently=True,
+        )
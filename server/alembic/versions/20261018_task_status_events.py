@@ -0,0 +1,42 @@
+"""Add task status change log
+
+Revision ID: 20261018_task_status_events
+Revises: 20261018_task_attempts
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_task_status_events"
+down_revision = "20261018_task_attempts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Append-only log backing the status stream; event_id is the SSE event id
+    op.create_table(
+        "task_status_events",
+        sa.Column("event_id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("company_uuid", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("task_uuid", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_task_status_events_company_event",
+        "task_status_events",
+        ["company_uuid", "event_id"],
+    )
+    op.create_index(
+        "ix_task_status_events_created_at", "task_status_events", ["created_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_task_status_events_created_at", "task_status_events")
+    op.drop_index("ix_task_status_events_company_event", "task_status_events")
+    op.drop_table("task_status_events")
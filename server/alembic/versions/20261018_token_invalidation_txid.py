@@ -0,0 +1,36 @@
+"""Order auth token invalidations by the transaction that recorded them
+
+Revision ID: 20261018_token_invalidation_txid
+Revises: 20261018_status_event_txid
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_token_invalidation_txid"
+down_revision = "20261018_status_event_txid"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing invalidations are all committed: 0 sorts them before new ones
+    op.add_column(
+        "auth_token_invalidations",
+        sa.Column(
+            "transaction_id", sa.BigInteger(), nullable=False, server_default="0"
+        ),
+    )
+    op.alter_column("auth_token_invalidations", "transaction_id", server_default=None)
+    op.create_index(
+        "ix_auth_token_invalidations_transaction",
+        "auth_token_invalidations",
+        ["transaction_id", "invalidation_id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_auth_token_invalidations_transaction", "auth_token_invalidations")
+    op.drop_column("auth_token_invalidations", "transaction_id")
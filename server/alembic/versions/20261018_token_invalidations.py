@@ -0,0 +1,37 @@
+"""Add auth token invalidation log
+
+Revision ID: 20261018_token_invalidations
+Revises: 20261018_task_status_events
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_token_invalidations"
+down_revision = "20261018_task_status_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Regenerated tokens, read by every worker to evict them from its token cache
+    op.create_table(
+        "auth_token_invalidations",
+        sa.Column(
+            "invalidation_id", sa.BigInteger(), primary_key=True, autoincrement=True
+        ),
+        sa.Column("auth_token", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_auth_token_invalidations_created_at",
+        "auth_token_invalidations",
+        ["created_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_auth_token_invalidations_created_at", "auth_token_invalidations")
+    op.drop_table("auth_token_invalidations")
@@ -0,0 +1,71 @@
+"""Add unique_task constraint on single invoice keys
+
+Revision ID: 20261018_unique_task
+Revises: 20250211_initial_migration
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_unique_task"
+down_revision = "20250211_initial_migration"
+branch_labels = None
+depends_on = None
+
+# Rows sharing an invoice key that lose to another row of the key: completed
+# work is kept over pending work, then the oldest task
+DUPLICATE_TASKS = """
+    SELECT task_uuid FROM (
+        SELECT data.task_uuid,
+               ROW_NUMBER() OVER (
+                   PARTITION BY data.my_company_idno, data.seria, data.number
+                   ORDER BY
+                       CASE tasks.status
+                           WHEN 'COMPLETED' THEN 0
+                           WHEN 'PROCESSING' THEN 1
+                           WHEN 'WAITING' THEN 2
+                           ELSE 3
+                       END,
+                       tasks.created_at,
+                       data.task_uuid
+               ) AS position
+        FROM single_invoice_task_data AS data
+        LEFT JOIN company_tasks AS tasks ON tasks.task_uuid = data.task_uuid
+    ) AS ranked
+    WHERE position > 1
+"""
+
+
+def upgrade():
+    connection = op.get_bind()
+    constraints = sa.inspect(connection).get_unique_constraints(
+        "single_invoice_task_data"
+    )
+    if any(constraint["name"] == "unique_task" for constraint in constraints):
+        return
+
+    # The model declares unique_task but the initial migration never created it,
+    # so duplicate invoice keys may exist: drop them with their company tasks.
+    duplicates = [row.task_uuid for row in connection.execute(sa.text(DUPLICATE_TASKS))]
+    if duplicates:
+        for table in ("company_tasks", "single_invoice_task_data"):
+            connection.execute(
+                sa.text(
+                    f"DELETE FROM {table} WHERE task_uuid IN :task_uuids"
+                ).bindparams(sa.bindparam("task_uuids", expanding=True)),
+                {"task_uuids": duplicates},
+            )
+
+    # Its composite index on (my_company_idno, seria, number) serves the exact
+    # invoice key lookups used by the status and conflict checks.
+    op.create_unique_constraint(
+        "unique_task",
+        "single_invoice_task_data",
+        ["my_company_idno", "seria", "number"],
+    )
+
+
+def downgrade():
+    op.drop_constraint("unique_task", "single_invoice_task_data", type_="unique")
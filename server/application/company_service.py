@@ -1,14 +1,21 @@
 from domain.company.company import Company
 from domain.company.repository import CompanyRepository
+from domain.company.token_cache import TokenCache
 from domain.exceptions import CompanyNotFoundException
+from typing import Optional
 from uuid import uuid4
 
 
 class CompanyService:
     """Service layer for handling company-related business logic."""
 
-    def __init__(self, company_repository: CompanyRepository):
+    def __init__(
+        self,
+        company_repository: CompanyRepository,
+        token_cache: Optional[TokenCache] = None,
+    ):
         self.company_repository = company_repository
+        self.token_cache = token_cache
 
     def register_company(self, name: str) -> Company:
         """
@@ -31,6 +38,10 @@ class CompanyService:
         """
         Generate a new authentication token for a company.
 
+        The previous token is recorded in the shared invalidation log in the
+        same transaction as the new one, so other workers stop accepting it
+        too, and dropped from the token cache.
+
         Args:
             current_token: Current authentication token of the company
 
@@ -51,6 +62,14 @@ class CompanyService:
 
         # Update company
         company.auth_token = new_token
-        self.company_repository.update_company(company)
+        if self.token_cache is None:
+            self.company_repository.update_company(company)
+        else:
+            # Revoke the previous token in the same transaction for the other
+            # workers, then in this one
+            self.company_repository.replace_auth_token(
+                company, current_token, self.token_cache.ttl
+            )
+            self.token_cache.invalidate(current_token)
 
         return company
@@ -1,21 +1,30 @@
+import base64
+import binascii
+import datetime
 from domain.company.company import Company
 from domain.task.repository import TaskRepository
 from domain.task.schemas import (
+    IdempotencyRecord,
     SingleInvoiceStatusRequest,
-    TaskStatus,
     MultipleInvoicesResponse,
     SingleInvoiceIdentifier,
     MultipleInvoicesAction,
     MultipleInvoicesIdentifier,
     SingleInvoiceAction,
     SingleInvoiceResponse,
+    TaskStatus,
+    TaskStatusEvent,
+    TaskLeaseRenewalRequest,
     TaskStatusUpdateByUUIDRequest,
-    TaskType,
 )
-from typing import List, Union
+from typing import Callable, List, Optional, Tuple
+from uuid import UUID
 from domain.exceptions import (
     DatabaseException,
     DuplicateTaskException,
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyReusedException,
+    InvalidCursorException,
     TaskExistsException,
     TaskNotOwnedException,
     TaskNotFoundException,
@@ -30,131 +39,186 @@ class TaskService:
 
     def _get_existing_single_invoice_tasks(
         self, single_invoice_tasks: List[SingleInvoiceIdentifier]
-    ) -> List[dict]:
-        """Check if any of the tasks already exist in the database"""
-        existing_tasks = []
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Find invoices that already exist in the database or repeat within the request.
+
+        The batch is walked once to collect its unique_task keys and the
+        in-request duplicates, then checked against the database with a single
+        set-based query.
+
+        Returns:
+            Tuple[List[dict], List[dict]]: Existing tasks and duplicated tasks
+        """
+        invoices_by_key = {}
+        duplicates = []
         for single_invoice_task in single_invoice_tasks:
-            if self.task_repository.single_invoice_entry_exists(
+            task_key = (
                 single_invoice_task.my_company_idno,
                 single_invoice_task.seria,
-                single_invoice_task.number,
-                single_invoice_task.person_name_certificate,
-            ):
-                existing_tasks.append(
-                    {
-                        "my_company_idno": single_invoice_task.my_company_idno,
-                        "seria": single_invoice_task.seria,
-                        "number": single_invoice_task.number,
-                        "person_name_certificate": single_invoice_task.person_name_certificate,
-                    }
-                )
-        return existing_tasks
-
-    def _check_for_duplicates(
-        self, tasks: List[Union[SingleInvoiceIdentifier, MultipleInvoicesIdentifier]]
-    ) -> List[dict]:
-        """Check for duplicates within the provided task data"""
-        seen = set()
-        duplicates = []
-        for task in tasks:
-
-            if isinstance(task, SingleInvoiceIdentifier):
-                task_key = (
-                    task.my_company_idno,
-                    task.seria,
-                    task.number,
-                    task.person_name_certificate,
+                int(single_invoice_task.number),
+            )
+            if task_key in invoices_by_key:
+                duplicates.append(
+                    self._single_invoice_task_details(single_invoice_task)
                 )
             else:
-                task_key = (task.my_company_idno, task.person_name_certificate)
+                invoices_by_key[task_key] = single_invoice_task
 
-            if task_key in seen:
-                duplicates.append(task_key)
-            else:
-                seen.add(task_key)
-        return duplicates
+        existing_entries = self.task_repository.get_existing_single_invoice_entries(
+            list(invoices_by_key)
+        )
+        # number is an integer column: "0123" and "123" are the same invoice
+        existing_keys = {
+            (my_company_idno, seria, int(number))
+            for my_company_idno, seria, number in existing_entries
+        }
+        existing_tasks = [
+            self._single_invoice_task_details(invoice)
+            for task_key, invoice in invoices_by_key.items()
+            if task_key in existing_keys
+        ]
+        return existing_tasks, duplicates
+
+    @staticmethod
+    def _single_invoice_task_details(
+        single_invoice_task: SingleInvoiceIdentifier,
+    ) -> dict:
+        return {
+            "my_company_idno": single_invoice_task.my_company_idno,
+            "seria": single_invoice_task.seria,
+            "number": single_invoice_task.number,
+            "person_name_certificate": single_invoice_task.person_name_certificate,
+        }
 
     def create_single_invoice_task(
         self,
         current_company: Company,
         action_type: SingleInvoiceAction,
         invoices: List[SingleInvoiceIdentifier],
-    ):
+    ) -> List[UUID]:
         """
         Create tasks for signing individual invoices as a buyer.
 
+        All tasks of the request are written in a single transaction: either
+        every task is created or none is.
+
         Args:
             current_company: Company entity making the request
             action_type: Type of action to perform (e.g., BuyerSignInvoice)
             invoices: List of invoices to be signed
 
+        Returns:
+            List[UUID]: UUIDs of the created tasks, in request order
+
         Raises:
             TaskExistsException: If any of the tasks already exist
             DuplicateTaskException: If there are duplicate invoices in the request
             DatabaseException: If there's an error saving to the database
         """
-        # 1. Check if the task already exists
-        # existing_tasks = self._get_existing_single_invoice_tasks(invoices)
-        # if existing_tasks:
-        #     raise TaskExistsException(
-        #         "Tasks already exist in database", existing_tasks=existing_tasks
-        #     )
+        # 1. Check if the tasks already exist or are duplicated within the request
+        existing_tasks, duplicates = self._get_existing_single_invoice_tasks(invoices)
+        if existing_tasks:
+            raise TaskExistsException(
+                "Tasks already exist in database", existing_tasks=existing_tasks
+            )
 
         # 2. Check for duplicates
-        # duplicates = self._check_for_duplicates(invoices)
-        # if duplicates:
-        #     raise DuplicateTaskException("Duplicates found", duplicates=duplicates)
-
-        for invoice in invoices:
-            # 3. Create the single invoice entry
-            single_invoice_entry = self.task_repository.create_single_invoice_entry(
-                action_type=action_type, invoice=invoice
-            )
+        if duplicates:
+            raise DuplicateTaskException("Duplicates found", duplicates=duplicates)
+
+        # 3. Create the single invoice entries and company tasks in one transaction
+        return self.task_repository.create_single_invoice_tasks(
+            company_uuid=current_company.company_uuid,
+            action_type=action_type,
+            invoices=invoices,
+        )
+
+    def import_single_invoice_tasks(
+        self,
+        current_company: Company,
+        action_type: SingleInvoiceAction,
+        invoices: List[Tuple[int, SingleInvoiceIdentifier]],
+    ) -> List[dict]:
+        """
+        Create the tasks of one chunk of a bulk invoice import.
+
+        Unlike create_single_invoice_task, conflicting invoices do not reject
+        the chunk: invoices that already exist or repeat within the chunk are
+        reported and skipped, the others are created in one transaction by
+        the repository's bulk loader.
 
-            # 4. Create the company task
-            self.task_repository.create_company_task(
-                task_uuid=single_invoice_entry.task_uuid,
+        Args:
+            current_company: Company entity making the request
+            action_type: Type of action to perform (e.g., BuyerSignInvoice)
+            invoices: (line number, invoice) pairs of the chunk
+
+        Returns:
+            List[dict]: One result per invoice, with its "line" and a "status"
+                of created (with the "task_uuid"), exists, duplicate or error
+        """
+        results = {}
+        invoices_by_key = {}
+        for line, invoice in invoices:
+            task_key = (invoice.my_company_idno, invoice.seria, int(invoice.number))
+            if task_key in invoices_by_key:
+                results[line] = {"line": line, "status": "duplicate"}
+            else:
+                invoices_by_key[task_key] = (line, invoice)
+
+        new_invoices = list(invoices_by_key.values())
+        try:
+            tasks_uuid = self.task_repository.bulk_load_single_invoice_tasks(
                 company_uuid=current_company.company_uuid,
-                status=TaskStatus.WAITING.value,
-                task_type=TaskType.SINGLE_INVOICE_TASK.value,
+                action_type=action_type,
+                invoices=[invoice for _, invoice in new_invoices],
             )
+            for (line, _), task_uuid in zip(new_invoices, tasks_uuid):
+                if task_uuid is None:
+                    results[line] = {"line": line, "status": "exists"}
+                else:
+                    results[line] = {
+                        "line": line,
+                        "status": "created",
+                        "task_uuid": str(task_uuid),
+                    }
+
+        except DatabaseException as e:
+            for line, _ in new_invoices:
+                results[line] = {"line": line, "status": "error", "error": e.details}
+
+        return [results[line] for line, _ in invoices]
 
     def create_multiple_invoices_task(
         self,
         current_company: Company,
         action_type: MultipleInvoicesAction,
         invoices: List[MultipleInvoicesIdentifier],
-    ):
+    ) -> List[UUID]:
         """
         Create tasks for signing all invoices from a specific page.
 
+        All tasks of the request are written in a single transaction: either
+        every task is created or none is.
+
         Args:
             current_company: Company entity making the request
             action_type: Type of action and page to process (e.g., SupplierSignAllDraftedInvoices)
             invoices: List of company IDNOs to process
 
+        Returns:
+            List[UUID]: UUIDs of the created tasks, in request order
+
         Raises:
             DuplicateTaskException: If there are duplicate IDNOs in the request
             DatabaseException: If there's an error saving to the database
         """
-        # 1. Check if the task already exists
-        # duplicates = self._check_for_duplicates(invoices)
-        # if duplicates:
-        #     raise DuplicateTaskException(f"Duplicates found: {duplicates}")
-
-        for invoice in invoices:
-            # 3. Create the multiple invoices entry
-            multuple_invoice_entry = self.task_repository.create_multiple_invoice_entry(
-                action_type=action_type, invoice=invoice
-            )
-
-            # 4. Create the company tasks
-            self.task_repository.create_company_task(
-                task_uuid=multuple_invoice_entry.task_uuid,
-                company_uuid=current_company.company_uuid,
-                status=TaskStatus.WAITING.value,
-                task_type=TaskType.MULTIPLE_INVOICES_TASK.value,
-            )
+        # Create the multiple invoices entries and company tasks in one transaction
+        return self.task_repository.create_multiple_invoices_tasks(
+            company_uuid=current_company.company_uuid,
+            action_type=action_type,
+            invoices=invoices,
+        )
 
     def get_single_invoice_tasks_status(
         self, current_company: Company, tasks: List[SingleInvoiceStatusRequest]
@@ -173,23 +237,14 @@ class TaskService:
             TaskNotOwnedException: If tasks don't belong to the company
             DatabaseException: If there's an error retrieving from the database
         """
-        # 1. Check if the tasks belongs to the company
-        tasks_uuid = self.task_repository.get_single_invoice_tasks_uuid(tasks)
-
-        tasks_belongs_to_company = self.task_repository.verify_company_task_ownership(
-            current_company.company_uuid, tasks_uuid
+        # Ownership is checked on the same rows the statuses are read from
+        return self.task_repository.get_single_invoice_tasks_status(
+            current_company.company_uuid, tasks
         )
-        if not tasks_belongs_to_company:
-            raise TaskNotOwnedException("Tasks do not belong to the company")
-
-        # 2. Get the tasks status
-        tasks_status = self.task_repository.get_single_invoice_tasks_status(tasks)
-
-        return tasks_status
 
     def update_tasks_status_by_uuid(
         self, current_company: Company, request: List[TaskStatusUpdateByUUIDRequest]
-    ):
+    ) -> int:
         """
         Update status of multiple tasks by their UUIDs.
 
@@ -197,6 +252,9 @@ class TaskService:
             current_company: Company entity making the request
             request: List of task UUIDs and their new statuses
 
+        Returns:
+            int: Number of tasks whose status was updated
+
         Raises:
             TaskNotFoundException: If a task UUID doesn't exist
             TaskNotOwnedException: If tasks don't belong to the company
@@ -214,12 +272,10 @@ class TaskService:
                 raise TaskNotOwnedException("Tasks do not belong to the company")
 
             # 2. Update the tasks status
-            self.task_repository.update_tasks_status(request)
+            return self.task_repository.update_tasks_status(request)
 
-        except TaskNotFoundException as e:
-            raise TaskNotFoundException(e.message, e.task_uuid)
-        except TaskNotOwnedException as e:
-            raise TaskNotOwnedException(str(e))
+        except (TaskNotFoundException, TaskNotOwnedException):
+            raise
         except DatabaseException as e:
             raise DatabaseException("Failed to update tasks status", str(e))
 
@@ -261,74 +317,363 @@ class TaskService:
         except DatabaseException as e:
             raise DatabaseException("Failed to get waiting tasks", str(e))
 
-    def get_structured_waiting_tasks_for_machine(self, company: Company) -> dict:
-        """Get waiting tasks structured by person and IDNO"""
+    @staticmethod
+    def _encode_machine_tasks_cursor(key: Tuple[datetime.datetime, UUID]) -> str:
+        created_at, task_uuid = key
+        return base64.urlsafe_b64encode(
+            f"{created_at.isoformat()}|{task_uuid}".encode()
+        ).decode()
+
+    @staticmethod
+    def _decode_machine_tasks_cursor(cursor: str) -> Tuple[datetime.datetime, UUID]:
         try:
-            # Get all waiting tasks
-            single_tasks = (
-                self.task_repository.get_waiting_tasks_for_machine_single_invoice(
-                    company.company_uuid
-                )
+            created_at, task_uuid = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
             )
-            multiple_tasks = (
-                self.task_repository.get_waiting_tasks_for_machine_multiple_invoices(
-                    company.company_uuid
-                )
+            return datetime.datetime.fromisoformat(created_at), UUID(task_uuid)
+        except (ValueError, binascii.Error) as e:
+            raise InvalidCursorException(f"Invalid cursor: {cursor}") from e
+
+    def get_structured_waiting_tasks_for_machine(
+        self, company: Company, limit: int, cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Get a page of waiting tasks structured by person and IDNO.
+
+        Args:
+            company: Company entity making the request
+            limit: Maximum number of tasks in the page
+            cursor: `next_cursor` returned with the previous page, None for
+                the first page
+
+        Returns:
+            dict: Waiting tasks in the /machine/tasks structure, plus the
+                `next_cursor` of the following page (None when there is none)
+
+        Raises:
+            InvalidCursorException: If the cursor was not issued by this service
+            DatabaseException: If there's an error getting the tasks
+        """
+        after = None
+        if cursor is not None:
+            after = self._decode_machine_tasks_cursor(cursor)
+        structured_tasks, last_key = (
+            self.task_repository.get_structured_waiting_tasks_for_machine(
+                company.company_uuid, limit, after
             )
+        )
+        structured_tasks["next_cursor"] = (
+            self._encode_machine_tasks_cursor(last_key)
+            if last_key is not None
+            else None
+        )
+        return structured_tasks
 
-            # Structure single tasks by person_name_certificate and my_company_idno
-            single_tasks_structured = {}
-            for task in single_tasks:
-                if task.person_name_certificate not in single_tasks_structured:
-                    single_tasks_structured[task.person_name_certificate] = {}
-
-                if (
-                    task.my_company_idno
-                    not in single_tasks_structured[task.person_name_certificate]
-                ):
-                    single_tasks_structured[task.person_name_certificate][
-                        task.my_company_idno
-                    ] = []
-
-                single_tasks_structured[task.person_name_certificate][
-                    task.my_company_idno
-                ].append(
-                    {
-                        "seria": task.seria,
-                        "number": task.number,
-                        "task_uuid": task.task_uuid,
-                        "action_type": task.action_type,
-                    }
-                )
+    def claim_structured_waiting_tasks_for_machine(
+        self, company: Company, limit: int, lease_seconds: int
+    ) -> dict:
+        """
+        Claim a batch of waiting tasks for a machine, structured by person and IDNO.
 
-            # Structure multiple tasks
-            multiple_tasks_structured = {}
-            for task in multiple_tasks:
-                if task.person_name_certificate not in multiple_tasks_structured:
-                    multiple_tasks_structured[task.person_name_certificate] = {}
-
-                if (
-                    task.my_company_idno
-                    not in multiple_tasks_structured[task.person_name_certificate]
-                ):
-                    multiple_tasks_structured[task.person_name_certificate][
-                        task.my_company_idno
-                    ] = []
-
-                multiple_tasks_structured[task.person_name_certificate][
-                    task.my_company_idno
-                ].append(
-                    {
-                        "buyer_idno": task.buyer_idno,
-                        "signature_type": task.signature_type,
-                        "task_uuid": task.task_uuid,
-                        "action_type": task.action_type,
-                    }
-                )
+        Claimed tasks are moved to PROCESSING with a lease, so other machines
+        polling for the same company do not receive them.
+
+        Args:
+            company: Company entity making the request
+            limit: Maximum number of tasks to claim
+            lease_seconds: How long the machine owns the claimed tasks
+
+        Returns:
+            dict: Claimed tasks in the /machine/tasks structure, plus the
+                lease expiry as an ISO timestamp
+
+        Raises:
+            DatabaseException: If there's an error claiming the tasks
+        """
+        lease_expires_at = datetime.datetime.now(datetime.UTC).replace(
+            tzinfo=None
+        ) + datetime.timedelta(seconds=lease_seconds)
+        structured_tasks = self.task_repository.claim_waiting_tasks_for_machine(
+            company.company_uuid, limit, lease_expires_at
+        )
+        structured_tasks["lease_expires_at"] = lease_expires_at.isoformat()
+        return structured_tasks
+
+    def renew_task_leases(
+        self,
+        company: Company,
+        tasks: List[TaskLeaseRenewalRequest],
+        lease_seconds: int,
+    ) -> dict:
+        """
+        Extend the leases of claimed tasks a machine is still working on.
+
+        Args:
+            company: Company entity making the request
+            tasks: Tasks with the attempt they were claimed with
+            lease_seconds: How long the machine owns the tasks from now on
+
+        Returns:
+            dict: UUIDs of the renewed tasks as "renewed", and the new lease
+                expiry as an ISO timestamp
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        lease_expires_at = datetime.datetime.now(datetime.UTC).replace(
+            tzinfo=None
+        ) + datetime.timedelta(seconds=lease_seconds)
+        renewed = self.task_repository.renew_task_leases(
+            company.company_uuid, tasks, lease_expires_at
+        )
+        return {
+            "renewed": [str(task_uuid) for task_uuid in renewed],
+            "lease_expires_at": lease_expires_at.isoformat(),
+        }
+
+    def requeue_expired_tasks(self, max_attempts: int) -> int:
+        """
+        Release tasks whose machine lease has expired.
+
+        Expired tasks go back to WAITING to be claimed again, or are marked
+        FAILED once they have been claimed max_attempts times.
+
+        Args:
+            max_attempts: Number of claims after which a task is failed
+
+        Returns:
+            int: Number of tasks released
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        return self.task_repository.requeue_expired_tasks(now, max_attempts)
+
+    def get_task_status_events(
+        self, company: Company, after: Tuple[int, int], limit: int
+    ) -> Tuple[List[TaskStatusEvent], bool]:
+        """
+        Get the company's task status changes logged after a stream cursor.
+
+        Args:
+            company: Company entity making the request
+            after: Cursor of the last event the client received, see
+                get_task_status_event_cursor
+            limit: Maximum number of events to return
+
+        Returns:
+            Tuple[List[TaskStatusEvent], bool]: Status changes in the order
+                they happened, and whether later changes are held back until
+                older transactions end
+
+        Raises:
+            DatabaseException: If there's an error reading the database
+        """
+        return self.task_repository.get_task_status_events(
+            company.company_uuid, after, limit
+        )
+
+    def get_task_status_event_cursor(
+        self, company: Company, event_id: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Get the stream cursor of a task status change, or of the latest one.
+
+        Raises:
+            DatabaseException: If there's an error reading the database
+        """
+        return self.task_repository.get_task_status_event_cursor(
+            company.company_uuid, event_id
+        )
+
+    def get_task_queue_depths(self) -> List[dict]:
+        """
+        Count the waiting, processing and failed tasks of every company.
+
+        Returns:
+            List[dict]: company_uuid, task_type, status and count per group;
+                empty groups are left out
+
+        Raises:
+            DatabaseException: If there's an error reading the database
+        """
+        return self.task_repository.count_tasks_by_status(
+            [TaskStatus.WAITING, TaskStatus.PROCESSING, TaskStatus.FAILED]
+        )
+
+    def prune_task_status_events(self, retention_seconds: int) -> int:
+        """
+        Delete task status changes older than the retention window.
+
+        Args:
+            retention_seconds: Age in seconds after which events are deleted
+
+        Returns:
+            int: Number of deleted events
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        cutoff = datetime.datetime.now(datetime.UTC).replace(
+            tzinfo=None
+        ) - datetime.timedelta(seconds=retention_seconds)
+        return self.task_repository.delete_task_status_events_before(cutoff)
+
+    def begin_idempotent_request(
+        self,
+        company: Company,
+        idempotency_key: str,
+        request_hash: str,
+        claimed_at: datetime.datetime,
+        claim_timeout: int,
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Start processing a request sent with an Idempotency-Key header.
+
+        Args:
+            company: Company entity sending the request
+            idempotency_key: Idempotency-Key header of the request
+            request_hash: Hash identifying the request (endpoint and body)
+            claimed_at: Time the key is claimed at, naive UTC; identifies the
+                claim when the request completes or is released
+            claim_timeout: Seconds after which an attempt still without a
+                response is considered dead and its key taken over
+
+        Returns:
+            Optional[IdempotencyRecord]: None if the request must be processed,
+                otherwise the stored response of its first attempt to replay
+
+        Raises:
+            IdempotencyKeyReusedException: If the key was sent with another request
+            IdempotencyKeyInProgressException: If the first attempt is still running
+            DatabaseException: If there's an error accessing the database
+        """
+        record = self.task_repository.claim_idempotency_key(
+            company.company_uuid,
+            idempotency_key,
+            request_hash,
+            claimed_at,
+            claimed_at - datetime.timedelta(seconds=claim_timeout),
+        )
+        if record is None:
+            return None
+        if record.request_hash != request_hash:
+            raise IdempotencyKeyReusedException(
+                f"Idempotency key {idempotency_key} was used with another request"
+            )
+        if record.response_status is None:
+            raise IdempotencyKeyInProgressException(
+                f"Request with idempotency key {idempotency_key} is still being processed"
+            )
+        return record
+
+    def complete_idempotent_request(
+        self,
+        company: Company,
+        idempotency_key: str,
+        claimed_at: datetime.datetime,
+        response_status: int,
+        response_body: str,
+    ):
+        """Store the response replayed to retries of an idempotent request"""
+        self.task_repository.save_idempotent_response(
+            company.company_uuid,
+            idempotency_key,
+            claimed_at,
+            response_status,
+            response_body,
+        )
+
+    def release_idempotent_request(
+        self, company: Company, idempotency_key: str, claimed_at: datetime.datetime
+    ):
+        """Forget the idempotency key of a failed request so a retry processes it"""
+        self.task_repository.release_idempotency_key(
+            company.company_uuid, idempotency_key, claimed_at
+        )
+
+    def prune_idempotency_keys(self, ttl_seconds: int) -> int:
+        """
+        Delete idempotency keys older than their time to live.
+
+        Args:
+            ttl_seconds: Age in seconds after which keys are deleted
+
+        Returns:
+            int: Number of deleted keys
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        cutoff = datetime.datetime.now(datetime.UTC).replace(
+            tzinfo=None
+        ) - datetime.timedelta(seconds=ttl_seconds)
+        return self.task_repository.delete_idempotency_keys_before(cutoff)
+
+    def archive_finished_tasks(
+        self,
+        retention_days: int,
+        batch_size: int,
+        export: Callable[[List[dict]], None],
+    ) -> int:
+        """
+        Move finished tasks older than the retention window out of the database.
+
+        Tasks are exported and deleted batch by batch until none is left.
+
+        Args:
+            retention_days: Age in days after which finished tasks are archived
+            batch_size: Number of tasks exported and deleted per transaction
+            export: Receives every batch before it is deleted
 
-            return {
-                "SingleInvoiceTask": single_tasks_structured,
-                "MultipleInvoicesTask": multiple_tasks_structured,
-            }
-        except Exception as e:
-            raise DatabaseException(f"Error getting tasks: {str(e)}", str(e))
+        Returns:
+            int: Number of archived tasks
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        cutoff = datetime.datetime.now(datetime.UTC).replace(
+            tzinfo=None
+        ) - datetime.timedelta(days=retention_days)
+        archived = 0
+        while True:
+            batch = self.task_repository.archive_finished_tasks(
+                cutoff, batch_size, export
+            )
+            archived += batch
+            if batch < batch_size:
+                return archived
+
+    def maintain_task_partitions(
+        self, months_ahead: int, retention_days: Optional[int] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Keep the monthly company_tasks partitions in line with the retention.
+
+        Partitions are created `months_ahead` months in advance, so new tasks
+        never land in the default partition. With a retention, the empty
+        partitions older than the retention window are dropped.
+
+        Args:
+            months_ahead: Number of future months that must have a partition
+            retention_days: Age in days after which empty partitions are dropped,
+                None to keep them all
+
+        Returns:
+            Tuple[List[str], List[str]]: Partitions ensured and partitions dropped
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        today = datetime.datetime.now(datetime.UTC).date()
+        until = today
+        for _ in range(months_ahead):
+            until = (until.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        ensured = self.task_repository.ensure_task_partitions(until)
+        dropped = []
+        if retention_days is not None:
+            dropped = self.task_repository.drop_empty_task_partitions(
+                today - datetime.timedelta(days=retention_days)
+            )
+        return ensured, dropped
@@ -0,0 +1,112 @@
+"""
+Encode time and size of large machine task responses.
+
+Builds a /machine/tasks payload of `--tasks` single invoice tasks and
+renders it with the standard JSONResponse and with FastJSONResponse, then
+gzips each body the way the GZip middleware does. Prints one JSON object per
+serializer with the encode latency and the bytes on the wire.
+
+Usage (from the server directory):
+    python -m benchmarks.json_response --tasks 10000
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+import uuid
+from fastapi.responses import JSONResponse
+from config import Config
+from domain.task.schemas import SingleInvoiceAction
+from infrastructure.web.json_response import FastJSONResponse, orjson
+
+PERSONS = 20
+IDNOS_PER_PERSON = 5
+
+
+def machine_tasks_payload(tasks):
+    """
+    Build a /machine/tasks response body holding `tasks` single invoice tasks.
+
+    Returns:
+        dict: Tasks spread over PERSONS persons with IDNOS_PER_PERSON IDNOs each
+    """
+    single_tasks = {}
+    for number in range(tasks):
+        person = f"Person {number % PERSONS}"
+        idno = f"{1000000000000 + number % (PERSONS * IDNOS_PER_PERSON)}"
+        single_tasks.setdefault(person, {}).setdefault(idno, []).append(
+            {
+                "seria": "AAEE13T",
+                "number": str(number),
+                "task_uuid": str(uuid.uuid4()),
+                "action_type": SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            }
+        )
+    return {
+        "SingleInvoiceTask": single_tasks,
+        "MultipleInvoicesTask": {},
+        "next_cursor": None,
+    }
+
+
+def _time_render(response_class, payload, iterations):
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        body = response_class(content=payload).body
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return body, {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "min_ms": round(latencies[0], 3),
+    }
+
+
+def run(tasks, iterations):
+    """
+    Render a `tasks`-task payload with both serializers.
+
+    Returns:
+        list: One result dict per serializer, "serializer" telling which
+    """
+    payload = machine_tasks_payload(tasks)
+    serializers = [("json", JSONResponse)]
+    if orjson is not None:
+        serializers.append(("orjson", FastJSONResponse))
+
+    results = []
+    for serializer, response_class in serializers:
+        body, timings = _time_render(response_class, payload, iterations)
+        started = time.perf_counter()
+        compressed = gzip.compress(body, compresslevel=Config.GZIP_COMPRESS_LEVEL)
+        results.append(
+            {
+                "benchmark": "json_response",
+                "serializer": serializer,
+                "tasks": tasks,
+                **timings,
+                "bytes": len(body),
+                "gzip_bytes": len(compressed),
+                "gzip_ms": round((time.perf_counter() - started) * 1000, 3),
+                "decoded": json.loads(body) == payload,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    for result in run(args.tasks, args.iterations):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Load test of a running server with many companies and their machines.
+
+Registers `--companies` companies through /register. Each company submits
+`--batches` single invoice batches of `--batch-size` invoices at `--rate`
+batches per second, while `--machines` simulated machines per company claim
+its tasks, spend `--processing-ms` per task and report them through
+PUT /tasks/status, FAILED with probability `--failure-rate`. Prints one JSON
+object per endpoint with throughput, latency percentiles, error rate and
+status codes, then one for the tasks themselves, from creation to report.
+Rate limited requests (429) are counted as errors and retried after their
+Retry-After delay.
+
+Usage (from the server directory, against a scratch server and database):
+    python -m benchmarks.load_test --base-url http://localhost:7989 \\
+        --companies 50 --batches 20 --batch-size 100 --rate 0.5
+
+Machines claim their tasks like the machine client does; --no-claim makes
+them poll GET /machine/tasks instead, which only suits one machine per
+company as unclaimed tasks are handed to every poller. Requires httpx, which
+the server itself does not depend on.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+import httpx
+
+MACHINE_BATCH_SIZE = 100
+
+
+class LoadStats:
+    """Latencies, status codes and errors of the requests, per endpoint"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.status_codes = {}
+        self.errors = Counter()
+        self.task_latencies = []
+        self.tasks_reported = Counter()
+
+    async def request(self, client, method, url, endpoint=None, **kwargs):
+        """
+        Send a request and record it under `endpoint` ("METHOD url" by default).
+
+        Returns:
+            httpx.Response: The response, None if the request failed to complete
+        """
+        endpoint = endpoint or f"{method} {url}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[endpoint] += 1
+            self.status_codes.setdefault(endpoint, Counter())[type(e).__name__] += 1
+            return None
+        finally:
+            self.latencies.setdefault(endpoint, []).append(
+                (time.perf_counter() - started) * 1000
+            )
+        self.status_codes.setdefault(endpoint, Counter())[
+            str(response.status_code)
+        ] += 1
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+
+def _percentiles(latencies):
+    latencies = sorted(latencies)
+    summary = {
+        f"p{percentile}_ms": (
+            round(latencies[math.ceil(len(latencies) * percentile / 100) - 1], 3)
+            if latencies
+            else None
+        )
+        for percentile in (50, 95, 99)
+    }
+    summary["max_ms"] = round(latencies[-1], 3) if latencies else None
+    return summary
+
+
+def _machine_tasks(payload):
+    """Collect every task of a /machine/tasks response"""
+    if isinstance(payload, dict):
+        if "task_uuid" in payload:
+            return [payload]
+        return [task for value in payload.values() for task in _machine_tasks(value)]
+    if isinstance(payload, list):
+        return [task for value in payload for task in _machine_tasks(value)]
+    return []
+
+
+def _retry_after(response):
+    """Seconds to wait before retrying a rate limited request, None otherwise"""
+    if response is None or response.status_code != 429:
+        return None
+    return float(response.headers.get("Retry-After", 1))
+
+
+class CompanyLoad:
+    """Submitter and machines of one simulated company"""
+
+    def __init__(self, index, auth_token, options, stats):
+        self.index = index
+        self.headers = {"Authorization": f"Bearer {auth_token}"}
+        self.options = options
+        self.stats = stats
+        self.created_at = {}
+        self.submitted = False
+
+    async def _send(self, client, method, url, **kwargs):
+        # Rate limited requests are sent again after the wait, as clients do
+        while True:
+            response = await self.stats.request(
+                client, method, url, headers=self.headers, **kwargs
+            )
+            retry_after = _retry_after(response)
+            if retry_after is None:
+                return response
+            await asyncio.sleep(retry_after)
+
+    async def submit(self, client):
+        """Submit the company's batches at the configured rate"""
+        interval = 1 / self.options["rate"] if self.options["rate"] > 0 else 0
+        next_at = time.perf_counter()
+        for batch in range(self.options["batches"]):
+            await asyncio.sleep(max(next_at - time.perf_counter(), 0))
+            next_at += interval
+            invoices = [
+                {
+                    "my_company_idno": f"{1002600000000 + self.index}",
+                    "person_name_certificate": "Load test",
+                    "seria": f"L{uuid.uuid4().hex[:8]}B{batch}",
+                    "number": str(number),
+                }
+                for number in range(self.options["batch_size"])
+            ]
+            submitted_at = time.perf_counter()
+            response = await self._send(
+                client,
+                "POST",
+                "/tasks/buyer/sign_single_invoice",
+                json={"action_type": "BuyerSignInvoice", "invoices": invoices},
+            )
+            if response is not None and response.status_code == 200:
+                for task_uuid in response.json()["tasks_uuid"]:
+                    self.created_at[task_uuid] = submitted_at
+        self.submitted = True
+
+    def done(self):
+        return self.submitted and not self.created_at
+
+    async def run_machine(self, client, deadline, rng):
+        """Poll, process and report the company's tasks until all are reported"""
+        claim = self.options["claim"]
+        while not self.done() and time.perf_counter() < deadline:
+            response = await self.stats.request(
+                client,
+                "POST" if claim else "GET",
+                "/machine/tasks/claim" if claim else "/machine/tasks",
+                params={"limit": MACHINE_BATCH_SIZE, "wait": self.options["wait"]},
+                headers=self.headers,
+            )
+            tasks = (
+                _machine_tasks(response.json())
+                if response is not None and response.status_code == 200
+                else []
+            )
+            if not tasks:
+                retry_after = _retry_after(response)
+                await asyncio.sleep(
+                    self.options["poll_interval"]
+                    if retry_after is None
+                    else retry_after
+                )
+                continue
+
+            await asyncio.sleep(self.options["processing_ms"] * len(tasks) / 1000)
+            updates = [
+                {
+                    "task_uuid": task["task_uuid"],
+                    "status": (
+                        "FAILED"
+                        if rng.random() < self.options["failure_rate"]
+                        else "COMPLETED"
+                    ),
+                    "attempt": task.get("attempt", 0),
+                }
+                for task in tasks
+            ]
+            response = await self._send(client, "PUT", "/tasks/status", json=updates)
+            if response is None or response.status_code != 200:
+                continue
+            reported_at = time.perf_counter()
+            for update in updates:
+                created_at = self.created_at.pop(update["task_uuid"], None)
+                if created_at is not None:
+                    self.stats.task_latencies.append((reported_at - created_at) * 1000)
+                    self.stats.tasks_reported[update["status"]] += 1
+
+
+async def run_async(
+    client,
+    companies,
+    batches,
+    batch_size,
+    rate,
+    machines=1,
+    processing_ms=10,
+    failure_rate=0.0,
+    claim=True,
+    wait=5,
+    poll_interval=0.5,
+    timeout=600,
+    seed=None,
+):
+    """
+    Run the load against the server behind `client`.
+
+    Args:
+        client: httpx.AsyncClient with the server's base URL
+        companies: Companies registered and loaded concurrently
+        batches: Batches submitted per company
+        batch_size: Invoices per batch
+        rate: Batches per second per company, 0 for back to back
+        machines: Simulated machines per company
+        processing_ms: Simulated processing time per task
+        failure_rate: Share of the tasks reported as FAILED
+        claim: Claim tasks (POST /machine/tasks/claim) rather than poll them
+        wait: Long-poll wait of the machines' requests, in seconds
+        poll_interval: Pause of a machine after an empty poll, in seconds
+        timeout: Seconds after which machines stop, reported or not
+        seed: Seed of the simulated failures
+
+    Returns:
+        list: One result dict per endpoint, then one for the tasks
+    """
+    stats = LoadStats()
+    rng = random.Random(seed)
+    options = {
+        "batches": batches,
+        "batch_size": batch_size,
+        "rate": rate,
+        "processing_ms": processing_ms,
+        "failure_rate": failure_rate,
+        "claim": claim,
+        "wait": wait,
+        "poll_interval": poll_interval,
+    }
+
+    loads = []
+    for index in range(companies):
+        response = await stats.request(
+            client,
+            "POST",
+            "/register",
+            json={"name": f"Load test {uuid.uuid4().hex[:12]}"},
+        )
+        if response is None or response.status_code != 200:
+            raise RuntimeError("Failed to register the load test companies")
+        loads.append(CompanyLoad(index, response.json()["auth_token"], options, stats))
+
+    started = time.perf_counter()
+    deadline = started + timeout
+    await asyncio.gather(
+        *(load.submit(client) for load in loads),
+        *(
+            load.run_machine(client, deadline, rng)
+            for load in loads
+            for _ in range(machines)
+        ),
+    )
+    duration = time.perf_counter() - started
+
+    results = [
+        {
+            "benchmark": "load_test",
+            "endpoint": endpoint,
+            "requests": len(latencies),
+            "errors": stats.errors[endpoint],
+            "error_rate": round(stats.errors[endpoint] / len(latencies), 4),
+            "requests_per_second": round(len(latencies) / duration, 2),
+            **_percentiles(latencies),
+            "status_codes": dict(stats.status_codes.get(endpoint, {})),
+        }
+        for endpoint, latencies in sorted(stats.latencies.items())
+        if endpoint != "POST /register"
+    ]
+    reported = sum(stats.tasks_reported.values())
+    results.append(
+        {
+            "benchmark": "load_test",
+            "endpoint": None,
+            "companies": companies,
+            "machines_per_company": machines,
+            "duration_s": round(duration, 3),
+            "tasks_submitted": companies * batches * batch_size,
+            "tasks_reported": reported,
+            "tasks_completed": stats.tasks_reported["COMPLETED"],
+            "tasks_failed": stats.tasks_reported["FAILED"],
+            "tasks_unreported": sum(len(load.created_at) for load in loads),
+            "tasks_per_second": round(reported / duration, 2),
+            **_percentiles(stats.task_latencies),
+        }
+    )
+    return results
+
+
+def run(base_url, **options):
+    """
+    Run the load against the server at `base_url`, see run_async.
+
+    Returns:
+        list: One result dict per endpoint, then one for the tasks
+    """
+
+    async def load():
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            timeout=options.get("wait", 5) + 60,
+            limits=httpx.Limits(max_connections=None),
+        ) as client:
+            return await run_async(client, **options)
+
+    return asyncio.run(load())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:7989")
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=1.0)
+    parser.add_argument("--machines", type=int, default=1)
+    parser.add_argument("--processing-ms", type=float, default=10)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-claim", dest="claim", action="store_false")
+    parser.add_argument("--wait", type=int, default=5)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    options = vars(args)
+    for result in run(options.pop("base_url"), **options):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Machine poll latency against a company_tasks table full of finished tasks.
+
+Seeds `--finished` COMPLETED tasks spread over `--companies` companies plus
+`--waiting` WAITING single invoice tasks for one of them, then times the
+waiting-task queries of a machine poll, first without the polling indexes
+and then with them. Prints one JSON object per run.
+
+Usage (from the server directory):
+    python -m benchmarks.machine_poll --database-url postgresql://... \\
+        --finished 2000000
+
+Use a scratch database: the tables are created if missing and the seeded
+rows are left in place, so later runs can pass --no-seed.
+"""
+
+import argparse
+import datetime
+import json
+import statistics
+import time
+import uuid
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from domain.company.models import Base as CompanyBase, CompanyModel
+from domain.task.models import (
+    Base as TaskBase,
+    CompanyTaskModel,
+    SingleInvoiceTaskDataModel,
+)
+from domain.task.schemas import SingleInvoiceAction, TaskStatus, TaskType
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+POLL_INDEXES = [
+    index
+    for index in CompanyTaskModel.__table__.indexes
+    if index.name
+    in (
+        "ix_company_tasks_company_status_type",
+        "ix_company_tasks_waiting",
+        "ix_company_tasks_processing_lease",
+    )
+]
+SEED_BATCH_SIZE = 10_000
+
+
+def _now():
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+def _seed_companies(session, count):
+    companies_uuid = [uuid.uuid4() for _ in range(count)]
+    session.execute(
+        insert(CompanyModel),
+        [
+            {
+                "company_uuid": company_uuid,
+                "name": f"Benchmark {company_uuid}",
+                "auth_token": str(uuid.uuid4()),
+                "created_at": _now(),
+            }
+            for company_uuid in companies_uuid
+        ],
+    )
+    session.commit()
+    return companies_uuid
+
+
+def _seed_finished_tasks(session, companies_uuid, count):
+    if session.bind.dialect.name == "postgresql":
+        # Generated server side; millions of rows in seconds
+        session.execute(
+            text(
+                "INSERT INTO company_tasks "
+                "(task_uuid, company_uuid, status, created_at, task_type, attempts) "
+                "SELECT gen_random_uuid(), "
+                "(CAST(:companies AS uuid[]))[1 + i % :company_count], "
+                ":status, now() - i * interval '1 second', :task_type, 1 "
+                "FROM generate_series(1, :count) AS i"
+            ),
+            {
+                "companies": [str(company_uuid) for company_uuid in companies_uuid],
+                "company_count": len(companies_uuid),
+                "status": TaskStatus.COMPLETED.value,
+                "task_type": TaskType.SINGLE_INVOICE_TASK.value,
+                "count": count,
+            },
+        )
+        session.commit()
+        return
+
+    created_at = _now()
+    for start in range(0, count, SEED_BATCH_SIZE):
+        session.execute(
+            insert(CompanyTaskModel),
+            [
+                {
+                    "task_uuid": uuid.uuid4(),
+                    "company_uuid": companies_uuid[i % len(companies_uuid)],
+                    "status": TaskStatus.COMPLETED.value,
+                    "created_at": created_at - datetime.timedelta(seconds=i),
+                    "task_type": TaskType.SINGLE_INVOICE_TASK.value,
+                    "attempts": 1,
+                }
+                for i in range(start, min(start + SEED_BATCH_SIZE, count))
+            ],
+        )
+        session.commit()
+
+
+def _seed_waiting_tasks(session, company_uuid, count):
+    tasks_uuid = [uuid.uuid4() for _ in range(count)]
+    session.execute(
+        insert(SingleInvoiceTaskDataModel),
+        [
+            {
+                "task_uuid": task_uuid,
+                "my_company_idno": "BENCH",
+                "person_name_certificate": "Benchmark",
+                "seria": f"BENCH-{company_uuid.hex[:8]}",
+                "number": number,
+                "action_type": SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            }
+            for number, task_uuid in enumerate(tasks_uuid)
+        ],
+    )
+    session.execute(
+        insert(CompanyTaskModel),
+        [
+            {
+                "task_uuid": task_uuid,
+                "company_uuid": company_uuid,
+                "status": TaskStatus.WAITING.value,
+                "created_at": _now(),
+                "task_type": TaskType.SINGLE_INVOICE_TASK.value,
+                "attempts": 0,
+            }
+            for task_uuid in tasks_uuid
+        ],
+    )
+    session.commit()
+
+
+def _time_polls(session, company_uuid, iterations):
+    repository = SQLAlchemyTaskRepository(session)
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        repository.get_structured_waiting_tasks_for_machine(company_uuid)
+        latencies.append((time.perf_counter() - started) * 1000)
+        session.rollback()
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def _poll_plan(session, company_uuid):
+    if session.bind.dialect.name != "postgresql":
+        return None
+    plan = session.execute(
+        text(
+            "EXPLAIN SELECT task_uuid FROM company_tasks "
+            "WHERE company_uuid = :company_uuid AND status = 'WAITING' "
+            "AND task_type = :task_type"
+        ),
+        {
+            "company_uuid": company_uuid,
+            "task_type": TaskType.SINGLE_INVOICE_TASK.value,
+        },
+    ).scalars()
+    return list(plan)
+
+
+def run(
+    database_url,
+    finished,
+    waiting,
+    companies,
+    iterations,
+    seed=True,
+    company_uuid=None,
+):
+    """
+    Seed the database and time the machine poll without and with indexes.
+
+    Returns:
+        list: One result dict per run, "indexes" telling which run it is
+    """
+    engine = create_engine(database_url)
+    CompanyBase.metadata.create_all(engine)
+    TaskBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        if seed:
+            companies_uuid = _seed_companies(session, companies)
+            _seed_finished_tasks(session, companies_uuid, finished)
+            company_uuid = companies_uuid[0]
+            _seed_waiting_tasks(session, company_uuid, waiting)
+        elif company_uuid is None:
+            raise ValueError("--company-uuid is required with --no-seed")
+
+        results = []
+        for with_indexes in (False, True):
+            for index in POLL_INDEXES:
+                if with_indexes:
+                    index.create(engine, checkfirst=True)
+                else:
+                    index.drop(engine, checkfirst=True)
+            with engine.connect() as connection:
+                if engine.dialect.name == "postgresql":
+                    connection.execute(text("ANALYZE company_tasks"))
+                    connection.commit()
+            results.append(
+                {
+                    "benchmark": "machine_poll",
+                    "dialect": engine.dialect.name,
+                    "indexes": with_indexes,
+                    "finished_tasks": finished,
+                    "waiting_tasks": waiting,
+                    "company_uuid": str(company_uuid),
+                    **_time_polls(session, company_uuid, iterations),
+                    "plan": _poll_plan(session, company_uuid),
+                }
+            )
+        return results
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--finished", type=int, default=2_000_000)
+    parser.add_argument("--waiting", type=int, default=100)
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    parser.add_argument("--company-uuid", type=uuid.UUID)
+    args = parser.parse_args()
+
+    for result in run(
+        args.database_url,
+        args.finished,
+        args.waiting,
+        args.companies,
+        args.iterations,
+        seed=args.seed,
+        company_uuid=args.company_uuid,
+    ):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
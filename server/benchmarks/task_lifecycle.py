@@ -0,0 +1,288 @@
+"""
+Throughput of the task lifecycle endpoints, driven in-process.
+
+Registers a company through /register, then times through the FastAPI app:
+batch creation of single invoice tasks at every `--sizes` size, machine
+polls of /machine/tasks over the resulting backlog, status queries of
+/tasks/status/singleInvoice and bulk PUT /tasks/status updates. Prints one
+JSON object per scenario and size; `--output` appends them to a JSON lines
+file, tagged with the git commit, to compare runs across commits.
+
+Usage (from the server directory):
+    python -m benchmarks.task_lifecycle --output benchmarks.jsonl
+    python -m benchmarks.task_lifecycle --database-url postgresql://... \\
+        --sizes 100 1000 10000
+
+Without --database-url a temporary SQLite database is used. A Postgres
+database should be a scratch one: tables are created if missing and the
+benchmark's tasks are left in place.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from domain.company.models import Base as CompanyBase
+from domain.task.models import Base as TaskBase
+from infrastructure.persistence.database_session import ThreadpoolDatabaseSession
+
+# main.py builds its own engine at import time; requests are routed to the
+# benchmark database through a get_db override instead
+for name, value in (
+    ("DB_HOST", "localhost"),
+    ("DB_PORT", "5432"),
+    ("DB_NAME", "eFactura"),
+    ("DB_USER", "benchmark"),
+    ("DB_PASSWORD", "benchmark"),
+):
+    os.environ.setdefault(name, value)
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+MACHINE_POLL_LIMIT = 100
+IDNO = "1002600012345"
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summary(latencies, items):
+    latencies = sorted(latencies)
+    mean_ms = statistics.fmean(latencies)
+    return {
+        "iterations": len(latencies),
+        "mean_ms": round(mean_ms, 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(latencies[-1], 3),
+        "items_per_second": round(items * 1000 / mean_ms, 1) if mean_ms else None,
+    }
+
+
+def _timed(send, iterations):
+    latencies = []
+    for iteration in range(iterations):
+        started = time.perf_counter()
+        response = send(iteration)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"{response.request.method} {response.request.url.path} "
+                f"failed with {response.status_code}: {response.text[:200]}"
+            )
+    return latencies
+
+
+def _seria(size, iteration):
+    return f"B{size}I{iteration}"
+
+
+def _invoices(size, iteration):
+    return [
+        {
+            "my_company_idno": IDNO,
+            "person_name_certificate": "Benchmark",
+            "seria": _seria(size, iteration),
+            "number": str(number),
+        }
+        for number in range(size)
+    ]
+
+
+def _test_client(engine):
+    from fastapi.testclient import TestClient
+    import main
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    async def get_db():
+        db = ThreadpoolDatabaseSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    main.app.dependency_overrides[main.get_db] = get_db
+    # Not entered as a context manager: the background jobs of the startup
+    # events would run against main.py's own database
+    return main.app, TestClient(main.app)
+
+
+def run(database_url=None, sizes=DEFAULT_SIZES, iterations=3, polls=20):
+    """
+    Time every lifecycle scenario at every batch size.
+
+    Args:
+        database_url: SQLAlchemy URL of a scratch database; a temporary
+            SQLite database when None
+        sizes: Invoices per request of the creation, status query and
+            status update scenarios
+        iterations: Requests timed per scenario and size
+        polls: Machine polls timed over the whole backlog
+
+    Returns:
+        list: One result dict per scenario and size
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if database_url is None:
+            database_url = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        engine = create_engine(
+            database_url,
+            connect_args=(
+                {"check_same_thread": False}
+                if database_url.startswith("sqlite")
+                else {}
+            ),
+        )
+        CompanyBase.metadata.create_all(engine)
+        TaskBase.metadata.create_all(engine)
+        app, client = _test_client(engine)
+        try:
+            return _run_scenarios(engine, client, sizes, iterations, polls)
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+def _run_scenarios(engine, client, sizes, iterations, polls):
+    response = client.post(
+        "/register", json={"name": f"Benchmark {uuid.uuid4().hex[:8]}"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['auth_token']}"}
+    base = {
+        "benchmark": "task_lifecycle",
+        "dialect": engine.dialect.name,
+        "commit": _commit(),
+        "recorded_at": datetime.datetime.now(datetime.UTC).isoformat(),
+    }
+
+    results = []
+    tasks_uuid = {}
+    for size in sizes:
+
+        def create(iteration):
+            response = client.post(
+                "/tasks/buyer/sign_single_invoice",
+                json={
+                    "action_type": "BuyerSignInvoice",
+                    "invoices": _invoices(size, iteration),
+                },
+                headers=headers,
+            )
+            tasks_uuid[(size, iteration)] = response.json().get("tasks_uuid")
+            return response
+
+        results.append(
+            {
+                **base,
+                "scenario": "create",
+                "size": size,
+                **_summary(_timed(create, iterations), size),
+            }
+        )
+
+    backlog = sum(sizes) * iterations
+    results.append(
+        {
+            **base,
+            "scenario": "machine_poll",
+            "size": MACHINE_POLL_LIMIT,
+            "backlog": backlog,
+            **_summary(
+                _timed(
+                    lambda _: client.get(
+                        "/machine/tasks",
+                        params={"limit": MACHINE_POLL_LIMIT},
+                        headers=headers,
+                    ),
+                    polls,
+                ),
+                MACHINE_POLL_LIMIT,
+            ),
+        }
+    )
+
+    for size in sizes:
+
+        def query_status(iteration):
+            return client.post(
+                "/tasks/status/singleInvoice",
+                json=[
+                    {
+                        "my_company_idno": IDNO,
+                        "seria": _seria(size, iteration),
+                        "number": str(number),
+                    }
+                    for number in range(size)
+                ],
+                headers=headers,
+            )
+
+        results.append(
+            {
+                **base,
+                "scenario": "status_query",
+                "size": size,
+                **_summary(_timed(query_status, iterations), size),
+            }
+        )
+
+    for size in sizes:
+
+        def update_status(iteration):
+            return client.put(
+                "/tasks/status",
+                json=[
+                    {"task_uuid": task_uuid, "status": "COMPLETED"}
+                    for task_uuid in tasks_uuid[(size, iteration)]
+                ],
+                headers=headers,
+            )
+
+        results.append(
+            {
+                **base,
+                "scenario": "status_update",
+                "size": size,
+                **_summary(_timed(update_status, iterations), size),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--output", help="JSON lines file the results are added to")
+    args = parser.parse_args()
+
+    results = run(args.database_url, args.sizes, args.iterations, args.polls)
+    for result in results:
+        print(json.dumps(result))
+    if args.output:
+        with open(args.output, "a") as output:
+            for result in results:
+                output.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
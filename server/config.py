@@ -11,8 +11,74 @@ class Config:
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     SECRET_KEY = os.getenv("SECRET_KEY")
+    # Connection pool of each engine; requests beyond pool_size + max_overflow
+    # wait up to pool_timeout seconds for a connection
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # Serve requests through SQLAlchemy's asyncio extension and asyncpg
+    DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
     TOKEN_EXPIRATION = int(os.getenv("TOKEN_EXPIRATION", 3600))
+    MACHINE_CLAIM_LIMIT = int(os.getenv("MACHINE_CLAIM_LIMIT", 100))
+    MACHINE_TASKS_PAGE_SIZE = int(os.getenv("MACHINE_TASKS_PAGE_SIZE", 100))
+    TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", 900))
+    TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 3))
+    TASK_REAPER_INTERVAL = int(os.getenv("TASK_REAPER_INTERVAL", 60))
+    MACHINE_LONG_POLL_MAX_WAIT = int(os.getenv("MACHINE_LONG_POLL_MAX_WAIT", 60))
+    TASK_STATUS_EVENTS_RETENTION = int(
+        os.getenv("TASK_STATUS_EVENTS_RETENTION", 7 * 24 * 3600)
+    )
+    # Retried task creation requests with the same Idempotency-Key get the
+    # original response for this many seconds
+    IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 3600))
+    # A request still without a response after this many seconds is
+    # considered dead and a retry with its key processes it again
+    IDEMPOTENCY_CLAIM_TIMEOUT = int(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT", 300))
+    # Bulk imports create their tasks every IMPORT_CHUNK_SIZE lines
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+    IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", 64 * 1024))
+    TASK_STATUS_STREAM_KEEPALIVE = int(os.getenv("TASK_STATUS_STREAM_KEEPALIVE", 15))
+    TASK_ARCHIVE_INTERVAL = int(os.getenv("TASK_ARCHIVE_INTERVAL", 3600))
+    TASK_ARCHIVE_RETENTION_DAYS = int(os.getenv("TASK_ARCHIVE_RETENTION_DAYS", 90))
+    TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", 5000))
+    TASK_ARCHIVE_DIR = os.getenv("TASK_ARCHIVE_DIR", "archive")
+    TASK_PARTITIONS_AHEAD = int(os.getenv("TASK_PARTITIONS_AHEAD", 3))
+    AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", 60))
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+    AUTH_TOKEN_INVALIDATION_SYNC = float(os.getenv("AUTH_TOKEN_INVALIDATION_SYNC", 1))
+    # Responses of at least GZIP_MINIMUM_SIZE bytes are gzipped for clients
+    # sending Accept-Encoding: gzip
+    GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1000))
+    GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", 6))
+    # Requests running more SQL statements than this are logged as a warning
+    # (0 disables); DB_QUERY_HEADERS adds the count to every response
+    DB_QUERY_BUDGET = int(os.getenv("DB_QUERY_BUDGET", 50))
+    DB_QUERY_HEADERS = os.getenv("DB_QUERY_HEADERS", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # Token buckets of every company: requests per second and burst of task
+    # creation, status queries and machine polling (a rate of 0 disables the
+    # budget). RATE_LIMIT_STORE=database shares the buckets between workers
+    RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+    RATE_LIMIT_WRITE_RATE = float(os.getenv("RATE_LIMIT_WRITE_RATE", 5))
+    RATE_LIMIT_WRITE_BURST = int(os.getenv("RATE_LIMIT_WRITE_BURST", 20))
+    RATE_LIMIT_STATUS_RATE = float(os.getenv("RATE_LIMIT_STATUS_RATE", 20))
+    RATE_LIMIT_STATUS_BURST = int(os.getenv("RATE_LIMIT_STATUS_BURST", 60))
+    RATE_LIMIT_MACHINE_RATE = float(os.getenv("RATE_LIMIT_MACHINE_RATE", 5))
+    RATE_LIMIT_MACHINE_BURST = int(os.getenv("RATE_LIMIT_MACHINE_BURST", 20))
 
     @property
     def SQLALCHEMY_DATABASE_URI(self):
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self):
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -1,5 +1,15 @@
 import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
 import uuid
@@ -16,3 +26,40 @@ class CompanyModel(Base):
     created_at = Column(
         DateTime, nullable=False, default=datetime.datetime.now(datetime.UTC)
     )
+
+
+class AuthTokenInvalidationModel(Base):
+    __tablename__ = "auth_token_invalidations"
+
+    invalidation_id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    auth_token = Column(String(255), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    # Id of the recording transaction on Postgres, the token caches' sync key
+    transaction_id = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_auth_token_invalidations_created_at", "created_at"),
+        Index(
+            "ix_auth_token_invalidations_transaction",
+            "transaction_id",
+            "invalidation_id",
+        ),
+    )
+
+
+class RateLimitBucketModel(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    company_uuid = Column(
+        UUID(as_uuid=True), ForeignKey(CompanyModel.company_uuid), primary_key=True
+    )
+    budget = Column(String(50), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time, compared across the workers sharing the bucket
+    refilled_at = Column(Float, nullable=False)
+    # Outcome of the last take, returned by the same atomic upsert
+    granted = Column(Boolean, nullable=False)
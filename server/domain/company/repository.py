@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional, Tuple
 from domain.company.company import Company
 
 
@@ -16,3 +16,19 @@ class CompanyRepository(ABC):
     @abstractmethod
     def update_company(self, company: Company) -> None:
         pass
+
+    @abstractmethod
+    def replace_auth_token(
+        self, company: Company, revoked_token: str, retention: float
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def get_token_invalidations(
+        self, after: Tuple[int, int]
+    ) -> List[Tuple[Tuple[int, int], str]]:
+        pass
+
+    @abstractmethod
+    def get_token_invalidation_cursor(self) -> Tuple[int, int]:
+        pass
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+
+
+class TokenCache(ABC):
+    # Seconds a cached token may still be accepted after it was revoked
+    ttl: float
+
+    @abstractmethod
+    def invalidate(self, auth_token: str) -> None:
+        pass
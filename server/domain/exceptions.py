@@ -11,13 +11,12 @@ class BusinessException(Exception):
         self.code = code
 
 
-class DuplicateTaskException(Exception):
+class DuplicateTaskException(BusinessException):
     """Raised when duplicate tasks are found"""
 
     def __init__(self, message: str, duplicates: List[dict] = None):
-        self.message = message
+        super().__init__(message, "DUPLICATE_TASKS")
         self.duplicates = duplicates
-        super().__init__(self.message)
 
 
 class TaskExistsException(BusinessException):
@@ -35,19 +34,56 @@ class InvalidStatusException(BusinessException):
         super().__init__(message, "INVALID_STATUS")
 
 
+class InvalidCursorException(BusinessException):
+    """Raised when a pagination cursor cannot be decoded"""
+
+    def __init__(self, message: str):
+        super().__init__(message, "INVALID_CURSOR")
+
+
+class IdempotencyKeyReusedException(BusinessException):
+    """Raised when an idempotency key is sent again with a different request"""
+
+    def __init__(self, message: str):
+        super().__init__(message, "IDEMPOTENCY_KEY_REUSED")
+
+
+class IdempotencyKeyInProgressException(BusinessException):
+    """Raised when the request first sent with an idempotency key is still running"""
+
+    def __init__(self, message: str):
+        super().__init__(message, "IDEMPOTENCY_KEY_IN_PROGRESS")
+
+
+class RateLimitExceededException(BusinessException):
+    """Raised when a company exceeds one of its request budgets"""
+
+    def __init__(self, message: str, budget: str, retry_after: float):
+        super().__init__(message, "RATE_LIMITED")
+        self.budget = budget
+        self.retry_after = retry_after
+
+
 class TaskNotOwnedException(BusinessException):
     """Raised when tasks don't belong to company"""
 
-    def __init__(self, message: str):
+    def __init__(self, message: str, task_details: list = None):
         super().__init__(message, "TASK_NOT_OWNED")
+        self.task_details = task_details
 
 
 class TaskNotFoundException(BusinessException):
     """Raised when task is not found"""
 
-    def __init__(self, message: str, task_uuid: uuid.UUID):
+    def __init__(
+        self,
+        message: str,
+        task_uuid: uuid.UUID,
+        tasks_uuid: List[uuid.UUID] = None,
+    ):
         super().__init__(message, "TASK_NOT_FOUND")
         self.task_uuid = task_uuid
+        self.tasks_uuid = tasks_uuid or [task_uuid]
 
 
 class DatabaseException(BusinessException):
@@ -1,5 +1,16 @@
 import datetime
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
 import uuid
@@ -41,7 +52,78 @@ class CompanyTaskModel(Base):
         UUID(as_uuid=True), ForeignKey(CompanyModel.company_uuid), nullable=False
     )
     status = Column(String(50), nullable=False)
+    # Partition key of company_tasks on Postgres: evaluated per row
     created_at = Column(
-        DateTime, nullable=False, default=datetime.datetime.now(datetime.UTC)
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
     )
     task_type = Column(String(50), nullable=False)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    __table_args__ = (
+        Index(
+            "ix_company_tasks_company_status_type",
+            "company_uuid",
+            "status",
+            "task_type",
+        ),
+        # Machine polls and claims only look at the (few) waiting tasks
+        Index(
+            "ix_company_tasks_waiting",
+            "company_uuid",
+            "task_type",
+            "created_at",
+            "task_uuid",
+            postgresql_where=text("status = 'WAITING'"),
+            sqlite_where=text("status = 'WAITING'"),
+        ),
+        # The lease reaper only looks at the tasks being processed
+        Index(
+            "ix_company_tasks_processing_lease",
+            "lease_expires_at",
+            postgresql_where=text("status = 'PROCESSING'"),
+            sqlite_where=text("status = 'PROCESSING'"),
+        ),
+    )
+
+
+class TaskStatusEventModel(Base):
+    __tablename__ = "task_status_events"
+
+    event_id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    company_uuid = Column(UUID(as_uuid=True), nullable=False)
+    task_uuid = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String(50), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    # Id of the logging transaction on Postgres, the stream's ordering key
+    transaction_id = Column(BigInteger, nullable=False, default=0)
+    __table_args__ = (
+        Index(
+            "ix_task_status_events_company_transaction",
+            "company_uuid",
+            "transaction_id",
+            "event_id",
+        ),
+        Index("ix_task_status_events_created_at", "created_at"),
+    )
+
+
+# Response of a task creation request, replayed to retries with the same key
+class IdempotencyKeyModel(Base):
+    __tablename__ = "idempotency_keys"
+
+    company_uuid = Column(
+        UUID(as_uuid=True), ForeignKey(CompanyModel.company_uuid), primary_key=True
+    )
+    idempotency_key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # NULL while the original request is still being processed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    __table_args__ = (Index("ix_idempotency_keys_created_at", "created_at"),)
@@ -1,8 +1,10 @@
+import datetime
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, List, Optional, Set, Tuple
 import uuid
 from domain.task.models import MultipleInvoicesTaskDataModel, SingleInvoiceTaskDataModel
 from domain.task.schemas import (
+    IdempotencyRecord,
     MultipleInvoicesAction,
     MultipleInvoicesIdentifier,
     MultipleInvoicesResponse,
@@ -11,7 +13,9 @@ from domain.task.schemas import (
     SingleInvoiceResponse,
     SingleInvoiceStatusRequest,
     TaskStatus,
+    TaskStatusEvent,
     TaskStatusResponse,
+    TaskLeaseRenewalRequest,
     TaskStatusUpdateByUUIDRequest,
     TaskType,
 )
@@ -30,10 +34,37 @@ class TaskRepository(ABC):
     ) -> MultipleInvoicesTaskDataModel:
         pass
 
+    @abstractmethod
+    def create_single_invoice_tasks(
+        self,
+        company_uuid: uuid.UUID,
+        action_type: SingleInvoiceAction,
+        invoices: List[SingleInvoiceIdentifier],
+    ) -> List[uuid.UUID]:
+        pass
+
+    @abstractmethod
+    def bulk_load_single_invoice_tasks(
+        self,
+        company_uuid: uuid.UUID,
+        action_type: SingleInvoiceAction,
+        invoices: List[SingleInvoiceIdentifier],
+    ) -> List[Optional[uuid.UUID]]:
+        pass
+
+    @abstractmethod
+    def create_multiple_invoices_tasks(
+        self,
+        company_uuid: uuid.UUID,
+        action_type: MultipleInvoicesAction,
+        invoices: List[MultipleInvoicesIdentifier],
+    ) -> List[uuid.UUID]:
+        pass
+
     @abstractmethod
     def get_single_invoice_tasks_status(
-        self, tasks: List[SingleInvoiceIdentifier]
-    ) -> List[TaskStatusResponse]:
+        self, company_uuid: uuid.UUID, tasks: List[SingleInvoiceStatusRequest]
+    ) -> TaskStatusResponse:
         pass
 
     @abstractmethod
@@ -46,7 +77,7 @@ class TaskRepository(ABC):
     def update_tasks_status(
         self,
         updated_tasks_data: List[TaskStatusUpdateByUUIDRequest],
-    ) -> None:
+    ) -> int:
         pass
 
     @abstractmethod
@@ -61,12 +92,121 @@ class TaskRepository(ABC):
     ) -> List[MultipleInvoicesResponse]:
         pass
 
+    @abstractmethod
+    def get_structured_waiting_tasks_for_machine(
+        self,
+        company_uuid: uuid.UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime.datetime, uuid.UUID]] = None,
+    ) -> Tuple[dict, Optional[Tuple[datetime.datetime, uuid.UUID]]]:
+        pass
+
+    @abstractmethod
+    def claim_waiting_tasks_for_machine(
+        self,
+        company_uuid: uuid.UUID,
+        limit: int,
+        lease_expires_at: datetime.datetime,
+    ) -> dict:
+        pass
+
+    @abstractmethod
+    def renew_task_leases(
+        self,
+        company_uuid: uuid.UUID,
+        tasks: List[TaskLeaseRenewalRequest],
+        lease_expires_at: datetime.datetime,
+    ) -> List[uuid.UUID]:
+        pass
+
+    @abstractmethod
+    def requeue_expired_tasks(self, now: datetime.datetime, max_attempts: int) -> int:
+        pass
+
+    @abstractmethod
+    def get_task_status_events(
+        self, company_uuid: uuid.UUID, after: Tuple[int, int], limit: int
+    ) -> Tuple[List[TaskStatusEvent], bool]:
+        pass
+
+    @abstractmethod
+    def get_task_status_event_cursor(
+        self, company_uuid: uuid.UUID, event_id: Optional[int] = None
+    ) -> Tuple[int, int]:
+        pass
+
+    @abstractmethod
+    def count_tasks_by_status(self, statuses: List[TaskStatus]) -> List[dict]:
+        pass
+
+    @abstractmethod
+    def delete_task_status_events_before(self, cutoff: datetime.datetime) -> int:
+        pass
+
+    @abstractmethod
+    def claim_idempotency_key(
+        self,
+        company_uuid: uuid.UUID,
+        idempotency_key: str,
+        request_hash: str,
+        now: datetime.datetime,
+        expired_before: Optional[datetime.datetime] = None,
+    ) -> Optional[IdempotencyRecord]:
+        pass
+
+    @abstractmethod
+    def save_idempotent_response(
+        self,
+        company_uuid: uuid.UUID,
+        idempotency_key: str,
+        claimed_at: datetime.datetime,
+        response_status: int,
+        response_body: str,
+    ):
+        pass
+
+    @abstractmethod
+    def release_idempotency_key(
+        self,
+        company_uuid: uuid.UUID,
+        idempotency_key: str,
+        claimed_at: datetime.datetime,
+    ):
+        pass
+
+    @abstractmethod
+    def delete_idempotency_keys_before(self, cutoff: datetime.datetime) -> int:
+        pass
+
+    @abstractmethod
+    def archive_finished_tasks(
+        self,
+        cutoff: datetime.datetime,
+        limit: int,
+        export: Callable[[List[dict]], None],
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def ensure_task_partitions(self, until: datetime.date) -> List[str]:
+        pass
+
+    @abstractmethod
+    def drop_empty_task_partitions(self, before: datetime.date) -> List[str]:
+        pass
+
     @abstractmethod
     def single_invoice_entry_exists(
         self, my_company_idno: str, seria: str, number: int
     ) -> bool:
         pass
 
+    @abstractmethod
+    def get_existing_single_invoice_entries(
+        self, invoice_keys: List[Tuple[str, str, str]]
+    ) -> Set[Tuple[str, str, str]]:
+        pass
+
     @abstractmethod
     def create_company_task(
         self,
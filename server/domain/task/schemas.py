@@ -29,6 +29,13 @@ class TaskStatus(str, Enum):
     USB_NOT_FOUND = "USB_NOT_FOUND"
 
 
+def validate_invoice_number(v: str) -> str:
+    # number is stored as an integer column, so it must be one
+    if not (v.isascii() and v.isdigit()):
+        raise ValueError(f"number must be an integer, got {v!r}")
+    return v
+
+
 class SignatureType(str, Enum):
     LONG = "LONG"
     SHORT = "SHORT"
@@ -54,6 +61,8 @@ class SingleInvoiceData(BaseModel):
     seria: str
     number: str
 
+    _validate_number = validator("number", allow_reuse=True)(validate_invoice_number)
+
 
 class SingleInvoiceTaskRequest(BaseModel):
     action_type: str
@@ -77,6 +86,8 @@ class SingleInvoiceStatusRequest(BaseModel):
     seria: str
     number: str
 
+    _validate_number = validator("number", allow_reuse=True)(validate_invoice_number)
+
 
 class MultipleInvoicesStatusRequest(BaseModel):
     my_company_idno: str
@@ -85,6 +96,9 @@ class MultipleInvoicesStatusRequest(BaseModel):
 class TaskStatusUpdateByUUIDRequest(BaseModel):
     task_uuid: UUID
     status: str
+    # Claim the result comes from, as handed out with the task; 0 for tasks
+    # that were never claimed
+    attempt: int = Field(0, ge=0)
 
     @validator("status")
     def validate_status(cls, v):
@@ -93,6 +107,12 @@ class TaskStatusUpdateByUUIDRequest(BaseModel):
         return v
 
 
+class TaskLeaseRenewalRequest(BaseModel):
+    task_uuid: UUID
+    # Claim whose lease is renewed, as handed out with the task
+    attempt: int = Field(..., ge=1)
+
+
 class TaskStatusItem(BaseModel):
     my_company_idno: str
     seria: str
@@ -149,6 +169,21 @@ class MultipleInvoicesTaskDetail(BaseModel):
     action_type: str
 
 
+class TaskStatusEvent(BaseModel):
+    event_id: int
+    # Orders the events by the transaction that logged them (0 on SQLite)
+    transaction_id: int
+    task_uuid: UUID
+    status: TaskStatus
+    created_at: datetime.datetime
+
+
+class IdempotencyRecord(BaseModel):
+    request_hash: str
+    response_status: Optional[int]
+    response_body: Optional[str]
+
+
 class MachineTasksResponse(BaseModel):
     SingleInvoiceTask: Dict[str, Dict[str, List[SingleInvoiceTaskDetail]]]
     MultipleInvoicesTask: List[MultipleInvoicesTaskDetail]
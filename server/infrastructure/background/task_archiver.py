@@ -0,0 +1,141 @@
+import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from application.task_service import TaskService
+from domain.exceptions import DatabaseException
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+
+class TaskArchiveFile:
+    """
+    Gzip-compressed NDJSON file receiving archived tasks, one per line.
+
+    The file is only created once the first batch arrives, and every batch is
+    flushed before its tasks are deleted from the database.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def write(self, tasks: List[dict]):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = gzip.open(self.path, "at", encoding="utf-8")
+        for task in tasks:
+            self._file.write(json.dumps(task, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TaskArchiver:
+    """
+    Background worker archiving finished tasks and managing task partitions.
+
+    Each sweep exports finished tasks older than `retention_days` to a new
+    gzip NDJSON file in `archive_dir` and deletes them, then creates the
+    company_tasks partitions of the coming months and drops the emptied old
+    ones. A retention of 0 disables archiving and partition dropping, but
+    partitions are still created ahead.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: int,
+        retention_days: int,
+        batch_size: int,
+        archive_dir: str,
+        partitions_ahead: int,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.archive_dir = archive_dir
+        self.partitions_ahead = partitions_ahead
+        self.logger = logging.getLogger(__name__)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> Optional[str]:
+        """
+        Run a single sweep.
+
+        Returns:
+            Optional[str]: Path of the archive file written, None if no task
+                was archived
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        now = datetime.datetime.now(datetime.UTC)
+        archive_file = TaskArchiveFile(
+            os.path.join(
+                self.archive_dir,
+                f"company_tasks_{now.strftime('%Y%m%dT%H%M%S%f')}.ndjson.gz",
+            )
+        )
+        db = self.session_factory()
+        try:
+            service = TaskService(SQLAlchemyTaskRepository(db))
+            archived = 0
+            if self.retention_days > 0:
+                try:
+                    archived = service.archive_finished_tasks(
+                        self.retention_days, self.batch_size, archive_file.write
+                    )
+                finally:
+                    archive_file.close()
+                if archived:
+                    self.logger.info(
+                        f"Archived {archived} finished tasks to {archive_file.path}"
+                    )
+
+            _, dropped = service.maintain_task_partitions(
+                self.partitions_ahead, self.retention_days or None
+            )
+            if dropped:
+                self.logger.info(f"Dropped task partitions: {', '.join(dropped)}")
+
+            return archive_file.path if archived else None
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except DatabaseException as e:
+                self.logger.error(f"Failed to archive tasks: {e.details}")
+            except OSError as e:
+                self.logger.error(f"Failed to write task archive: {e}")
+
+    def start(self):
+        """Start sweeping every `interval` seconds in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="task-archiver", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sweeping thread and wait for the current sweep to finish"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,89 @@
+import logging
+import threading
+from typing import Callable, Optional, Sequence
+from sqlalchemy.orm import Session
+from application.task_service import TaskService
+from domain.exceptions import DatabaseException
+from infrastructure.notifications.task_notifier import TaskNotifier
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+
+class TaskLeaseReaper:
+    """
+    Background worker requeueing tasks whose machine lease has expired.
+
+    Each sweep also trims the task status log to its retention window and
+    deletes expired idempotency keys, when those windows are given.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: int,
+        max_attempts: int,
+        task_notifiers: Sequence[TaskNotifier] = (),
+        status_events_retention: Optional[int] = None,
+        idempotency_key_ttl: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.task_notifiers = task_notifiers
+        self.status_events_retention = status_events_retention
+        self.idempotency_key_ttl = idempotency_key_ttl
+        self.logger = logging.getLogger(__name__)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> int:
+        """
+        Run a single sweep over the expired leases.
+
+        Returns:
+            int: Number of tasks released
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        db = self.session_factory()
+        try:
+            service = TaskService(SQLAlchemyTaskRepository(db))
+            released = service.requeue_expired_tasks(self.max_attempts)
+            if self.status_events_retention is not None:
+                service.prune_task_status_events(self.status_events_retention)
+            if self.idempotency_key_ttl is not None:
+                service.prune_idempotency_keys(self.idempotency_key_ttl)
+            return released
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                released = self.run_once()
+                if released:
+                    self.logger.info(f"Released {released} tasks with expired lease")
+                    for task_notifier in self.task_notifiers:
+                        task_notifier.notify_all()
+            except DatabaseException as e:
+                self.logger.error(f"Failed to release expired tasks: {e.details}")
+
+    def start(self):
+        """Start sweeping every `interval` seconds in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="task-lease-reaper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sweeping thread and wait for the current sweep to finish"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from domain.company.company import Company
+from domain.company.repository import CompanyRepository
+from domain.company.token_cache import TokenCache
+
+
+class CompanyTokenCache(TokenCache):
+    """
+    In-process auth token -> Company cache with a TTL and a bounded LRU size.
+
+    Entries live at most `ttl` seconds; once `max_size` tokens are cached the
+    least recently used one is evicted. Tokens regenerated by this process are
+    dropped at once through `invalidate`. Tokens regenerated by other workers
+    are recorded in the shared invalidation log, which `sync` reads at most
+    every `sync_interval` seconds, bounding how long another worker may keep
+    accepting an old token.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        sync_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Company]]" = OrderedDict()
+        self._invalidation_cursor: Optional[Tuple[int, int]] = None
+        self._next_sync_at = 0.0
+
+    def get(self, auth_token: str) -> Optional[Company]:
+        """Return the cached company of the token, None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(auth_token)
+            if entry is None:
+                return None
+            expires_at, company = entry
+            if expires_at <= self._clock():
+                del self._entries[auth_token]
+                return None
+            self._entries.move_to_end(auth_token)
+            return company
+
+    def put(self, auth_token: str, company: Company):
+        """Cache the company of the token, evicting the least recently used one"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[auth_token] = (self._clock() + self.ttl, company)
+            self._entries.move_to_end(auth_token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, auth_token: str):
+        """Drop the token from this process' cache"""
+        with self._lock:
+            self._entries.pop(auth_token, None)
+
+    def clear(self):
+        """Drop every cached token"""
+        with self._lock:
+            self._entries.clear()
+
+    def sync_due(self) -> bool:
+        """Tell whether the shared invalidation log should be read again"""
+        with self._lock:
+            return self._clock() >= self._next_sync_at
+
+    def sync(self, repository: CompanyRepository):
+        """
+        Drop the tokens invalidated by other workers since the last sync.
+
+        The log is followed on a (transaction_id, invalidation_id) cursor,
+        the order invalidations commit in (see get_token_invalidations). The
+        first sync only records the position in the invalidation log: tokens
+        invalidated before that could not have been cached since.
+
+        Args:
+            repository: Repository giving access to the invalidation log
+
+        Raises:
+            DatabaseException: If there's an error querying the database
+        """
+        with self._lock:
+            cursor = self._invalidation_cursor
+            self._next_sync_at = self._clock() + self.sync_interval
+
+        if cursor is None:
+            cursor = repository.get_token_invalidation_cursor()
+            invalidations = []
+        else:
+            invalidations = repository.get_token_invalidations(cursor)
+
+        with self._lock:
+            for invalidation_cursor, auth_token in invalidations:
+                self._entries.pop(auth_token, None)
+                cursor = max(cursor, invalidation_cursor)
+            if self._invalidation_cursor is None or cursor > self._invalidation_cursor:
+                self._invalidation_cursor = cursor
@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Type
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Checkout statistics of a SQLAlchemy connection pool.
+
+    Counters are fed by a pool class built with `instrument`, which times
+    every checkout, including the time spent waiting for a free connection
+    once pool_size + max_overflow connections are in use. Gauges are read
+    from the pool itself when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+        self.overflow_max = 0
+
+    def instrument(self, pool_class: Type[QueuePool] = QueuePool) -> Type[QueuePool]:
+        """
+        Build a subclass of `pool_class` reporting its checkouts here.
+
+        Args:
+            pool_class: QueuePool or one of its subclasses, such as
+                AsyncAdaptedQueuePool for asyncio engines
+
+        Returns:
+            Type[QueuePool]: Pool class to pass as create_engine's poolclass
+        """
+        metrics = self
+
+        class InstrumentedPool(pool_class):
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    connection = super()._do_get()
+                except exc.TimeoutError:
+                    metrics._record_timeout(time.perf_counter() - started)
+                    raise
+                metrics._record_checkout(time.perf_counter() - started, self)
+                return connection
+
+        InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+        return InstrumentedPool
+
+    def _record_checkout(self, wait_seconds: float, pool: QueuePool):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds_total += wait_seconds
+            self.checkout_wait_seconds_max = max(
+                self.checkout_wait_seconds_max, wait_seconds
+            )
+            self.overflow_max = max(self.overflow_max, pool.overflow())
+
+    def _record_timeout(self, wait_seconds: float):
+        with self._lock:
+            self.checkout_timeouts += 1
+            self.checkout_wait_seconds_total += wait_seconds
+            self.checkout_wait_seconds_max = max(
+                self.checkout_wait_seconds_max, wait_seconds
+            )
+
+    def snapshot(self, pool: Pool) -> dict:
+        """
+        Return the pool's current gauges together with the checkout counters.
+
+        Args:
+            pool: Pool of the instrumented engine (engine.pool)
+
+        Returns:
+            dict: Metrics by name; gauges are None for pools without a queue
+        """
+        is_queue_pool = isinstance(pool, QueuePool)
+        with self._lock:
+            return {
+                "pool_size": pool.size() if is_queue_pool else None,
+                "checked_out": pool.checkedout() if is_queue_pool else None,
+                "checked_in": pool.checkedin() if is_queue_pool else None,
+                # Negative while the pool is still filling up to pool_size
+                "overflow": pool.overflow() if is_queue_pool else None,
+                "overflow_max": self.overflow_max,
+                "checkouts_total": self.checkouts,
+                "checkout_timeouts_total": self.checkout_timeouts,
+                "checkout_wait_seconds_total": self.checkout_wait_seconds_total,
+                "checkout_wait_seconds_max": self.checkout_wait_seconds_max,
+            }
@@ -0,0 +1,142 @@
+import math
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from a cached auth lookup to a slow bulk import
+DEFAULT_SECONDS_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _sample(name: str, labels: Dict[str, object], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    formatted = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+    return f"{name}{{{formatted}}} {_format_value(value)}"
+
+
+class MetricFamily:
+    """
+    Metric with a fixed set of label names, rendered in the Prometheus text
+    exposition format.
+
+    Values are kept per tuple of label values and are safe to update from any
+    thread. Counters and gauges only differ by their TYPE line.
+    """
+
+    def __init__(self, name: str, documentation: str, metric_type: str, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.label_names: Tuple[str, ...] = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, label_values: Sequence = (), amount: float = 1):
+        """Add `amount` to the value of the labelled series"""
+        with self._lock:
+            key = tuple(label_values)
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, label_values: Sequence = (), value: float = 0):
+        """Set the value of the labelled series"""
+        with self._lock:
+            self._values[tuple(label_values)] = value
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:
+        """Return the exposition lines of the family"""
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            _sample(self.name, dict(zip(self.label_names, key)), value)
+            for key, value in values
+        ]
+
+
+def counter(name: str, documentation: str, label_names=()) -> MetricFamily:
+    return MetricFamily(name, documentation, "counter", label_names)
+
+
+def gauge(name: str, documentation: str, label_names=()) -> MetricFamily:
+    return MetricFamily(name, documentation, "gauge", label_names)
+
+
+class Histogram(MetricFamily):
+    """Cumulative histogram with fixed buckets, per tuple of label values"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names=(),
+        buckets: Iterable[float] = DEFAULT_SECONDS_BUCKETS,
+    ):
+        super().__init__(name, documentation, "histogram", label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per series: [count per bucket..., sum]
+        self._series: Dict[Tuple, List[float]] = {}
+
+    def observe(self, label_values: Sequence, value: float):
+        """Count `value` in the labelled series"""
+        with self._lock:
+            series = self._series.setdefault(
+                tuple(label_values), [0] * len(self.buckets) + [0.0]
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = self._header()
+        for key, values in series:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(
+                    _sample(
+                        f"{self.name}_bucket",
+                        {**labels, "le": _format_value(bound)},
+                        cumulative,
+                    )
+                )
+            lines.append(_sample(f"{self.name}_sum", labels, values[-1]))
+            lines.append(_sample(f"{self.name}_count", labels, cumulative))
+        return lines
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """Render metric families as a Prometheus text exposition document"""
+    return "".join(line + "\n" for family in families for line in family.render())
@@ -0,0 +1,61 @@
+import logging
+from typing import Iterable
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from infrastructure.monitoring.query_metrics import track_queries
+
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware flagging requests that run too many SQL statements.
+
+    A request issuing one query per submitted item shows up here long before
+    it shows up in latencies: requests running more than `budget` statements
+    of the instrumented engines are logged as a warning, with their route.
+    With `expose_headers`, every response also carries the statements run
+    and the time spent in them until the response started, as
+    X-DB-Query-Count and X-DB-Query-Time (in milliseconds).
+
+    Long-lived endpoints querying as they go, such as streams, are excluded
+    with `exclude_paths`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budget: int,
+        expose_headers: bool = False,
+        exclude_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.budget = budget
+        self.expose_headers = expose_headers
+        self.exclude_paths = frozenset(exclude_paths)
+        self.logger = logging.getLogger(__name__)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as query_stats:
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(query_stats.count)
+                    headers["X-DB-Query-Time"] = f"{query_stats.seconds * 1000:.1f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                if self.budget > 0 and query_stats.count > self.budget:
+                    route = scope.get("route")
+                    self.logger.warning(
+                        f"{scope['method']} "
+                        f"{route.path if route is not None else scope['path']} "
+                        f"ran {query_stats.count} SQL statements "
+                        f"({query_stats.seconds * 1000:.1f} ms), "
+                        f"over the budget of {self.budget}"
+                    )
@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Number and total duration of the SQL statements run within a block"""
+
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        # Only kept on demand, e.g. to report the queries of a failing test
+        self.statements: List[str] = []
+        self.record_statements = record_statements
+
+
+# Stats of the blocks being tracked, innermost last. The objects themselves
+# are shared with the threadpool and asyncio greenlets running the request's
+# database work, which only get a copy of the context.
+_current_query_stats: ContextVar[Tuple[QueryStats, ...]] = ContextVar(
+    "current_query_stats", default=()
+)
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Count the statements executed by instrumented engines within the block.
+
+    Blocks can be nested, every enclosing block counts the statements too.
+
+    Args:
+        record_statements: Also keep the SQL of every statement
+
+    Yields:
+        QueryStats: Stats updated as statements complete
+    """
+    stats = QueryStats(record_statements)
+    token = _current_query_stats.set(_current_query_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _record_query(conn, statement: str):
+    seconds = time.perf_counter() - conn.info["query_started_at"].pop()
+    for stats in _current_query_stats.get():
+        stats.count += 1
+        stats.seconds += seconds
+        if stats.record_statements:
+            stats.statements.append(statement)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn, statement)
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        _record_query(connection, exception_context.statement)
+
+
+def instrument_engine(engine: Engine):
+    """
+    Report the statements of `engine` to the blocks tracking them.
+
+    Args:
+        engine: Sync engine, or the sync_engine of an AsyncEngine; engines
+            already instrumented are left as they are
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,103 @@
+import time
+from typing import List
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from infrastructure.monitoring.prometheus import Histogram, MetricFamily, counter
+from infrastructure.monitoring.query_metrics import track_queries
+
+# Statements per request, from a cached auth lookup to a chunked bulk import
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+
+class RequestMetrics:
+    """
+    Latency, status codes and database usage of the served requests.
+
+    Requests are labelled with their route template (e.g. /machine/tasks),
+    never the raw path, so the number of series stays bounded; requests
+    matching no route are labelled "unmatched".
+    """
+
+    def __init__(self):
+        self.duration = Histogram(
+            "http_request_duration_seconds",
+            "Time spent serving requests, including streamed bodies",
+            ("method", "route"),
+        )
+        self.requests = counter(
+            "http_requests_total",
+            "Served requests by status code",
+            ("method", "route", "status"),
+        )
+        self.queries = Histogram(
+            "http_request_db_queries",
+            "SQL statements executed per request",
+            ("method", "route"),
+            buckets=QUERY_COUNT_BUCKETS,
+        )
+        self.query_duration = Histogram(
+            "http_request_db_query_duration_seconds",
+            "Time spent in SQL statements per request",
+            ("method", "route"),
+        )
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        seconds: float,
+        queries: int,
+        query_seconds: float,
+    ):
+        """Record one served request"""
+        labels = (method, route)
+        self.duration.observe(labels, seconds)
+        self.requests.inc((method, route, status_code))
+        self.queries.observe(labels, queries)
+        self.query_duration.observe(labels, query_seconds)
+
+    def families(self) -> List[MetricFamily]:
+        """Return the metric families to expose"""
+        return [self.duration, self.requests, self.queries, self.query_duration]
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware feeding RequestMetrics.
+
+    Each request is timed until its last body chunk is sent and tracks the
+    SQL statements of the instrumented engines. Requests that fail with an
+    unhandled exception are recorded with status 500.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with track_queries() as query_stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                self.metrics.observe(
+                    scope["method"],
+                    route.path if route is not None else "unmatched",
+                    status_code,
+                    time.perf_counter() - started,
+                    query_stats.count,
+                    query_stats.seconds,
+                )
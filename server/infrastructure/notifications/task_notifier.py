@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+
+class TaskNotifier:
+    """
+    In-process per-company signal waking up requests that wait for task changes.
+
+    One instance tells long-polling machines that new tasks are available,
+    another tells status streams that task statuses changed.
+
+    Every company has a version counter that is bumped when it is notified.
+    Waiters remember the version they last saw before querying, so a
+    notification sent between their query and their wait is not lost.
+    Notifications can be sent from any thread, waiters are asyncio coroutines.
+
+    Only requests served by the same process are woken up; with several
+    workers a waiter on another worker simply returns at its timeout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[UUID, int] = {}
+        self._waiters: Dict[
+            UUID, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]
+        ] = {}
+
+    def version(self, company_uuid: UUID) -> int:
+        """Return the current notification version of the company"""
+        with self._lock:
+            return self._versions.get(company_uuid, 0)
+
+    def notify(self, company_uuid: UUID):
+        """Wake up every request waiting for tasks of the company"""
+        with self._lock:
+            self._versions[company_uuid] = self._versions.get(company_uuid, 0) + 1
+            waiters = self._waiters.pop(company_uuid, [])
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def notify_all(self):
+        """Wake up every waiting request, whatever its company"""
+        with self._lock:
+            company_uuids = list(self._waiters)
+        for company_uuid in company_uuids:
+            self.notify(company_uuid)
+
+    async def wait(self, company_uuid: UUID, version: int, timeout: float) -> bool:
+        """
+        Wait until the company is notified after `version` or the timeout passes.
+
+        Args:
+            company_uuid: UUID of the company to wait for
+            version: Version returned by `version` before the caller's last query
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            bool: True if the company was notified, False on timeout
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self._lock:
+            if self._versions.get(company_uuid, 0) != version:
+                return True
+            self._waiters.setdefault(company_uuid, []).append(waiter)
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(company_uuid, [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    self._waiters.pop(company_uuid, None)
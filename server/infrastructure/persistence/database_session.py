@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+from typing import Callable, TypeVar
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+class DatabaseSession(ABC):
+    """
+    Database session used by the async request handlers.
+
+    Handlers pass an operation taking a regular SQLAlchemy Session, in which
+    they build the usual repositories and services. How the operation reaches
+    the database depends on the implementation chosen by configuration.
+    """
+
+    @abstractmethod
+    async def run(self, operation: Callable[[Session], T]) -> T:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+
+class ThreadpoolDatabaseSession(DatabaseSession):
+    """
+    Blocking Session over psycopg2, run in the threadpool.
+
+    Every operation holds a worker thread while it waits on the database.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run(self, operation: Callable[[Session], T]) -> T:
+        return await run_in_threadpool(operation, self.session)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.session.close)
+
+
+class AsyncDatabaseSession(DatabaseSession):
+    """
+    AsyncSession over an asyncio driver such as asyncpg.
+
+    Operations run through AsyncSession.run_sync: the repositories' statements
+    are awaited on the event loop through the async driver, so waiting on the
+    database holds no thread, and sync and async paths share the same queries.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def run(self, operation: Callable[[Session], T]) -> T:
+        return await self.session.run_sync(operation)
+
+    async def close(self) -> None:
+        await self.session.close()
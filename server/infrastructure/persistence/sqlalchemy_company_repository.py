@@ -1,7 +1,13 @@
 from domain.company.repository import CompanyRepository
 from domain.company.company import Company
-from domain.company.models import CompanyModel
-from typing import Optional
+from domain.company.models import AuthTokenInvalidationModel, CompanyModel
+from infrastructure.persistence.transaction_order import (
+    CURRENT_TRANSACTION_ID,
+    OLDEST_RUNNING_TRANSACTION_ID,
+)
+from sqlalchemy import BigInteger, delete, literal, select, tuple_, update
+from typing import List, Optional, Tuple
+import datetime
 import uuid
 
 
@@ -24,11 +30,15 @@ class SQLAlchemyCompanyRepository(CompanyRepository):
         Raises:
             DatabaseException: If there's an error saving to the database
         """
+        created_at = company.created_at
+        if created_at.tzinfo is not None:
+            # created_at is a naive UTC column, which asyncpg does not convert
+            created_at = created_at.astimezone(datetime.UTC).replace(tzinfo=None)
         company_model = CompanyModel(
             company_uuid=company.company_uuid,
             name=company.name,
             auth_token=company.auth_token,
-            created_at=company.created_at,
+            created_at=created_at,
         )
         self.session.add(company_model)
         self.session.commit()
@@ -85,6 +95,113 @@ class SQLAlchemyCompanyRepository(CompanyRepository):
             company_model.auth_token = company.auth_token
             self.session.commit()
 
+    def replace_auth_token(
+        self, company: Company, revoked_token: str, retention: float
+    ) -> None:
+        """
+        Save the company's new token and revoke the previous one, atomically.
+
+        The token update and the row recording the revoked token in the
+        invalidation log shared by all workers are committed together, so
+        no worker can miss the revocation of a replaced token. Invalidations
+        older than `retention` seconds are dropped at the same time; no token
+        cache keeps entries longer than that.
+
+        Args:
+            company: Company entity carrying the new auth token
+            revoked_token: Token that is no longer valid
+            retention: Number of seconds invalidations are kept
+
+        Raises:
+            DatabaseException: If there's an error updating the database
+        """
+        now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        self.session.execute(
+            update(CompanyModel)
+            .where(CompanyModel.company_uuid == company.company_uuid)
+            .values(auth_token=company.auth_token)
+        )
+        self.session.execute(
+            delete(AuthTokenInvalidationModel).where(
+                AuthTokenInvalidationModel.created_at
+                < now - datetime.timedelta(seconds=retention)
+            )
+        )
+        self.session.add(
+            AuthTokenInvalidationModel(
+                auth_token=revoked_token,
+                created_at=now,
+                transaction_id=(
+                    CURRENT_TRANSACTION_ID
+                    if self.session.bind.dialect.name == "postgresql"
+                    else 0
+                ),
+            )
+        )
+        self.session.commit()
+
+    def _final_invalidations(self, query):
+        # On Postgres, only the invalidations no running transaction can
+        # still commit a row behind
+        if self.session.bind.dialect.name == "postgresql":
+            return query.where(
+                AuthTokenInvalidationModel.transaction_id
+                < OLDEST_RUNNING_TRANSACTION_ID
+            )
+        return query
+
+    def get_token_invalidations(
+        self, after: Tuple[int, int]
+    ) -> List[Tuple[Tuple[int, int], str]]:
+        """
+        Get the tokens invalidated after a sync cursor.
+
+        Invalidations are ordered by (transaction_id, invalidation_id), and on
+        Postgres only those of transactions older than every transaction
+        still running are returned, so none can later commit behind them.
+
+        Args:
+            after: (transaction_id, invalidation_id) of the last invalidation
+                read
+
+        Returns:
+            List[Tuple[Tuple[int, int], str]]: ((transaction_id,
+                invalidation_id), auth_token) pairs, in that order
+        """
+        key = (
+            AuthTokenInvalidationModel.transaction_id,
+            AuthTokenInvalidationModel.invalidation_id,
+        )
+        invalidations = self.session.execute(
+            self._final_invalidations(
+                select(*key, AuthTokenInvalidationModel.auth_token)
+                .where(
+                    tuple_(*key)
+                    > tuple_(
+                        literal(after[0], BigInteger), literal(after[1], BigInteger)
+                    )
+                )
+                .order_by(*key)
+            )
+        ).all()
+        return [
+            ((transaction_id, invalidation_id), auth_token)
+            for transaction_id, invalidation_id, auth_token in invalidations
+        ]
+
+    def get_token_invalidation_cursor(self) -> Tuple[int, int]:
+        """Get the sync cursor of the latest final invalidation, (0, 0) if none"""
+        key = (
+            AuthTokenInvalidationModel.transaction_id,
+            AuthTokenInvalidationModel.invalidation_id,
+        )
+        cursor = self.session.execute(
+            self._final_invalidations(select(*key))
+            .order_by(key[0].desc(), key[1].desc())
+            .limit(1)
+        ).first()
+        return tuple(cursor) if cursor is not None else (0, 0)
+
     def update_auth_token(self, current_token: str, new_token: str) -> Company:
         """
         Update a company's authentication token.
@@ -101,9 +218,7 @@ class SQLAlchemyCompanyRepository(CompanyRepository):
             DatabaseException: If there's an error updating the database
         """
         company_model = (
-            self.session.query(CompanyModel)
-            .filter_by(auth_token=current_token)
-            .first()
+            self.session.query(CompanyModel).filter_by(auth_token=current_token).first()
         )
         if company_model:
             company_model.auth_token = new_token
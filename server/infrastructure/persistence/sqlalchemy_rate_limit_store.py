@@ -0,0 +1,92 @@
+import time
+import uuid
+from typing import Callable
+from sqlalchemy import case, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from domain.company.models import RateLimitBucketModel
+from domain.exceptions import DatabaseException
+from infrastructure.rate_limit.company_rate_limiter import (
+    RateLimitBudget,
+    RateLimitStore,
+)
+
+
+class SQLAlchemyRateLimitStore(RateLimitStore):
+    """
+    Token buckets in the rate_limit_buckets table, shared by all workers.
+
+    Each take is a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING,
+    refilling and taking from the bucket atomically under the row lock, so
+    concurrent requests of a company on different workers cannot both spend
+    the same tokens. It costs one short transaction per limited request.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        clock: Callable[[], float] = time.time,
+    ):
+        self.session_factory = session_factory
+        self._clock = clock
+
+    def take(
+        self, company_uuid: uuid.UUID, name: str, budget: RateLimitBudget, cost: float
+    ) -> float:
+        """
+        Take `cost` tokens from the company's bucket if it holds enough of them.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until the
+                bucket holds enough of them
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        now = self._clock()
+        bucket = RateLimitBucketModel.__table__.c
+        refilled = bucket.tokens + case(
+            (
+                bucket.refilled_at < now,
+                (literal(now) - bucket.refilled_at) * budget.rate,
+            ),
+            else_=0,
+        )
+        available = case((refilled > budget.burst, budget.burst), else_=refilled)
+        granted = available >= cost
+
+        session = self.session_factory()
+        try:
+            dialect_insert = (
+                postgresql.insert
+                if session.bind.dialect.name == "postgresql"
+                else sqlite.insert
+            )
+            statement = dialect_insert(RateLimitBucketModel).values(
+                company_uuid=company_uuid,
+                budget=name,
+                tokens=budget.burst - cost if cost <= budget.burst else budget.burst,
+                refilled_at=now,
+                granted=cost <= budget.burst,
+            )
+            tokens, was_granted = session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[bucket.company_uuid, bucket.budget],
+                    set_={
+                        "tokens": case((granted, available - cost), else_=available),
+                        "refilled_at": now,
+                        "granted": granted,
+                    },
+                ).returning(bucket.tokens, bucket.granted)
+            ).one()
+            session.commit()
+
+            return 0.0 if was_granted else (cost - tokens) / budget.rate
+
+        except Exception as e:
+            session.rollback()
+            raise DatabaseException("Failed to take rate limit tokens", str(e))
+        finally:
+            session.close()
@@ -1,15 +1,46 @@
+import csv
+import datetime
+import io
+import re
 from domain.task.repository import TaskRepository
 from domain.task.models import (
+    IdempotencyKeyModel,
     MultipleInvoicesTaskDataModel,
     SingleInvoiceTaskDataModel,
     CompanyTaskModel,
+    TaskStatusEventModel,
+)
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Integer,
+    String,
+    case,
+    cast,
+    delete,
+    exc,
+    func,
+    insert,
+    literal,
+    literal_column,
+    null,
+    select,
+    text,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from domain.exceptions import (
+    DatabaseException,
+    TaskNotFoundException,
+    TaskNotOwnedException,
 )
-from sqlalchemy import exc
-from domain.exceptions import DatabaseException, TaskNotFoundException
 import uuid
-from typing import List
+from typing import Callable, List, Optional, Set, Tuple
 from uuid import UUID
 from domain.task.schemas import (
+    IdempotencyRecord,
     SingleInvoiceStatusRequest,
     TaskStatus,
     MultipleInvoicesAction,
@@ -18,11 +49,38 @@ from domain.task.schemas import (
     SingleInvoiceIdentifier,
     SingleInvoiceAction,
     SingleInvoiceResponse,
+    TaskLeaseRenewalRequest,
     TaskStatusResponse,
     TaskStatusUpdateByUUIDRequest,
     TaskType,
     TaskStatusItem,
+    TaskStatusEvent,
+)
+from infrastructure.persistence.transaction_order import (
+    CURRENT_TRANSACTION_ID,
+    OLDEST_RUNNING_TRANSACTION_ID,
+)
+
+# Keys checked per query by the bulk loader fallback, within SQLite's
+# bound parameter limit (three parameters per key)
+BULK_LOAD_CHECK_BATCH_SIZE = 5000
+
+# Statuses a task never leaves; only such tasks are archived
+FINISHED_TASK_STATUSES = (
+    TaskStatus.COMPLETED.value,
+    TaskStatus.FAILED.value,
+    TaskStatus.USB_NOT_FOUND.value,
 )
+# Monthly partitions of company_tasks (Postgres), e.g. company_tasks_y2026m10
+TASK_PARTITION_NAME = re.compile(r"^company_tasks_y(\d{4})m(\d{2})$")
+
+
+def _month_start(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
 
 
 class SQLAlchemyTaskRepository(TaskRepository):
@@ -35,7 +93,10 @@ class SQLAlchemyTaskRepository(TaskRepository):
         self, company_uuid: UUID, tasks_uuid: List[UUID]
     ) -> bool:
         """
-        Verify that all specified tasks belong to the company.
+        Verify that all specified tasks exist and belong to the company.
+
+        Existence and ownership of the whole list are resolved with a single
+        query returning the owner of every submitted task that exists.
 
         Args:
             company_uuid: UUID of the company
@@ -45,32 +106,48 @@ class SQLAlchemyTaskRepository(TaskRepository):
             bool: True if all tasks belong to the company
 
         Raises:
-            TaskNotFoundException: If a task doesn't exist
+            TaskNotFoundException: If any of the tasks doesn't exist
+            TaskNotOwnedException: If any of the tasks belongs to another company
             DatabaseException: If there's a database error
         """
+        requested_tasks_uuid = list(dict.fromkeys(tasks_uuid))
+        if not requested_tasks_uuid:
+            return True
+
         try:
-            # Check if all tasks exist
-            for task_uuid in tasks_uuid:
-                if not self.verify_company_task_exists(task_uuid):
-                    raise TaskNotFoundException("Task not found", task_uuid)
+            task_owners = dict(
+                self.session.execute(
+                    select(
+                        CompanyTaskModel.task_uuid, CompanyTaskModel.company_uuid
+                    ).where(CompanyTaskModel.task_uuid.in_(requested_tasks_uuid))
+                ).all()
+            )
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to verify tasks ownership", str(e))
 
-            # Count how many of the provided tasks belong to the company
-            matching_tasks_count = (
-                self.session.query(CompanyTaskModel)
-                .filter(
-                    CompanyTaskModel.company_uuid == company_uuid,
-                    CompanyTaskModel.task_uuid.in_(tasks_uuid),
-                )
-                .count()
+        missing_tasks_uuid = [
+            task_uuid
+            for task_uuid in requested_tasks_uuid
+            if task_uuid not in task_owners
+        ]
+        if missing_tasks_uuid:
+            raise TaskNotFoundException(
+                "Task not found", missing_tasks_uuid[0], tasks_uuid=missing_tasks_uuid
             )
 
-            # If the count matches the number of tasks provided, all tasks belong to the company
-            return matching_tasks_count == len(tasks_uuid)
+        not_owned_tasks_uuid = [
+            task_uuid
+            for task_uuid, owner_uuid in task_owners.items()
+            if owner_uuid != company_uuid
+        ]
+        if not_owned_tasks_uuid:
+            raise TaskNotOwnedException(
+                "Tasks do not belong to the company",
+                task_details=[str(task_uuid) for task_uuid in not_owned_tasks_uuid],
+            )
 
-        except TaskNotFoundException as e:
-            raise TaskNotFoundException(str(e), e.task_uuid)
-        except DatabaseException as e:
-            raise DatabaseException("Failed to verify tasks ownership", str(e))
+        return True
 
     def verify_company_task_exists(self, task_uuid: UUID) -> bool:
         """
@@ -120,7 +197,7 @@ class SQLAlchemyTaskRepository(TaskRepository):
                 my_company_idno=invoice.my_company_idno,
                 person_name_certificate=invoice.person_name_certificate,
                 seria=invoice.seria,
-                number=invoice.number,
+                number=int(invoice.number),
                 action_type=action_type,
             )
             self.session.add(task)
@@ -161,199 +238,1570 @@ class SQLAlchemyTaskRepository(TaskRepository):
             self.session.rollback()
             raise DatabaseException("Failed to save tasks", str(e))
 
+    def _insert_company_tasks(
+        self,
+        data_model,
+        data_rows: List[dict],
+        company_uuid: UUID,
+        task_type: TaskType,
+    ) -> List[UUID]:
+        """
+        Insert task data rows and their company task rows in one transaction.
+
+        Both tables are written with a single executemany each, so a batch of
+        N tasks costs two round trips and one commit instead of 2N of each.
+
+        Args:
+            data_model: Task data model the rows belong to
+            data_rows: Task data rows, each already carrying its task_uuid
+            company_uuid: UUID of the company owning the tasks
+            task_type: Type of the tasks (Single/Multiple)
+
+        Returns:
+            List[UUID]: UUIDs of the created tasks, in input order
+
+        Raises:
+            DatabaseException: If there's an error saving to the database
+        """
+        if not data_rows:
+            return []
+
+        created_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        company_task_rows = [
+            {
+                "task_uuid": row["task_uuid"],
+                "company_uuid": company_uuid,
+                "status": TaskStatus.WAITING.value,
+                "created_at": created_at,
+                "task_type": task_type.value,
+            }
+            for row in data_rows
+        ]
+
+        try:
+            self.session.execute(insert(data_model), data_rows)
+            self.session.execute(insert(CompanyTaskModel), company_task_rows)
+            self.session.commit()
+
+            return [row["task_uuid"] for row in data_rows]
+
+        except exc.IntegrityError as e:
+            self.session.rollback()
+            raise DatabaseException("Database integrity error", str(e.orig))
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to save tasks", str(e))
+
+    def create_single_invoice_tasks(
+        self,
+        company_uuid: UUID,
+        action_type: SingleInvoiceAction,
+        invoices: List[SingleInvoiceIdentifier],
+    ) -> List[UUID]:
+        """
+        Create single invoice tasks for a whole batch in one transaction.
+
+        Args:
+            company_uuid: UUID of the company owning the tasks
+            action_type: Type of action to perform
+            invoices: Invoices to create tasks for
+
+        Returns:
+            List[UUID]: UUIDs of the created tasks, in input order
+
+        Raises:
+            DatabaseException: If there's an error saving to the database
+        """
+        data_rows = [
+            {
+                "task_uuid": uuid.uuid4(),
+                "my_company_idno": invoice.my_company_idno,
+                "person_name_certificate": invoice.person_name_certificate,
+                "seria": invoice.seria,
+                "number": int(invoice.number),
+                "action_type": action_type,
+            }
+            for invoice in invoices
+        ]
+        return self._insert_company_tasks(
+            SingleInvoiceTaskDataModel,
+            data_rows,
+            company_uuid,
+            TaskType.SINGLE_INVOICE_TASK,
+        )
+
+    def bulk_load_single_invoice_tasks(
+        self,
+        company_uuid: UUID,
+        action_type: SingleInvoiceAction,
+        invoices: List[SingleInvoiceIdentifier],
+    ) -> List[Optional[UUID]]:
+        """
+        Load a very large batch of single invoice tasks, skipping conflicts.
+
+        On Postgres (psycopg2) the batch is streamed with COPY FROM STDIN into
+        a temporary staging table, then moved into single_invoice_task_data
+        and company_tasks by one INSERT ... SELECT ... ON CONFLICT DO NOTHING
+        statement. Other databases (SQLite in tests) check the batch against
+        unique_task with a few set-based queries and write it with executemany.
+        Either way the batch is one transaction.
+
+        Args:
+            company_uuid: UUID of the company owning the tasks
+            action_type: Type of action to perform
+            invoices: Invoices to create tasks for
+
+        Returns:
+            List[Optional[UUID]]: For each invoice, in input order, the UUID of
+                its task, or None if the invoice conflicted with an existing
+                one or an earlier one of the batch
+
+        Raises:
+            DatabaseException: If there's an error saving to the database
+        """
+        if not invoices:
+            return []
+
+        if self.session.bind.dialect.driver == "psycopg2":
+            return self._copy_single_invoice_tasks(company_uuid, action_type, invoices)
+
+        tasks_uuid = []
+        data_rows = []
+        loaded_keys = set()
+        # number is an integer column: "007" and "7" are the same invoice
+        invoice_keys = [
+            (invoice.my_company_idno, invoice.seria, int(invoice.number))
+            for invoice in invoices
+        ]
+        existing_keys = set()
+        for start in range(0, len(invoice_keys), BULK_LOAD_CHECK_BATCH_SIZE):
+            batch_keys = list(
+                set(invoice_keys[start : start + BULK_LOAD_CHECK_BATCH_SIZE])
+            )
+            existing_keys |= {
+                (my_company_idno, seria, int(number))
+                for my_company_idno, seria, number in (
+                    self.get_existing_single_invoice_entries(batch_keys)
+                )
+            }
+        for invoice, invoice_key in zip(invoices, invoice_keys):
+            if invoice_key in existing_keys or invoice_key in loaded_keys:
+                tasks_uuid.append(None)
+                continue
+            loaded_keys.add(invoice_key)
+            data_rows.append(
+                {
+                    "task_uuid": uuid.uuid4(),
+                    "my_company_idno": invoice.my_company_idno,
+                    "person_name_certificate": invoice.person_name_certificate,
+                    "seria": invoice.seria,
+                    "number": int(invoice.number),
+                    "action_type": action_type,
+                }
+            )
+            tasks_uuid.append(data_rows[-1]["task_uuid"])
+
+        self._insert_company_tasks(
+            SingleInvoiceTaskDataModel,
+            data_rows,
+            company_uuid,
+            TaskType.SINGLE_INVOICE_TASK,
+        )
+        return tasks_uuid
+
+    def _copy_single_invoice_tasks(
+        self,
+        company_uuid: UUID,
+        action_type: SingleInvoiceAction,
+        invoices: List[SingleInvoiceIdentifier],
+    ) -> List[Optional[UUID]]:
+        tasks_uuid = [uuid.uuid4() for _ in invoices]
+        staging = io.StringIO()
+        writer = csv.writer(staging)
+        for row_number, (task_uuid, invoice) in enumerate(zip(tasks_uuid, invoices)):
+            writer.writerow(
+                (
+                    row_number,
+                    task_uuid,
+                    invoice.my_company_idno,
+                    invoice.person_name_certificate,
+                    invoice.seria,
+                    invoice.number,
+                    getattr(action_type, "value", action_type),
+                )
+            )
+        staging.seek(0)
+
+        try:
+            self.session.execute(
+                text(
+                    "CREATE TEMPORARY TABLE single_invoice_task_staging ("
+                    "row_number integer, task_uuid uuid, "
+                    "my_company_idno varchar(50), "
+                    "person_name_certificate varchar(50), seria varchar(50), "
+                    "number integer, action_type varchar(50)"
+                    ") ON COMMIT DROP"
+                )
+            )
+            with self.session.connection().connection.cursor() as cursor:
+                cursor.copy_expert(
+                    "COPY single_invoice_task_staging FROM STDIN WITH (FORMAT csv)",
+                    staging,
+                )
+            # Rows are inserted in batch order, so of two conflicting rows
+            # of the batch the first one is kept
+            loaded = self.session.execute(
+                text(
+                    "WITH loaded AS ("
+                    "INSERT INTO single_invoice_task_data (task_uuid, "
+                    "my_company_idno, person_name_certificate, seria, number, "
+                    "action_type) "
+                    "SELECT task_uuid, my_company_idno, person_name_certificate, "
+                    "seria, number, action_type "
+                    "FROM single_invoice_task_staging ORDER BY row_number "
+                    "ON CONFLICT DO NOTHING RETURNING task_uuid) "
+                    "INSERT INTO company_tasks (task_uuid, company_uuid, status, "
+                    "task_type, created_at, attempts) "
+                    "SELECT task_uuid, CAST(:company_uuid AS uuid), :status, "
+                    ":task_type, :created_at, 0 FROM loaded "
+                    "RETURNING task_uuid"
+                ),
+                {
+                    "company_uuid": str(company_uuid),
+                    "status": TaskStatus.WAITING.value,
+                    "task_type": TaskType.SINGLE_INVOICE_TASK.value,
+                    "created_at": datetime.datetime.now(datetime.UTC).replace(
+                        tzinfo=None
+                    ),
+                },
+            ).scalars()
+            loaded_tasks_uuid = {str(task_uuid) for task_uuid in loaded}
+            self.session.commit()
+
+            return [
+                task_uuid if str(task_uuid) in loaded_tasks_uuid else None
+                for task_uuid in tasks_uuid
+            ]
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to bulk load tasks", str(e))
+
+    def create_multiple_invoices_tasks(
+        self,
+        company_uuid: UUID,
+        action_type: MultipleInvoicesAction,
+        invoices: List[MultipleInvoicesIdentifier],
+    ) -> List[UUID]:
+        """
+        Create multiple invoices tasks for a whole batch in one transaction.
+
+        Args:
+            company_uuid: UUID of the company owning the tasks
+            action_type: Type of action to perform
+            invoices: Company IDNOs to create tasks for
+
+        Returns:
+            List[UUID]: UUIDs of the created tasks, in input order
+
+        Raises:
+            DatabaseException: If there's an error saving to the database
+        """
+        data_rows = [
+            {
+                "task_uuid": uuid.uuid4(),
+                "my_company_idno": invoice.my_company_idno,
+                "person_name_certificate": invoice.person_name_certificate,
+                "buyer_idno": invoice.buyer_idno,
+                "signature_type": invoice.signature_type,
+                "action_type": action_type,
+            }
+            for invoice in invoices
+        ]
+        return self._insert_company_tasks(
+            MultipleInvoicesTaskDataModel,
+            data_rows,
+            company_uuid,
+            TaskType.MULTIPLE_INVOICES_TASK,
+        )
+
     def get_single_invoice_tasks_status(
-        self, tasks: List[SingleInvoiceStatusRequest]
+        self, company_uuid: UUID, tasks: List[SingleInvoiceStatusRequest]
     ) -> TaskStatusResponse:
+        """
+        Get the status of single invoice tasks, checking they belong to the company.
+
+        Invoices are matched on exact (my_company_idno, seria, number) tuples,
+        served by the invoice key index, and the ownership check is done on the
+        same rows, so the whole lookup is a single query.
+
+        Args:
+            company_uuid: UUID of the company requesting the statuses
+            tasks: Invoice identifiers to get the status for
+
+        Returns:
+            TaskStatusResponse: Status of every requested invoice that has a task
+
+        Raises:
+            TaskNotOwnedException: If any matched task belongs to another company
+            DatabaseException: If there's a database error
+        """
+        if not tasks:
+            return TaskStatusResponse(tasks=[])
+
         try:
-            # Get task statuses by joining tables and filtering
-            task_statuses = (
-                self.session.query(
+            # Get task statuses by joining tables and filtering on exact invoice keys
+            task_statuses = self.session.execute(
+                select(
                     SingleInvoiceTaskDataModel.my_company_idno,
                     SingleInvoiceTaskDataModel.seria,
                     SingleInvoiceTaskDataModel.number,
                     CompanyTaskModel.status,
+                    CompanyTaskModel.company_uuid,
                 )
                 .join(
                     CompanyTaskModel,
                     CompanyTaskModel.task_uuid == SingleInvoiceTaskDataModel.task_uuid,
                 )
-                .filter(
-                    SingleInvoiceTaskDataModel.my_company_idno.in_(
-                        [task.my_company_idno for task in tasks]
-                    ),
-                    SingleInvoiceTaskDataModel.seria.in_(
-                        [task.seria for task in tasks]
-                    ),
-                    SingleInvoiceTaskDataModel.number.in_(
-                        [task.number for task in tasks]
-                    ),
-                )
-                .all()
-            )
-
-            # Convert to response format
-            return TaskStatusResponse(
-                tasks=[
-                    TaskStatusItem(
-                        my_company_idno=status.my_company_idno,
-                        seria=status.seria,
-                        number=str(
-                            status.number
-                        ),  # Convert to string since schema expects string
-                        status=status.status,
+                .where(
+                    tuple_(
+                        SingleInvoiceTaskDataModel.my_company_idno,
+                        SingleInvoiceTaskDataModel.seria,
+                        SingleInvoiceTaskDataModel.number,
+                    ).in_(
+                        [
+                            (task.my_company_idno, task.seria, int(task.number))
+                            for task in tasks
+                        ]
                     )
-                    for status in task_statuses
-                ]
-            )
+                )
+            ).all()
 
         except Exception as e:
             self.session.rollback()
             raise DatabaseException("Failed to get tasks status", str(e))
 
+        not_owned_tasks = [
+            {
+                "my_company_idno": status.my_company_idno,
+                "seria": status.seria,
+                "number": str(status.number),
+            }
+            for status in task_statuses
+            if status.company_uuid != company_uuid
+        ]
+        if not_owned_tasks:
+            raise TaskNotOwnedException(
+                "Tasks do not belong to the company", task_details=not_owned_tasks
+            )
+
+        # Convert to response format
+        return TaskStatusResponse(
+            tasks=[
+                TaskStatusItem(
+                    my_company_idno=status.my_company_idno,
+                    seria=status.seria,
+                    number=str(
+                        status.number
+                    ),  # Convert to string since schema expects string
+                    status=status.status,
+                )
+                for status in task_statuses
+            ]
+        )
+
+    def _is_postgresql(self) -> bool:
+        return self.session.bind.dialect.name == "postgresql"
+
+    def _insert_status_events(self, status_expression, now, *conditions):
+        # Copy the owner of every matching task into the status log with one
+        # INSERT ... SELECT, in the order of the logging transaction
+        self.session.execute(
+            insert(TaskStatusEventModel).from_select(
+                ["company_uuid", "task_uuid", "status", "created_at", "transaction_id"],
+                select(
+                    CompanyTaskModel.company_uuid,
+                    CompanyTaskModel.task_uuid,
+                    status_expression,
+                    literal(now, DateTime),
+                    (
+                        CURRENT_TRANSACTION_ID
+                        if self._is_postgresql()
+                        else literal(0, BigInteger)
+                    ),
+                ).where(*conditions),
+            )
+        )
+
+    def _log_status_events(
+        self, tasks_uuid: List[UUID], status_expression, now, *conditions
+    ):
+        self._insert_status_events(
+            status_expression,
+            now,
+            CompanyTaskModel.task_uuid.in_(tasks_uuid),
+            *conditions,
+        )
+
     def update_tasks_status(
         self,
         updated_tasks_data: List[TaskStatusUpdateByUUIDRequest],
-    ) -> None:
+    ) -> int:
         """
         Update status of multiple tasks.
 
+        Updates are grouped by target status and applied with one
+        UPDATE ... WHERE task_uuid IN (...) per status, so the number of
+        statements depends on the distinct statuses, not on the task count.
+        When a task is listed more than once, its last status wins. Every
+        change is also appended to the task status log.
+
+        An update only applies if its attempt is the task's current one: a
+        machine whose lease expired and whose task was claimed again cannot
+        overwrite the result of the new claim.
+
         Args:
             updated_tasks_data: List of tasks with their new statuses
 
+        Returns:
+            int: Number of company task rows updated
+
         Raises:
             DatabaseException: If there's an error updating the database
         """
+        # task_uuid is already UUID type from the schema
+        update_by_task_uuid = {
+            updated_task_data.task_uuid: (
+                updated_task_data.status,
+                updated_task_data.attempt,
+            )
+            for updated_task_data in updated_tasks_data
+        }
+        tasks_uuid_by_update = {}
+        for task_uuid, task_update in update_by_task_uuid.items():
+            tasks_uuid_by_update.setdefault(task_update, []).append(task_uuid)
+
+        now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
         try:
-            for updated_task_data in updated_tasks_data:
-                # task_uuid is already UUID type from the schema
-                self.session.query(CompanyTaskModel).filter(
-                    CompanyTaskModel.task_uuid == updated_task_data.task_uuid
-                ).update({CompanyTaskModel.status: updated_task_data.status})
+            updated_rows = 0
+            for (task_status, attempt), tasks_uuid in tasks_uuid_by_update.items():
+                current_attempt = CompanyTaskModel.attempts == attempt
+                self._log_status_events(
+                    tasks_uuid, literal(task_status, String), now, current_attempt
+                )
+                result = self.session.execute(
+                    update(CompanyTaskModel)
+                    .where(CompanyTaskModel.task_uuid.in_(tasks_uuid), current_attempt)
+                    .values(status=task_status)
+                    .execution_options(synchronize_session=False)
+                )
+                updated_rows += result.rowcount
 
             self.session.commit()
 
+            return updated_rows
+
         except Exception as e:
             self.session.rollback()
             raise DatabaseException("Failed to update tasks status", str(e))
 
-    def get_waiting_tasks_for_machine_single_invoice(self, company_uuid: uuid.UUID):
-        try:
-            # Single query joining CompanyTaskModel with SingleInvoiceTaskDataModel
-            waiting_tasks = (
-                self.session.query(
-                    SingleInvoiceTaskDataModel.my_company_idno,
-                    SingleInvoiceTaskDataModel.seria,
-                    SingleInvoiceTaskDataModel.number,
-                    SingleInvoiceTaskDataModel.person_name_certificate,
-                    CompanyTaskModel.task_uuid,
-                    SingleInvoiceTaskDataModel.action_type,
-                )
-                .join(
-                    CompanyTaskModel,
-                    CompanyTaskModel.task_uuid == SingleInvoiceTaskDataModel.task_uuid,
+    def _select_single_invoice_tasks(self, *conditions) -> List[SingleInvoiceResponse]:
+        # Single query joining CompanyTaskModel with SingleInvoiceTaskDataModel
+        tasks = (
+            self.session.query(
+                SingleInvoiceTaskDataModel.my_company_idno,
+                SingleInvoiceTaskDataModel.seria,
+                SingleInvoiceTaskDataModel.number,
+                SingleInvoiceTaskDataModel.person_name_certificate,
+                CompanyTaskModel.task_uuid,
+                SingleInvoiceTaskDataModel.action_type,
+            )
+            .join(
+                CompanyTaskModel,
+                CompanyTaskModel.task_uuid == SingleInvoiceTaskDataModel.task_uuid,
+            )
+            .filter(
+                CompanyTaskModel.task_type == TaskType.SINGLE_INVOICE_TASK.value,
+                *conditions,
+            )
+            .all()
+        )
+
+        return [
+            SingleInvoiceResponse(
+                my_company_idno=task.my_company_idno,
+                seria=task.seria,
+                person_name_certificate=task.person_name_certificate,
+                number=task.number,
+                task_uuid=str(task.task_uuid),
+                action_type=task.action_type,
+            )
+            for task in tasks
+        ]
+
+    def _select_multiple_invoices_tasks(
+        self, *conditions
+    ) -> List[MultipleInvoicesResponse]:
+        # Single query joining CompanyTaskModel with MultipleInvoicesTaskDataModel
+        tasks = (
+            self.session.query(
+                MultipleInvoicesTaskDataModel.my_company_idno,
+                MultipleInvoicesTaskDataModel.person_name_certificate,
+                MultipleInvoicesTaskDataModel.buyer_idno,
+                MultipleInvoicesTaskDataModel.signature_type,
+                CompanyTaskModel.task_uuid,
+                MultipleInvoicesTaskDataModel.action_type,
+            )
+            .join(
+                CompanyTaskModel,
+                CompanyTaskModel.task_uuid == MultipleInvoicesTaskDataModel.task_uuid,
+            )
+            .filter(
+                CompanyTaskModel.task_type == TaskType.MULTIPLE_INVOICES_TASK.value,
+                *conditions,
+            )
+            .all()
+        )
+
+        return [
+            MultipleInvoicesResponse(
+                my_company_idno=task.my_company_idno,
+                task_uuid=str(task.task_uuid),
+                person_name_certificate=task.person_name_certificate,
+                buyer_idno=task.buyer_idno,
+                signature_type=task.signature_type,
+                action_type=task.action_type,
+            )
+            for task in tasks
+        ]
+
+    def _select_machine_tasks(
+        self, *conditions, limit: Optional[int] = None
+    ) -> Tuple[dict, Optional[Tuple[datetime.datetime, uuid.UUID]]]:
+        # Both task types in one UNION ALL round trip, the columns of the other
+        # type being NULL, grouped in a single pass into plain dicts. When
+        # `limit` rows were read, the (created_at, task_uuid) key of the last
+        # one is returned too, for the next page to start after it.
+        single_tasks = (
+            select(
+                CompanyTaskModel.task_type,
+                CompanyTaskModel.created_at.label("created_at"),
+                CompanyTaskModel.task_uuid.label("task_uuid"),
+                CompanyTaskModel.attempts,
+                SingleInvoiceTaskDataModel.person_name_certificate,
+                SingleInvoiceTaskDataModel.my_company_idno,
+                SingleInvoiceTaskDataModel.action_type,
+                SingleInvoiceTaskDataModel.seria,
+                SingleInvoiceTaskDataModel.number,
+                cast(null(), String(50)).label("buyer_idno"),
+                cast(null(), String(50)).label("signature_type"),
+            )
+            .join(
+                SingleInvoiceTaskDataModel,
+                SingleInvoiceTaskDataModel.task_uuid == CompanyTaskModel.task_uuid,
+            )
+            .where(
+                CompanyTaskModel.task_type == TaskType.SINGLE_INVOICE_TASK.value,
+                *conditions,
+            )
+        )
+        multiple_tasks = (
+            select(
+                CompanyTaskModel.task_type,
+                CompanyTaskModel.created_at.label("created_at"),
+                CompanyTaskModel.task_uuid.label("task_uuid"),
+                CompanyTaskModel.attempts,
+                MultipleInvoicesTaskDataModel.person_name_certificate,
+                MultipleInvoicesTaskDataModel.my_company_idno,
+                MultipleInvoicesTaskDataModel.action_type,
+                cast(null(), String(50)).label("seria"),
+                cast(null(), Integer).label("number"),
+                MultipleInvoicesTaskDataModel.buyer_idno,
+                MultipleInvoicesTaskDataModel.signature_type,
+            )
+            .join(
+                MultipleInvoicesTaskDataModel,
+                MultipleInvoicesTaskDataModel.task_uuid == CompanyTaskModel.task_uuid,
+            )
+            .where(
+                CompanyTaskModel.task_type == TaskType.MULTIPLE_INVOICES_TASK.value,
+                *conditions,
+            )
+        )
+        query = union_all(single_tasks, multiple_tasks).order_by(
+            literal_column("created_at"), literal_column("task_uuid")
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        tasks = self.session.execute(query).all()
+
+        single_task_type = TaskType.SINGLE_INVOICE_TASK.value
+        single_tasks_structured = {}
+        multiple_tasks_structured = {}
+        for (
+            task_type,
+            _,
+            task_uuid,
+            attempt,
+            person_name_certificate,
+            my_company_idno,
+            action_type,
+            seria,
+            number,
+            buyer_idno,
+            signature_type,
+        ) in tasks:
+            if task_type == single_task_type:
+                single_tasks_structured.setdefault(
+                    person_name_certificate, {}
+                ).setdefault(my_company_idno, []).append(
+                    {
+                        "seria": seria,
+                        "number": str(number),
+                        "task_uuid": str(task_uuid),
+                        "action_type": action_type,
+                        "attempt": attempt,
+                    }
                 )
-                .filter(
-                    CompanyTaskModel.company_uuid == company_uuid,
-                    CompanyTaskModel.status == TaskStatus.WAITING.value,
-                    CompanyTaskModel.task_type == TaskType.SINGLE_INVOICE_TASK.value,
+            else:
+                multiple_tasks_structured.setdefault(
+                    person_name_certificate, {}
+                ).setdefault(my_company_idno, []).append(
+                    {
+                        "buyer_idno": buyer_idno,
+                        "signature_type": signature_type,
+                        "task_uuid": str(task_uuid),
+                        "action_type": action_type,
+                        "attempt": attempt,
+                    }
                 )
-                .all()
-            )
 
-            return [
-                SingleInvoiceResponse(
-                    my_company_idno=task.my_company_idno,
-                    seria=task.seria,
-                    person_name_certificate=task.person_name_certificate,
-                    number=task.number,
-                    task_uuid=str(task.task_uuid),
-                    action_type=task.action_type,
-                )
-                for task in waiting_tasks
+        last_key = None
+        if limit is not None and len(tasks) == limit:
+            last_key = (tasks[-1][1], tasks[-1][2])
+        return {
+            "SingleInvoiceTask": single_tasks_structured,
+            "MultipleInvoicesTask": multiple_tasks_structured,
+        }, last_key
+
+    def get_structured_waiting_tasks_for_machine(
+        self,
+        company_uuid: uuid.UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime.datetime, uuid.UUID]] = None,
+    ) -> Tuple[dict, Optional[Tuple[datetime.datetime, uuid.UUID]]]:
+        """
+        Get a page of the company's waiting tasks grouped by person and IDNO.
+
+        Both task types are read with a single query and returned as plain
+        dicts, ready to be serialized. Pages are keyed on (created_at,
+        task_uuid), so tasks completed between two pages never shift the
+        following ones and deep pages cost the same as the first.
+
+        Args:
+            company_uuid: UUID of the company
+            limit: Maximum number of tasks to return, all of them if None
+            after: (created_at, task_uuid) key of the last task of the
+                previous page, None for the first page
+
+        Returns:
+            Tuple[dict, Optional[Tuple[datetime.datetime, uuid.UUID]]]: Tasks
+                in the /machine/tasks structure, oldest first, and the key to
+                pass as `after` for the next page (None when fewer than
+                `limit` tasks were left)
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            conditions = [
+                CompanyTaskModel.company_uuid == company_uuid,
+                CompanyTaskModel.status == TaskStatus.WAITING.value,
             ]
+            if after is not None:
+                conditions.append(
+                    tuple_(CompanyTaskModel.created_at, CompanyTaskModel.task_uuid)
+                    > tuple_(
+                        literal(after[0], CompanyTaskModel.created_at.type),
+                        literal(after[1], CompanyTaskModel.task_uuid.type),
+                    )
+                )
+                # Postgres prunes partitions on a plain bound of created_at,
+                # not on the row comparison
+                conditions.append(CompanyTaskModel.created_at >= after[0])
+            return self._select_machine_tasks(*conditions, limit=limit)
 
         except Exception as e:
             self.session.rollback()
             raise DatabaseException("Failed to get waiting tasks", str(e))
 
-    def get_waiting_tasks_for_machine_multiple_invoices(
-        self, company_uuid: uuid.UUID
-    ) -> List[MultipleInvoicesResponse]:
+    def get_waiting_tasks_for_machine_single_invoice(self, company_uuid: uuid.UUID):
         try:
-            # Single query joining CompanyTaskModel with MultipleInvoicesTaskDataModel
-            waiting_tasks = (
-                self.session.query(
-                    MultipleInvoicesTaskDataModel.my_company_idno,
-                    MultipleInvoicesTaskDataModel.person_name_certificate,
-                    MultipleInvoicesTaskDataModel.buyer_idno,
-                    MultipleInvoicesTaskDataModel.signature_type,
-                    CompanyTaskModel.task_uuid,
-                    MultipleInvoicesTaskDataModel.action_type,
-                )
-                .join(
-                    CompanyTaskModel,
-                    CompanyTaskModel.task_uuid
-                    == MultipleInvoicesTaskDataModel.task_uuid,
-                )
-                .filter(
-                    CompanyTaskModel.company_uuid == company_uuid,
-                    CompanyTaskModel.status == TaskStatus.WAITING.value,
-                    CompanyTaskModel.task_type == TaskType.MULTIPLE_INVOICES_TASK.value,
-                )
-                .all()
+            return self._select_single_invoice_tasks(
+                CompanyTaskModel.company_uuid == company_uuid,
+                CompanyTaskModel.status == TaskStatus.WAITING.value,
             )
 
-            return [
-                MultipleInvoicesResponse(
-                    my_company_idno=task.my_company_idno,
-                    task_uuid=str(task.task_uuid),
-                    person_name_certificate=task.person_name_certificate,
-                    buyer_idno=task.buyer_idno,
-                    signature_type=task.signature_type,
-                    action_type=task.action_type,
-                )
-                for task in waiting_tasks
-            ]
-
         except Exception as e:
             self.session.rollback()
             raise DatabaseException("Failed to get waiting tasks", str(e))
 
-    def single_invoice_entry_exists(
-        self,
-        my_company_idno: str,
-        seria: str,
-        number: int,
-        person_name_certificate: str,
-    ) -> bool:
+    def get_waiting_tasks_for_machine_multiple_invoices(
+        self, company_uuid: uuid.UUID
+    ) -> List[MultipleInvoicesResponse]:
         try:
-            task = (
-                self.session.query(SingleInvoiceTaskDataModel)
-                .filter(
-                    SingleInvoiceTaskDataModel.my_company_idno == my_company_idno,
-                    SingleInvoiceTaskDataModel.seria == seria,
-                    SingleInvoiceTaskDataModel.number == number,
-                    SingleInvoiceTaskDataModel.person_name_certificate
-                    == person_name_certificate,
-                )
-                .first()
+            return self._select_multiple_invoices_tasks(
+                CompanyTaskModel.company_uuid == company_uuid,
+                CompanyTaskModel.status == TaskStatus.WAITING.value,
             )
 
-            return task is not None
-
         except Exception as e:
             self.session.rollback()
-            raise DatabaseException("Failed to check if task exists", str(e))
+            raise DatabaseException("Failed to get waiting tasks", str(e))
 
-    def create_company_task(
+    def claim_waiting_tasks_for_machine(
         self,
-        task_uuid: UUID,
-        company_uuid: UUID,
-        status: TaskStatus,
-        task_type: TaskType,
-    ):
+        company_uuid: uuid.UUID,
+        limit: int,
+        lease_expires_at: datetime.datetime,
+    ) -> dict:
         """
-        Create a company task association.
+        Atomically claim a bounded batch of waiting tasks for a machine.
+
+        The oldest WAITING tasks of the company are locked with
+        SELECT ... FOR UPDATE SKIP LOCKED, moved to PROCESSING with a lease
+        and returned, so concurrent machines never receive the same task.
+        On databases without row locking (SQLite) the clause is omitted.
+
+        Args:
+            company_uuid: UUID of the company whose tasks are claimed
+            limit: Maximum number of tasks to claim
+            lease_expires_at: Time until which the claiming machine owns the tasks
+
+        Returns:
+            dict: Claimed tasks grouped by person and IDNO, in the
+                /machine/tasks structure
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            rows = self.session.execute(
+                select(CompanyTaskModel.task_uuid, CompanyTaskModel.created_at)
+                .where(
+                    CompanyTaskModel.company_uuid == company_uuid,
+                    CompanyTaskModel.status == TaskStatus.WAITING.value,
+                )
+                .order_by(CompanyTaskModel.created_at, CompanyTaskModel.task_uuid)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                self.session.commit()
+                return {"SingleInvoiceTask": {}, "MultipleInvoicesTask": {}}
+
+            tasks_uuid = [row.task_uuid for row in rows]
+            # Rows come oldest first; bounding created_at lets Postgres touch
+            # only the partitions of the claimed tasks
+            claimed_range = CompanyTaskModel.created_at.between(
+                rows[0].created_at, rows[-1].created_at
+            )
+            self._log_status_events(
+                tasks_uuid,
+                literal(TaskStatus.PROCESSING.value, String),
+                datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                claimed_range,
+            )
+            self.session.execute(
+                update(CompanyTaskModel)
+                .where(CompanyTaskModel.task_uuid.in_(tasks_uuid), claimed_range)
+                .values(
+                    status=TaskStatus.PROCESSING.value,
+                    lease_expires_at=lease_expires_at,
+                    attempts=CompanyTaskModel.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            claimed_tasks, _ = self._select_machine_tasks(
+                CompanyTaskModel.task_uuid.in_(tasks_uuid), claimed_range
+            )
+            self.session.commit()
+
+            return claimed_tasks
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to claim waiting tasks", str(e))
+
+    def renew_task_leases(
+        self,
+        company_uuid: UUID,
+        tasks: List[TaskLeaseRenewalRequest],
+        lease_expires_at: datetime.datetime,
+    ) -> List[UUID]:
+        """
+        Extend the leases of tasks a machine is still working on.
+
+        Only the company's PROCESSING tasks still held by the given claim
+        attempt are renewed, with a single UPDATE ... RETURNING: a task whose
+        lease already expired and was requeued or claimed again is left alone,
+        and the machine must not process it any further.
+
+        Args:
+            company_uuid: UUID of the company owning the tasks
+            tasks: Tasks with the attempt they were claimed with
+            lease_expires_at: New time until which the machine owns the tasks
+
+        Returns:
+            List[UUID]: UUIDs of the tasks whose lease was renewed
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        if not tasks:
+            return []
+
+        try:
+            renewed = self.session.execute(
+                update(CompanyTaskModel)
+                .where(
+                    CompanyTaskModel.company_uuid == company_uuid,
+                    CompanyTaskModel.status == TaskStatus.PROCESSING.value,
+                    tuple_(CompanyTaskModel.task_uuid, CompanyTaskModel.attempts).in_(
+                        [(task.task_uuid, task.attempt) for task in tasks]
+                    ),
+                )
+                .values(lease_expires_at=lease_expires_at)
+                .returning(CompanyTaskModel.task_uuid)
+                .execution_options(synchronize_session=False)
+            ).scalars()
+            tasks_uuid = list(renewed)
+            self.session.commit()
+
+            return tasks_uuid
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to renew task leases", str(e))
+
+    def requeue_expired_tasks(self, now: datetime.datetime, max_attempts: int) -> int:
+        """
+        Release PROCESSING tasks whose lease has expired.
+
+        Tasks that have been claimed fewer than max_attempts times go back to
+        WAITING, the others are marked FAILED. The whole sweep is a single
+        UPDATE statement, preceded by one INSERT ... SELECT logging the changes.
+
+        Args:
+            now: Current time, compared against the task leases
+            max_attempts: Number of claims after which a task is failed
+
+        Returns:
+            int: Number of tasks released
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        expired = (
+            CompanyTaskModel.status == TaskStatus.PROCESSING.value,
+            CompanyTaskModel.lease_expires_at < now,
+        )
+        released_status = case(
+            (CompanyTaskModel.attempts < max_attempts, TaskStatus.WAITING.value),
+            else_=TaskStatus.FAILED.value,
+        )
+        try:
+            self._insert_status_events(released_status, now, *expired)
+            result = self.session.execute(
+                update(CompanyTaskModel)
+                .where(*expired)
+                .values(status=released_status, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+
+            return result.rowcount
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to requeue expired tasks", str(e))
+
+    def get_task_status_events(
+        self, company_uuid: UUID, after: Tuple[int, int], limit: int
+    ) -> Tuple[List[TaskStatusEvent], bool]:
+        """
+        Get the company's task status changes logged after a stream cursor.
+
+        Events are ordered by (transaction_id, event_id). On Postgres only the
+        events of transactions older than every transaction still running are
+        returned: event ids are taken from a sequence before their transaction
+        commits, so a lower id may still become visible after a higher one,
+        while no transaction can commit an event behind those returned.
+
+        Args:
+            company_uuid: UUID of the company
+            after: (transaction_id, event_id) of the last event received
+            limit: Maximum number of events to return
+
+        Returns:
+            Tuple[List[TaskStatusEvent], bool]: Events in the order they were
+                logged, and whether later committed events are held back until
+                older transactions end
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            rows = self.session.execute(
+                select(
+                    TaskStatusEventModel,
+                    (
+                        TaskStatusEventModel.transaction_id
+                        < OLDEST_RUNNING_TRANSACTION_ID
+                        if self._is_postgresql()
+                        else literal(True)
+                    ).label("final"),
+                )
+                .where(
+                    TaskStatusEventModel.company_uuid == company_uuid,
+                    tuple_(
+                        TaskStatusEventModel.transaction_id,
+                        TaskStatusEventModel.event_id,
+                    )
+                    > tuple_(
+                        literal(after[0], BigInteger), literal(after[1], BigInteger)
+                    ),
+                )
+                .order_by(
+                    TaskStatusEventModel.transaction_id, TaskStatusEventModel.event_id
+                )
+                .limit(limit)
+            ).all()
+
+            events = [
+                TaskStatusEvent(
+                    event_id=event.event_id,
+                    transaction_id=event.transaction_id,
+                    task_uuid=event.task_uuid,
+                    status=event.status,
+                    created_at=event.created_at,
+                )
+                for event, final in rows
+                if final
+            ]
+            return events, len(events) < len(rows)
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to get task status events", str(e))
+
+    def get_task_status_event_cursor(
+        self, company_uuid: UUID, event_id: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Get the stream cursor of one of the company's task status events.
+
+        Args:
+            company_uuid: UUID of the company
+            event_id: Id of the event, None for the latest event that is
+                final (see get_task_status_events)
+
+        Returns:
+            Tuple[int, int]: (transaction_id, event_id) of the event; (0, 0)
+                if the company has no final event yet, (0, event_id) if the
+                event is no longer logged
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        key = (TaskStatusEventModel.transaction_id, TaskStatusEventModel.event_id)
+        query = select(*key).where(TaskStatusEventModel.company_uuid == company_uuid)
+        if event_id is not None:
+            query = query.where(TaskStatusEventModel.event_id == event_id)
+        else:
+            if self._is_postgresql():
+                query = query.where(
+                    TaskStatusEventModel.transaction_id < OLDEST_RUNNING_TRANSACTION_ID
+                )
+            query = query.order_by(key[0].desc(), key[1].desc()).limit(1)
+        try:
+            cursor = self.session.execute(query).first()
+
+            if cursor is None:
+                return 0, event_id or 0
+            return tuple(cursor)
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to get task status event cursor", str(e))
+
+    def count_tasks_by_status(self, statuses: List[TaskStatus]) -> List[dict]:
+        """
+        Count the tasks in the given statuses per company and task type.
+
+        Args:
+            statuses: Statuses to count, e.g. the queued and failed ones
+
+        Returns:
+            List[dict]: company_uuid, task_type, status and count of every
+                non-empty group
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            rows = self.session.execute(
+                select(
+                    CompanyTaskModel.company_uuid,
+                    CompanyTaskModel.task_type,
+                    CompanyTaskModel.status,
+                    func.count(),
+                )
+                .where(
+                    CompanyTaskModel.status.in_([status.value for status in statuses])
+                )
+                .group_by(
+                    CompanyTaskModel.company_uuid,
+                    CompanyTaskModel.task_type,
+                    CompanyTaskModel.status,
+                )
+            ).all()
+
+            return [
+                {
+                    "company_uuid": company_uuid,
+                    "task_type": task_type,
+                    "status": status,
+                    "count": count,
+                }
+                for company_uuid, task_type, status, count in rows
+            ]
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to count tasks by status", str(e))
+
+    def delete_task_status_events_before(self, cutoff: datetime.datetime) -> int:
+        """
+        Delete task status events logged before the cutoff.
+
+        Args:
+            cutoff: Events older than this are deleted
+
+        Returns:
+            int: Number of deleted events
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            result = self.session.execute(
+                delete(TaskStatusEventModel)
+                .where(TaskStatusEventModel.created_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+
+            return result.rowcount
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to delete task status events", str(e))
+
+    def claim_idempotency_key(
+        self,
+        company_uuid: uuid.UUID,
+        idempotency_key: str,
+        request_hash: str,
+        now: datetime.datetime,
+        expired_before: Optional[datetime.datetime] = None,
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Record that a request with this idempotency key is being processed.
+
+        The key is inserted with INSERT ... ON CONFLICT DO NOTHING and
+        committed at once, so of two concurrent requests with the same key
+        only one gets to process it. A claim of the same request that is
+        still without a response and was made before `expired_before` is
+        taken over by a conditional UPDATE, which again only one of several
+        concurrent requests gets to apply.
+
+        Args:
+            company_uuid: UUID of the company sending the request
+            idempotency_key: Idempotency-Key header of the request
+            request_hash: Hash of the request the key is sent with
+            now: Time the key is recorded at, which identifies the claim
+            expired_before: In-progress claims made before this time are
+                taken over; they are never taken over when None
+
+        Returns:
+            Optional[IdempotencyRecord]: None if the key was claimed by this
+                call, otherwise the record stored for the key (without a
+                response while its request is still being processed)
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            dialect_insert = (
+                postgresql.insert
+                if self.session.bind.dialect.name == "postgresql"
+                else sqlite.insert
+            )
+            result = self.session.execute(
+                dialect_insert(IdempotencyKeyModel)
+                .values(
+                    company_uuid=company_uuid,
+                    idempotency_key=idempotency_key,
+                    request_hash=request_hash,
+                    created_at=now,
+                )
+                .on_conflict_do_nothing()
+            )
+            if result.rowcount:
+                self.session.commit()
+                return None
+
+            if expired_before is not None:
+                result = self.session.execute(
+                    update(IdempotencyKeyModel)
+                    .where(
+                        IdempotencyKeyModel.company_uuid == company_uuid,
+                        IdempotencyKeyModel.idempotency_key == idempotency_key,
+                        IdempotencyKeyModel.request_hash == request_hash,
+                        IdempotencyKeyModel.response_status.is_(None),
+                        IdempotencyKeyModel.created_at < expired_before,
+                    )
+                    .values(created_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    self.session.commit()
+                    return None
+
+            stored_hash, response_status, response_body = self.session.execute(
+                select(
+                    IdempotencyKeyModel.request_hash,
+                    IdempotencyKeyModel.response_status,
+                    IdempotencyKeyModel.response_body,
+                ).where(
+                    IdempotencyKeyModel.company_uuid == company_uuid,
+                    IdempotencyKeyModel.idempotency_key == idempotency_key,
+                )
+            ).one()
+            self.session.commit()
+
+            return IdempotencyRecord(
+                request_hash=stored_hash,
+                response_status=response_status,
+                response_body=response_body,
+            )
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to claim idempotency key", str(e))
+
+    def save_idempotent_response(
+        self,
+        company_uuid: uuid.UUID,
+        idempotency_key: str,
+        claimed_at: datetime.datetime,
+        response_status: int,
+        response_body: str,
+    ):
+        """
+        Store the response of the request processed under an idempotency key.
+
+        Nothing is stored if the claim made at `claimed_at` was taken over by
+        another request in the meantime.
+
+        Args:
+            company_uuid: UUID of the company that sent the request
+            idempotency_key: Idempotency-Key header of the request
+            claimed_at: Time the key was claimed at by the request
+            response_status: HTTP status code of the response
+            response_body: Body of the response
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            self.session.execute(
+                update(IdempotencyKeyModel)
+                .where(
+                    IdempotencyKeyModel.company_uuid == company_uuid,
+                    IdempotencyKeyModel.idempotency_key == idempotency_key,
+                    IdempotencyKeyModel.created_at == claimed_at,
+                )
+                .values(response_status=response_status, response_body=response_body)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to save idempotent response", str(e))
+
+    def release_idempotency_key(
+        self,
+        company_uuid: uuid.UUID,
+        idempotency_key: str,
+        claimed_at: datetime.datetime,
+    ):
+        """
+        Forget an idempotency key whose request failed, so it can be retried.
+
+        A claim taken over by another request is left to that request.
+
+        Args:
+            company_uuid: UUID of the company that sent the request
+            idempotency_key: Idempotency-Key header of the request
+            claimed_at: Time the key was claimed at by the failed request
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            self.session.execute(
+                delete(IdempotencyKeyModel)
+                .where(
+                    IdempotencyKeyModel.company_uuid == company_uuid,
+                    IdempotencyKeyModel.idempotency_key == idempotency_key,
+                    IdempotencyKeyModel.created_at == claimed_at,
+                    IdempotencyKeyModel.response_status.is_(None),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to release idempotency key", str(e))
+
+    def delete_idempotency_keys_before(self, cutoff: datetime.datetime) -> int:
+        """
+        Delete idempotency keys recorded before the cutoff.
+
+        Args:
+            cutoff: Keys older than this are deleted
+
+        Returns:
+            int: Number of deleted keys
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            result = self.session.execute(
+                delete(IdempotencyKeyModel)
+                .where(IdempotencyKeyModel.created_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+
+            return result.rowcount
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to delete idempotency keys", str(e))
+
+    def archive_finished_tasks(
+        self,
+        cutoff: datetime.datetime,
+        limit: int,
+        export: Callable[[List[dict]], None],
+    ) -> int:
+        """
+        Export and delete a batch of finished tasks created before the cutoff.
+
+        The oldest finished tasks are locked with FOR UPDATE SKIP LOCKED, so
+        concurrent archivers never export the same task. They are handed to
+        `export` together with their task data, then deleted from company_tasks
+        and the task data tables in the same transaction. If `export` raises,
+        nothing is deleted.
+
+        Args:
+            cutoff: Only tasks created before this time are archived
+            limit: Maximum number of tasks in the batch
+            export: Receives the batch as dicts, the company_tasks columns plus
+                "data" with the task data columns (None if it is missing)
+
+        Returns:
+            int: Number of archived tasks; lower than limit once done
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            tasks = [
+                task._asdict()
+                for task in self.session.execute(
+                    select(*CompanyTaskModel.__table__.c)
+                    .where(
+                        CompanyTaskModel.status.in_(FINISHED_TASK_STATUSES),
+                        CompanyTaskModel.created_at < cutoff,
+                    )
+                    .order_by(CompanyTaskModel.created_at)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+            ]
+            if not tasks:
+                self.session.commit()
+                return 0
+
+            tasks_uuid = [task["task_uuid"] for task in tasks]
+            data_by_task_uuid = {}
+            for data_model in (
+                SingleInvoiceTaskDataModel,
+                MultipleInvoicesTaskDataModel,
+            ):
+                for data in self.session.execute(
+                    select(*data_model.__table__.c).where(
+                        data_model.task_uuid.in_(tasks_uuid)
+                    )
+                ):
+                    data = data._asdict()
+                    data_by_task_uuid[data.pop("task_uuid")] = data
+            for task in tasks:
+                task["data"] = data_by_task_uuid.get(task["task_uuid"])
+
+            export(tasks)
+
+            for model in (
+                SingleInvoiceTaskDataModel,
+                MultipleInvoicesTaskDataModel,
+                CompanyTaskModel,
+            ):
+                self.session.execute(
+                    delete(model)
+                    .where(model.task_uuid.in_(tasks_uuid))
+                    .execution_options(synchronize_session=False)
+                )
+            self.session.commit()
+
+            return len(tasks)
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to archive finished tasks", str(e))
+
+    def _is_company_tasks_partitioned(self) -> bool:
+        if self.session.bind.dialect.name != "postgresql":
+            return False
+        return (
+            self.session.execute(
+                text(
+                    "SELECT relkind FROM pg_class "
+                    "WHERE oid = to_regclass('company_tasks')"
+                )
+            ).scalar()
+            == "p"
+        )
+
+    def ensure_task_partitions(self, until: datetime.date) -> List[str]:
+        """
+        Create the monthly company_tasks partitions up to the month of `until`.
+
+        Starts from the current month. Tasks of a new partition's month that
+        already landed in the default partition are moved into it before it
+        is attached, which Postgres would otherwise refuse. Does nothing
+        unless company_tasks is a partitioned Postgres table.
+
+        Args:
+            until: Date whose month must have a partition
+
+        Returns:
+            List[str]: Names of the partitions covering that range
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            if not self._is_company_tasks_partitioned():
+                return []
+
+            columns = ", ".join(CompanyTaskModel.__table__.columns.keys())
+            partitions = []
+            month = _month_start(datetime.datetime.now(datetime.UTC).date())
+            while month <= until:
+                next_month = _next_month(month)
+                partition = f"company_tasks_y{month.year}m{month.month:02d}"
+                partitions.append(partition)
+                exists = self.session.execute(
+                    text("SELECT to_regclass(:partition) IS NOT NULL"),
+                    {"partition": partition},
+                ).scalar()
+                if not exists:
+                    self.session.execute(
+                        text(
+                            f"CREATE TABLE {partition} "
+                            f"(LIKE company_tasks INCLUDING DEFAULTS)"
+                        )
+                    )
+                    self.session.execute(
+                        text(
+                            f"WITH moved AS (DELETE FROM company_tasks_default "
+                            f"WHERE created_at >= :start AND created_at < :end "
+                            f"RETURNING {columns}) "
+                            f"INSERT INTO {partition} ({columns}) "
+                            f"SELECT {columns} FROM moved"
+                        ),
+                        {"start": month, "end": next_month},
+                    )
+                    self.session.execute(
+                        text(
+                            f"ALTER TABLE company_tasks ATTACH PARTITION {partition} "
+                            f"FOR VALUES FROM ('{month.isoformat()}') "
+                            f"TO ('{next_month.isoformat()}')"
+                        )
+                    )
+                month = next_month
+            self.session.commit()
+
+            return partitions
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to create task partitions", str(e))
+
+    def drop_empty_task_partitions(self, before: datetime.date) -> List[str]:
+        """
+        Drop the empty monthly company_tasks partitions ending before a date.
+
+        Partitions still holding tasks, such as unfinished ones, are kept.
+        Does nothing unless company_tasks is a partitioned Postgres table.
+
+        Args:
+            before: Partitions whose month ends on or before this date are dropped
+
+        Returns:
+            List[str]: Names of the dropped partitions
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        try:
+            if not self._is_company_tasks_partitioned():
+                return []
+
+            partitions = self.session.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = to_regclass('company_tasks')"
+                )
+            ).scalars()
+            dropped = []
+            for partition in sorted(partitions):
+                match = TASK_PARTITION_NAME.match(partition)
+                if not match:
+                    continue
+                month = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+                if _next_month(month) > before:
+                    continue
+                if self.session.execute(
+                    text(f"SELECT EXISTS (SELECT 1 FROM {partition})")
+                ).scalar():
+                    continue
+                self.session.execute(
+                    text(f"ALTER TABLE company_tasks DETACH PARTITION {partition}")
+                )
+                self.session.execute(text(f"DROP TABLE {partition}"))
+                dropped.append(partition)
+            self.session.commit()
+
+            return dropped
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to drop task partitions", str(e))
+
+    def single_invoice_entry_exists(
+        self,
+        my_company_idno: str,
+        seria: str,
+        number: int,
+        person_name_certificate: str,
+    ) -> bool:
+        try:
+            task = (
+                self.session.query(SingleInvoiceTaskDataModel)
+                .filter(
+                    SingleInvoiceTaskDataModel.my_company_idno == my_company_idno,
+                    SingleInvoiceTaskDataModel.seria == seria,
+                    SingleInvoiceTaskDataModel.number == int(number),
+                    SingleInvoiceTaskDataModel.person_name_certificate
+                    == person_name_certificate,
+                )
+                .first()
+            )
+
+            return task is not None
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to check if task exists", str(e))
+
+    def get_existing_single_invoice_entries(
+        self, invoice_keys: List[Tuple[str, str, str]]
+    ) -> Set[Tuple[str, str, str]]:
+        """
+        Find which invoices of a batch already have a single invoice task.
+
+        The whole batch is checked against the unique_task constraint with a
+        single tuple-IN query on (my_company_idno, seria, number).
+
+        Args:
+            invoice_keys: (my_company_idno, seria, number) keys to check
+
+        Returns:
+            Set[Tuple[str, str, str]]: Keys that already exist, with number as string
+
+        Raises:
+            DatabaseException: If there's a database error
+        """
+        if not invoice_keys:
+            return set()
+
+        try:
+            existing_entries = self.session.execute(
+                select(
+                    SingleInvoiceTaskDataModel.my_company_idno,
+                    SingleInvoiceTaskDataModel.seria,
+                    SingleInvoiceTaskDataModel.number,
+                ).where(
+                    tuple_(
+                        SingleInvoiceTaskDataModel.my_company_idno,
+                        SingleInvoiceTaskDataModel.seria,
+                        SingleInvoiceTaskDataModel.number,
+                    ).in_(
+                        [
+                            (my_company_idno, seria, int(number))
+                            for my_company_idno, seria, number in invoice_keys
+                        ]
+                    )
+                )
+            ).all()
+
+            return {
+                (entry.my_company_idno, entry.seria, str(entry.number))
+                for entry in existing_entries
+            }
+
+        except Exception as e:
+            self.session.rollback()
+            raise DatabaseException("Failed to check if tasks exist", str(e))
+
+    def create_company_task(
+        self,
+        task_uuid: UUID,
+        company_uuid: UUID,
+        status: TaskStatus,
+        task_type: TaskType,
+    ):
+        """
+        Create a company task association.
 
         Args:
             task_uuid: UUID of the task
@@ -381,24 +1829,26 @@ class SQLAlchemyTaskRepository(TaskRepository):
     def get_single_invoice_tasks_uuid(
         self, tasks: List[SingleInvoiceStatusRequest]
     ) -> List[uuid.UUID]:
-        try:
-            tasks_my_company_idno = [task.my_company_idno for task in tasks]
-            tasks_seria = [task.seria for task in tasks]
-            tasks_number = [task.number for task in tasks]
+        if not tasks:
+            return []
 
-            tasks_uuid = (
-                self.session.query(SingleInvoiceTaskDataModel)
-                .filter(
-                    SingleInvoiceTaskDataModel.my_company_idno.in_(
-                        tasks_my_company_idno
-                    ),
-                    SingleInvoiceTaskDataModel.seria.in_(tasks_seria),
-                    SingleInvoiceTaskDataModel.number.in_(tasks_number),
+        try:
+            tasks_uuid = self.session.execute(
+                select(SingleInvoiceTaskDataModel.task_uuid).where(
+                    tuple_(
+                        SingleInvoiceTaskDataModel.my_company_idno,
+                        SingleInvoiceTaskDataModel.seria,
+                        SingleInvoiceTaskDataModel.number,
+                    ).in_(
+                        [
+                            (task.my_company_idno, task.seria, int(task.number))
+                            for task in tasks
+                        ]
+                    )
                 )
-                .all()
-            )
+            ).scalars()
 
-            return [task.task_uuid for task in tasks_uuid]
+            return list(tasks_uuid)
 
         except Exception as e:
             self.session.rollback()
@@ -412,7 +1862,7 @@ class SQLAlchemyTaskRepository(TaskRepository):
                 my_company_idno=task_data["my_company_idno"],
                 person_name_certificate=task_data["person_name_certificate"],
                 seria=task_data["seria"],
-                number=task_data["number"],
+                number=int(task_data["number"]),
                 action_type=task_data["action_type"],
                 status="WAITING",
             )
@@ -0,0 +1,12 @@
+from sqlalchemy import literal_column
+
+# Postgres (13+) ids of the current transaction and of the oldest transaction
+# still running. Log rows take their id from a sequence before they commit, so
+# a lower id may become visible after a higher one; readers following a log in
+# (transaction_id, id) order, and only up to the transactions older than every
+# running one, never see a row commit behind their cursor. SQLite serializes
+# writers, so its rows commit in id order and are logged with transaction 0.
+CURRENT_TRANSACTION_ID = literal_column("pg_current_xact_id()::text::bigint")
+OLDEST_RUNNING_TRANSACTION_ID = literal_column(
+    "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+)
@@ -0,0 +1,102 @@
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, NamedTuple, Tuple
+
+
+class RateLimitBudget(NamedTuple):
+    """Token bucket refilled at `rate` requests per second, holding `burst` at most"""
+
+    rate: float
+    burst: int
+
+
+class RateLimitStore(ABC):
+    """Token buckets of the companies, one per company and budget name"""
+
+    # Stores doing I/O are called from the threadpool
+    blocking = False
+
+    @abstractmethod
+    def take(
+        self, company_uuid: uuid.UUID, name: str, budget: RateLimitBudget, cost: float
+    ) -> float:
+        """
+        Take `cost` tokens from the bucket if it holds enough of them.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until the
+                bucket holds enough of them
+        """
+        pass
+
+
+def _refill(
+    tokens: float, elapsed: float, budget: RateLimitBudget, cost: float
+) -> Tuple[float, float]:
+    tokens = min(budget.burst, tokens + max(elapsed, 0) * budget.rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / budget.rate
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Token buckets of this process.
+
+    Every worker process keeps its own buckets, so a company may send up to
+    the number of workers times its budget; use a shared store to enforce
+    budgets across workers.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (company_uuid, name) -> (tokens, refilled_at), a few per company
+        self._buckets: Dict[Tuple[uuid.UUID, str], Tuple[float, float]] = {}
+
+    def take(
+        self, company_uuid: uuid.UUID, name: str, budget: RateLimitBudget, cost: float
+    ) -> float:
+        with self._lock:
+            now = self._clock()
+            tokens, refilled_at = self._buckets.get(
+                (company_uuid, name), (budget.burst, now)
+            )
+            tokens, retry_after = _refill(tokens, now - refilled_at, budget, cost)
+            self._buckets[(company_uuid, name)] = (tokens, now)
+            return retry_after
+
+
+class CompanyRateLimiter:
+    """
+    Per-company admission control with separate token bucket budgets.
+
+    Each company gets one bucket per budget name (e.g. task creation, status
+    queries, machine polling), so a company bursting on one kind of request
+    neither starves other companies nor its own machines. Budgets missing
+    from `budgets`, or with a rate of 0, are not limited.
+    """
+
+    def __init__(self, store: RateLimitStore, budgets: Dict[str, RateLimitBudget]):
+        self.store = store
+        self.budgets = budgets
+
+    def acquire(self, company_uuid: uuid.UUID, name: str, cost: float = 1) -> float:
+        """
+        Admit a request of the company against the named budget.
+
+        Args:
+            company_uuid: UUID of the authenticated company
+            name: Budget the request is counted against
+            cost: Tokens the request uses
+
+        Returns:
+            float: 0 if the request is admitted, otherwise the seconds after
+                which it may be retried
+        """
+        budget = self.budgets.get(name)
+        if budget is None or budget.rate <= 0:
+            return 0.0
+        return self.store.take(company_uuid, name, budget, cost)
@@ -0,0 +1,127 @@
+import csv
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from domain.task.schemas import SingleInvoiceData
+
+SINGLE_INVOICE_CSV_COLUMNS = [
+    "my_company_idno",
+    "person_name_certificate",
+    "seria",
+    "number",
+]
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """
+    Split a streamed upload into numbered lines as its chunks arrive.
+
+    Only the current partial line is buffered, so memory does not grow with
+    the upload. Blank lines are skipped but still counted.
+
+    Args:
+        chunks: Body chunks of the request, e.g. Request.stream()
+        max_line_bytes: Longest accepted line; longer lines are dropped
+
+    Yields:
+        Tuple[int, Optional[str]]: 1-based line number and the decoded line,
+            None for a line longer than max_line_bytes or not valid UTF-8
+    """
+    buffer = bytearray()
+    line_number = 0
+    too_long = False
+
+    def decode(raw: bytes) -> Optional[str]:
+        try:
+            return raw.decode("utf-8").rstrip("\r")
+        except UnicodeDecodeError:
+            return None
+
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line_number += 1
+            if too_long:
+                too_long = False
+                yield line_number, None
+            elif end > start:
+                line = decode(bytes(buffer[start:end]))
+                if line is None or line.strip():
+                    yield line_number, line
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            too_long = True
+            buffer.clear()
+
+    if too_long:
+        yield line_number + 1, None
+    elif buffer:
+        line = decode(bytes(buffer))
+        if line is None or line.strip():
+            yield line_number + 1, line
+
+
+class NdjsonInvoiceParser:
+    """Parses single invoices written one JSON object per line"""
+
+    def parse(self, line: str) -> Optional[SingleInvoiceData]:
+        """
+        Parse one line of the upload.
+
+        Raises:
+            ValueError: If the line is not a valid invoice
+        """
+        return SingleInvoiceData.parse_raw(line)
+
+
+class CsvInvoiceParser:
+    """
+    Parses single invoices written as CSV rows.
+
+    The first line is a header naming the SINGLE_INVOICE_CSV_COLUMNS, in any
+    order. Quoted fields may not span several lines.
+    """
+
+    def __init__(self):
+        self.columns: Optional[List[str]] = None
+
+    def parse(self, line: str) -> Optional[SingleInvoiceData]:
+        """
+        Parse one line of the upload, None for the header.
+
+        Raises:
+            ValueError: If the line is not a valid invoice or header
+        """
+        row = next(csv.reader([line]))
+        if self.columns is None:
+            self.columns = [column.strip() for column in row]
+            missing = set(SINGLE_INVOICE_CSV_COLUMNS) - set(self.columns)
+            if missing:
+                raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+            return None
+        if len(row) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} CSV fields, got {len(row)}")
+        return SingleInvoiceData(**dict(zip(self.columns, row)))
+
+
+class ImportStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose content is produced while the upload is read.
+
+    StreamingResponse listens for the client disconnect by reading the
+    request messages concurrently with the content, which would swallow the
+    body chunks the import is reading. Here the content alone reads them;
+    a disconnect surfaces as ClientDisconnect from Request.stream().
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,23 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when it is installed.
+
+    orjson encodes the large task payloads of the machine and status
+    endpoints several times faster than the standard json module and
+    serializes UUIDs, datetimes and enums natively. Without orjson the
+    response falls back to the standard JSONResponse rendering.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,4 +1,11 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import anyio
+import asyncio
+import datetime
+import hashlib
+import json
+import math
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from domain.company.company import Company
@@ -7,45 +14,233 @@ from infrastructure.persistence.sqlalchemy_company_repository import (
     SQLAlchemyCompanyRepository,
 )
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from config import Config
-from typing import List
+from typing import List, Optional
 from application.task_service import TaskService
 from infrastructure.persistence.sqlalchemy_task_repository import (
     SQLAlchemyTaskRepository,
 )
-from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
+from infrastructure.persistence.database_session import (
+    AsyncDatabaseSession,
+    DatabaseSession,
+    ThreadpoolDatabaseSession,
+)
+from infrastructure.background.task_archiver import TaskArchiver
+from infrastructure.background.task_lease_reaper import TaskLeaseReaper
+from infrastructure.cache.company_token_cache import CompanyTokenCache
+from infrastructure.monitoring.pool_metrics import PoolMetrics
+from infrastructure.monitoring.query_budget import QueryBudgetMiddleware
+from infrastructure.monitoring.prometheus import MetricFamily, counter, gauge, render
+from infrastructure.monitoring.query_metrics import instrument_engine
+from infrastructure.monitoring.request_metrics import (
+    RequestMetrics,
+    RequestTimingMiddleware,
+)
+from infrastructure.notifications.task_notifier import TaskNotifier
+from infrastructure.persistence.sqlalchemy_rate_limit_store import (
+    SQLAlchemyRateLimitStore,
+)
+from infrastructure.rate_limit.company_rate_limiter import (
+    CompanyRateLimiter,
+    InMemoryRateLimitStore,
+    RateLimitBudget,
+)
+from infrastructure.web.bulk_import import (
+    CsvInvoiceParser,
+    ImportStreamingResponse,
+    NdjsonInvoiceParser,
+    iter_lines,
+)
+from infrastructure.web.compression import SelectiveGZipMiddleware
+from infrastructure.web.json_response import FastJSONResponse
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from domain.exceptions import (
     DuplicateTaskException,
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyReusedException,
     TaskExistsException,
     InvalidStatusException,
+    InvalidCursorException,
     TaskNotOwnedException,
     DatabaseException,
     TaskNotFoundException,
+    RateLimitExceededException,
 )
 from domain.task.schemas import (
+    SingleInvoiceAction,
     SingleInvoiceTaskRequest,
     MultipleInvoicesTaskRequest,
     SingleInvoiceStatusRequest,
+    TaskStatusEvent,
+    TaskLeaseRenewalRequest,
     TaskStatusUpdateByUUIDRequest,
 )
 
 app = FastAPI()
 security = HTTPBearer()
+# Server-sent events are flushed one by one, gzip would hold them back
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=Config.GZIP_MINIMUM_SIZE,
+    compresslevel=Config.GZIP_COMPRESS_LEVEL,
+    exclude_paths=("/tasks/status/stream",),
+)
+# Streams query the database for as long as they stay open
+app.add_middleware(
+    QueryBudgetMiddleware,
+    budget=Config.DB_QUERY_BUDGET,
+    expose_headers=Config.DB_QUERY_HEADERS,
+    exclude_paths=("/tasks/status/stream", "/tasks/buyer/sign_single_invoice/import"),
+)
+# Outermost, so that latencies include compression and unhandled errors
+request_metrics = RequestMetrics()
+app.add_middleware(RequestTimingMiddleware, metrics=request_metrics)
+
+# Maximum number of status events read per query by the status stream
+TASK_STATUS_STREAM_BATCH_SIZE = 500
+# Seconds before the status stream reads again changes held back behind
+# transactions still running
+TASK_STATUS_STREAM_HELD_BACK_DELAY = 0.2
+
 
 # Database setup
-engine = create_engine(Config().SQLALCHEMY_DATABASE_URI)
+def _pool_options(metrics: PoolMetrics, pool_class) -> dict:
+    return {
+        "poolclass": metrics.instrument(pool_class),
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+    }
+
+
+pool_metrics = PoolMetrics()
+engine = create_engine(
+    Config().SQLALCHEMY_DATABASE_URI, **_pool_options(pool_metrics, QueuePool)
+)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Requests use the asyncio driver when DB_ASYNC is set; background jobs stay sync
+async_pool_metrics = PoolMetrics()
+async_engine = (
+    create_async_engine(
+        Config().SQLALCHEMY_ASYNC_DATABASE_URI,
+        **_pool_options(async_pool_metrics, AsyncAdaptedQueuePool),
+    )
+    if Config.DB_ASYNC
+    else None
+)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+# Saves the companies lookup on every authenticated request
+company_token_cache = CompanyTokenCache(
+    ttl=Config.AUTH_TOKEN_CACHE_TTL,
+    max_size=Config.AUTH_TOKEN_CACHE_SIZE,
+    sync_interval=Config.AUTH_TOKEN_INVALIDATION_SYNC,
+)
+
+# Per-company request budgets, see _rate_limit
+RATE_LIMIT_WRITE = "write"
+RATE_LIMIT_STATUS = "status"
+RATE_LIMIT_MACHINE = "machine"
+rate_limiter = CompanyRateLimiter(
+    (
+        SQLAlchemyRateLimitStore(SessionLocal)
+        if Config.RATE_LIMIT_STORE == "database"
+        else InMemoryRateLimitStore()
+    ),
+    {
+        RATE_LIMIT_WRITE: RateLimitBudget(
+            Config.RATE_LIMIT_WRITE_RATE, Config.RATE_LIMIT_WRITE_BURST
+        ),
+        RATE_LIMIT_STATUS: RateLimitBudget(
+            Config.RATE_LIMIT_STATUS_RATE, Config.RATE_LIMIT_STATUS_BURST
+        ),
+        RATE_LIMIT_MACHINE: RateLimitBudget(
+            Config.RATE_LIMIT_MACHINE_RATE, Config.RATE_LIMIT_MACHINE_BURST
+        ),
+    },
+)
+
+# Wakes up machines long-polling for tasks
+task_notifier = TaskNotifier()
+# Wakes up clients streaming task status changes
+task_status_notifier = TaskNotifier()
+
+# Background release of tasks whose machine lease expired
+task_lease_reaper = TaskLeaseReaper(
+    SessionLocal,
+    interval=Config.TASK_REAPER_INTERVAL,
+    max_attempts=Config.TASK_MAX_ATTEMPTS,
+    task_notifiers=(task_notifier, task_status_notifier),
+    status_events_retention=Config.TASK_STATUS_EVENTS_RETENTION,
+    idempotency_key_ttl=Config.IDEMPOTENCY_KEY_TTL,
+)
+
+# Background archival of finished tasks and company_tasks partition upkeep
+task_archiver = TaskArchiver(
+    SessionLocal,
+    interval=Config.TASK_ARCHIVE_INTERVAL,
+    retention_days=Config.TASK_ARCHIVE_RETENTION_DAYS,
+    batch_size=Config.TASK_ARCHIVE_BATCH_SIZE,
+    archive_dir=Config.TASK_ARCHIVE_DIR,
+    partitions_ahead=Config.TASK_PARTITIONS_AHEAD,
+)
+
+
+@app.on_event("startup")
+def start_task_lease_reaper():
+    if Config.TASK_REAPER_INTERVAL > 0:
+        task_lease_reaper.start()
+
+
+@app.on_event("startup")
+def start_task_archiver():
+    if Config.TASK_ARCHIVE_INTERVAL > 0:
+        task_archiver.start()
+
+
+@app.on_event("shutdown")
+def stop_task_lease_reaper():
+    task_lease_reaper.stop()
+
+
+@app.on_event("shutdown")
+def stop_task_archiver():
+    task_archiver.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    if AsyncSessionLocal is not None:
+        db = AsyncDatabaseSession(AsyncSessionLocal())
+    else:
+        db = ThreadpoolDatabaseSession(SessionLocal())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
 
 # Pydantic models
@@ -59,22 +254,270 @@ class TokenResponse(BaseModel):
 
 # Authorization service
 async def get_current_company(
-    credentials: HTTPAuthorizationCredentials = Depends(security), db=Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: DatabaseSession = Depends(get_db),
 ):
     auth_token = credentials.credentials
-    repository = SQLAlchemyCompanyRepository(db)
-    company = repository.find_by_token(auth_token)
-    if not company:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token",
-            headers={"WWW-Authenticate": "Bearer"},
+    # The session only checks out a connection once a query runs, so a cache
+    # hit between two syncs never touches the database
+    if company_token_cache.sync_due():
+        await db.run(
+            lambda session: company_token_cache.sync(
+                SQLAlchemyCompanyRepository(session)
+            )
+        )
+    company = company_token_cache.get(auth_token)
+    if company is None:
+        company = await db.run(
+            lambda session: SQLAlchemyCompanyRepository(session).find_by_token(
+                auth_token
+            )
         )
+        if not company:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        company_token_cache.put(auth_token, company)
     return company
 
 
+def _rate_limit(budget: str):
+    """
+    Build a dependency admitting the authenticated company's request against
+    one of its budgets: task creation, status queries or machine polling.
+
+    Raises:
+        RateLimitExceededException: If the company's budget is exhausted
+    """
+
+    async def check_rate_limit(
+        current_company: Company = Depends(get_current_company),
+    ):
+        if rate_limiter.store.blocking:
+            retry_after = await run_in_threadpool(
+                rate_limiter.acquire, current_company.company_uuid, budget
+            )
+        else:
+            retry_after = rate_limiter.acquire(current_company.company_uuid, budget)
+        if retry_after > 0:
+            raise RateLimitExceededException("Too many requests", budget, retry_after)
+
+    return check_rate_limit
+
+
+def _task_service(session: Session) -> TaskService:
+    return TaskService(SQLAlchemyTaskRepository(session))
+
+
+def _request_hash(path: str, request: BaseModel) -> str:
+    return hashlib.sha256(f"{path}\n{request.json()}".encode()).hexdigest()
+
+
+async def _run_idempotent(
+    current_company: Company,
+    db: DatabaseSession,
+    idempotency_key: Optional[str],
+    request_hash: str,
+    create_response,
+) -> Response:
+    """
+    Run `create_response` at most once per Idempotency-Key.
+
+    The first request with a key is processed and its response stored;
+    retries with the same key and request get the stored response back,
+    marked with an Idempotent-Replayed header, without touching the task
+    tables. If processing fails or is cancelled the key is released so a
+    retry runs again; a key whose request died without releasing it is taken
+    over once IDEMPOTENCY_CLAIM_TIMEOUT has passed. Requests without a key
+    are simply processed.
+    """
+    if idempotency_key is None:
+        return await create_response()
+
+    claimed_at = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+    stored = await db.run(
+        lambda session: _task_service(session).begin_idempotent_request(
+            current_company,
+            idempotency_key,
+            request_hash,
+            claimed_at,
+            Config.IDEMPOTENCY_CLAIM_TIMEOUT,
+        )
+    )
+    if stored is not None:
+        return Response(
+            content=stored.response_body,
+            status_code=stored.response_status,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        response = await create_response()
+    except (Exception, asyncio.CancelledError):
+        # Shielded so that a cancelled request still gets to release its key
+        with anyio.CancelScope(shield=True):
+            await db.run(
+                lambda session: _task_service(session).release_idempotent_request(
+                    current_company, idempotency_key, claimed_at
+                )
+            )
+        raise
+    await db.run(
+        lambda session: _task_service(session).complete_idempotent_request(
+            current_company,
+            idempotency_key,
+            claimed_at,
+            response.status_code,
+            response.body.decode(),
+        )
+    )
+    return response
+
+
+def _has_machine_tasks(result: dict) -> bool:
+    return bool(result["SingleInvoiceTask"] or result["MultipleInvoicesTask"])
+
+
+async def _long_poll_machine_tasks(
+    current_company: Company, db: DatabaseSession, wait: int, fetch_tasks
+) -> dict:
+    """
+    Fetch machine tasks, waiting up to `wait` seconds for some to appear.
+
+    The notifier version is read before each fetch, so tasks created between
+    an empty fetch and the wait still wake the request up. The session is
+    closed before waiting so no pooled connection is held while idle.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(wait, Config.MACHINE_LONG_POLL_MAX_WAIT)
+    while True:
+        version = task_notifier.version(current_company.company_uuid)
+        result = await db.run(fetch_tasks)
+        remaining = deadline - loop.time()
+        if _has_machine_tasks(result) or remaining <= 0:
+            return result
+
+        await db.close()
+        if not await task_notifier.wait(
+            current_company.company_uuid, version, remaining
+        ):
+            return result
+
+
+@app.get("/metrics/db-pool", status_code=status.HTTP_200_OK)
+def get_db_pool_metrics():
+    """
+    Get connection pool usage of the database engines.
+
+    Returns:
+    ```json
+    {
+        "sync": {
+            "pool_size": 5,
+            "checked_out": 2,
+            "checked_in": 3,
+            "overflow": 0,
+            "overflow_max": 4,
+            "checkouts_total": 1520,
+            "checkout_timeouts_total": 0,
+            "checkout_wait_seconds_total": 0.84,
+            "checkout_wait_seconds_max": 0.12
+        },
+        "async": null
+    }
+    ```
+
+    Notes:
+        - "async" is only reported when DB_ASYNC is enabled
+        - Counters are per worker process and reset on restart
+        - A growing checkout_wait_seconds_max or any checkout timeout means the
+          pool is exhausted: raise DB_POOL_SIZE / DB_MAX_OVERFLOW
+    """
+    return {
+        "sync": pool_metrics.snapshot(engine.pool),
+        "async": (
+            async_pool_metrics.snapshot(async_engine.sync_engine.pool)
+            if async_engine is not None
+            else None
+        ),
+    }
+
+
+# /metrics/db-pool snapshot keys exposed by /metrics, with their metric type
+POOL_METRICS = (
+    ("pool_size", gauge, "Connections kept by the pool"),
+    ("checked_out", gauge, "Connections in use"),
+    ("checked_in", gauge, "Idle connections in the pool"),
+    ("overflow", gauge, "Connections open beyond pool_size"),
+    ("overflow_max", gauge, "Highest overflow seen at a checkout"),
+    ("checkouts_total", counter, "Connection checkouts"),
+    ("checkout_timeouts_total", counter, "Checkouts that timed out"),
+    ("checkout_wait_seconds_total", counter, "Time spent waiting for a connection"),
+    ("checkout_wait_seconds_max", gauge, "Longest wait for a connection"),
+)
+
+
+def _pool_metric_families() -> List[MetricFamily]:
+    snapshots = {"sync": pool_metrics.snapshot(engine.pool)}
+    if async_engine is not None:
+        snapshots["async"] = async_pool_metrics.snapshot(async_engine.sync_engine.pool)
+
+    families = []
+    for key, metric_type, documentation in POOL_METRICS:
+        family = metric_type(f"db_pool_{key}", documentation, ("engine",))
+        for engine_name, snapshot in snapshots.items():
+            if snapshot[key] is not None:
+                family.set((engine_name,), snapshot[key])
+        families.append(family)
+    return families
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(db: DatabaseSession = Depends(get_db)):
+    """
+    Get the server metrics in the Prometheus text exposition format.
+
+    Exposes:
+        - http_request_duration_seconds{method,route}: latency histogram
+        - http_requests_total{method,route,status}: requests by status code
+        - http_request_db_queries{method,route} and
+          http_request_db_query_duration_seconds{method,route}: SQL statements
+          and time spent in them per request
+        - tasks_queue_depth{company_uuid,task_type,status}: WAITING,
+          PROCESSING and FAILED tasks
+        - db_pool_*{engine}: connection pool usage, as in /metrics/db-pool
+
+    Notes:
+        - Request metrics are per worker process and reset on restart; queue
+          depths are read from the database on every scrape
+    """
+    queue_depths = await db.run(
+        lambda session: _task_service(session).get_task_queue_depths()
+    )
+    queue_depth = gauge(
+        "tasks_queue_depth",
+        "Tasks waiting, processing or failed",
+        ("company_uuid", "task_type", "status"),
+    )
+    for group in queue_depths:
+        queue_depth.set(
+            (group["company_uuid"], group["task_type"], group["status"]),
+            group["count"],
+        )
+
+    return PlainTextResponse(
+        render([*request_metrics.families(), queue_depth, *_pool_metric_families()]),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @app.post("/register", response_model=TokenResponse)
-def register_company(request: CompanyRegisterRequest, db=Depends(get_db)):
+async def register_company(
+    request: CompanyRegisterRequest, db: DatabaseSession = Depends(get_db)
+):
     """
     Register a new company and generate its authentication token.
 
@@ -97,15 +540,18 @@ def register_company(request: CompanyRegisterRequest, db=Depends(get_db)):
         - Store this token securely as it will be needed for all future requests
         - Token is required in Authorization header for authenticated endpoints
     """
-    repository = SQLAlchemyCompanyRepository(db)
-    service = CompanyService(repository)
-    company = service.register_company(request.name)
+    company = await db.run(
+        lambda session: CompanyService(
+            SQLAlchemyCompanyRepository(session)
+        ).register_company(request.name)
+    )
     return {"auth_token": company.auth_token}
 
 
 @app.post("/regenerate-token", response_model=TokenResponse)
-def regenerate_auth_token(
-    current_company: Company = Depends(get_current_company), db=Depends(get_db)
+async def regenerate_auth_token(
+    current_company: Company = Depends(get_current_company),
+    db: DatabaseSession = Depends(get_db),
 ):
     """
     Generate a new authentication token for the company.
@@ -126,17 +572,24 @@ def regenerate_auth_token(
         - Update your stored token with the new one
         - New token must be used for all subsequent requests
     """
-    repository = SQLAlchemyCompanyRepository(db)
-    service = CompanyService(repository)
-    company = service.regenerate_auth_token(current_company.auth_token)
+    company = await db.run(
+        lambda session: CompanyService(
+            SQLAlchemyCompanyRepository(session), company_token_cache
+        ).regenerate_auth_token(current_company.auth_token)
+    )
     return {"auth_token": company.auth_token}
 
 
-@app.post("/tasks/buyer/sign_single_invoice", status_code=status.HTTP_200_OK)
-def create_single_invoice_task(
+@app.post(
+    "/tasks/buyer/sign_single_invoice",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_WRITE))],
+)
+async def create_single_invoice_task(
     request: SingleInvoiceTaskRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: DatabaseSession = Depends(get_db),
 ):
     """
     Create tasks for signing individual invoices as a buyer.
@@ -145,6 +598,11 @@ def create_single_invoice_task(
         Requires Bearer token in Authorization header
         Example: Authorization: Bearer <auth_token>
 
+    Headers:
+        Idempotency-Key: Optional key making retries safe; a retry with the
+            same key and body gets the original response back (with an
+            Idempotent-Replayed header) for IDEMPOTENCY_KEY_TTL seconds
+
     Request Body:
     ```json
     {
@@ -166,9 +624,23 @@ def create_single_invoice_task(
 
     Returns:
         200 OK: Tasks created successfully
-        409 Conflict: Tasks already exist or duplicates found
+        409 Conflict: Tasks already exist or duplicates found (or the request with the same
+            Idempotency-Key is still being processed)
+        422 Unprocessable Entity: Idempotency-Key reused with another request
         500 Internal Server Error: Database error
 
+    Success Response:
+    ```json
+    {
+        "message": "Single invoice tasks created successfully",
+        "tasks_uuid": ["550e8400-e29b-41d4-a716-446655440000"]
+    }
+    ```
+
+    Notes:
+        - All invoices of the request are created in a single transaction;
+          if any of them fails, none is created
+
     Error Response Examples:
     ```json
     {
@@ -184,37 +656,189 @@ def create_single_invoice_task(
     }
     ```
     """
-    repository = SQLAlchemyTaskRepository(db)
-    service = TaskService(repository)
-    try:
-        service.create_single_invoice_task(
-            current_company, request.action_type, request.invoices
-        )
-        return JSONResponse(
-            content={"message": "Single invoice tasks created successfully"},
-            status_code=status.HTTP_200_OK,
-        )
-    except (DuplicateTaskException, TaskExistsException) as e:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={
-                "message": e.message,
-                "duplicates": getattr(e, "duplicates", None),
-                "existing_tasks": getattr(e, "existing_tasks", None),
-            },
-        )
-    except DatabaseException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": e.message, "code": e.code, "details": e.details},
+
+    async def create_tasks():
+        try:
+            tasks_uuid = await db.run(
+                lambda session: _task_service(session).create_single_invoice_task(
+                    current_company, request.action_type, request.invoices
+                )
+            )
+            task_notifier.notify(current_company.company_uuid)
+            return FastJSONResponse(
+                content={
+                    "message": "Single invoice tasks created successfully",
+                    "tasks_uuid": [str(task_uuid) for task_uuid in tasks_uuid],
+                },
+                status_code=status.HTTP_200_OK,
+            )
+        except (DuplicateTaskException, TaskExistsException) as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": e.message,
+                    "duplicates": getattr(e, "duplicates", None),
+                    "existing_tasks": getattr(e, "existing_tasks", None),
+                },
+            )
+        except DatabaseException as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={"message": e.message, "code": e.code, "details": e.details},
+            )
+
+    return await _run_idempotent(
+        current_company,
+        db,
+        idempotency_key,
+        _request_hash("/tasks/buyer/sign_single_invoice", request),
+        create_tasks,
+    )
+
+
+def _ndjson(results: List[dict]) -> str:
+    return "".join(json.dumps(result) + "\n" for result in results)
+
+
+async def _stream_single_invoice_import(
+    current_company: Company,
+    db: DatabaseSession,
+    action_type: str,
+    lines,
+    parser,
+):
+    """
+    Validate and create the invoices of an upload chunk by chunk.
+
+    Invalid lines are reported as soon as they are read; valid invoices are
+    created every IMPORT_CHUNK_SIZE lines, then their results are sent. A
+    summary counting the results by status ends the stream.
+    """
+    summary = {}
+
+    async def import_chunk(chunk):
+        results = await db.run(
+            lambda session: _task_service(session).import_single_invoice_tasks(
+                current_company, action_type, chunk
+            )
         )
+        if any(result["status"] == "created" for result in results):
+            task_notifier.notify(current_company.company_uuid)
+        return results
+
+    chunk = []
+    async for line_number, line in lines:
+        if line is None:
+            results = [
+                {
+                    "line": line_number,
+                    "status": "invalid",
+                    "error": f"Line is longer than {Config.IMPORT_MAX_LINE_BYTES} "
+                    "bytes or is not UTF-8",
+                }
+            ]
+        else:
+            try:
+                invoice = parser.parse(line)
+            except ValueError as e:
+                results = [{"line": line_number, "status": "invalid", "error": str(e)}]
+            else:
+                if invoice is not None:
+                    chunk.append((line_number, invoice))
+                if len(chunk) < Config.IMPORT_CHUNK_SIZE:
+                    continue
+                results = await import_chunk(chunk)
+                chunk = []
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        yield _ndjson(results)
+
+    if chunk:
+        results = await import_chunk(chunk)
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        yield _ndjson(results)
+    yield _ndjson([{"summary": summary}])
 
 
-@app.post("/tasks/supplier/sign_all_invoices", status_code=status.HTTP_200_OK)
-def create_multiple_invoices_task(
+@app.post(
+    "/tasks/buyer/sign_single_invoice/import",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_WRITE))],
+)
+async def import_single_invoice_tasks(
+    request: Request,
+    action_type: str = Query(SingleInvoiceAction.BUYER_SIGN_INVOICE.value),
+    current_company: Company = Depends(get_current_company),
+    db: DatabaseSession = Depends(get_db),
+):
+    """
+    Create single invoice tasks from a streamed NDJSON or CSV upload.
+
+    Unlike POST /tasks/buyer/sign_single_invoice, the body is not parsed as a
+    whole: lines are validated and created in chunks of IMPORT_CHUNK_SIZE as
+    they arrive, so memory use does not depend on the upload size.
+
+    Authentication:
+        Requires Bearer token in Authorization header
+
+    Query Parameters:
+        action_type: Action of the created tasks (defaults to BuyerSignInvoice)
+
+    Request Body:
+        Content-Type application/x-ndjson, one invoice per line:
+    ```
+    {"my_company_idno": "1234567890123", "person_name_certificate": "Person_Name", "seria": "AA", "number": "123"}
+    ```
+        or Content-Type text/csv, with a header line:
+    ```
+    my_company_idno,person_name_certificate,seria,number
+    1234567890123,Person_Name,AA,123
+    ```
+
+    Returns:
+        200 OK with an NDJSON stream of per-line results, then a summary:
+    ```
+    {"line": 1, "status": "created", "task_uuid": "550e8400-e29b-41d4-a716-446655440000"}
+    {"line": 2, "status": "invalid", "error": "..."}
+    {"summary": {"created": 1, "invalid": 1}}
+    ```
+
+    Notes:
+        - Line statuses: created, exists (already in the database), duplicate
+          (repeated earlier in the same chunk), invalid, error (the chunk
+          could not be saved)
+        - Each chunk is created in its own transaction; lines of a chunk
+          that failed can be sent again
+    """
+    content_type = request.headers.get("content-type", "")
+    parser = (
+        CsvInvoiceParser()
+        if content_type.startswith("text/csv")
+        else NdjsonInvoiceParser()
+    )
+    return ImportStreamingResponse(
+        _stream_single_invoice_import(
+            current_company,
+            db,
+            action_type,
+            iter_lines(request.stream(), Config.IMPORT_MAX_LINE_BYTES),
+            parser,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post(
+    "/tasks/supplier/sign_all_invoices",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_WRITE))],
+)
+async def create_multiple_invoices_task(
     request: MultipleInvoicesTaskRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: DatabaseSession = Depends(get_db),
 ):
     """
     Create tasks for signing all invoices  from defined page in action_type as a supplier.
@@ -222,6 +846,11 @@ def create_multiple_invoices_task(
     Authentication:
         Requires Bearer token in Authorization header
 
+    Headers:
+        Idempotency-Key: Optional key making retries safe; a retry with the
+            same key and body gets the original response back (with an
+            Idempotent-Replayed header) for IDEMPOTENCY_KEY_TTL seconds
+
     Request Body:
     ```json
     {
@@ -246,38 +875,62 @@ def create_multiple_invoices_task(
         (Future action types can be added here)
 
     Returns:
-        200 OK: Tasks created successfully
-        409 Conflict: Duplicates found
+        200 OK: Tasks created successfully, with their UUIDs in "tasks_uuid"
+        409 Conflict: Duplicates found (or the request with the same
+            Idempotency-Key is still being processed)
+        422 Unprocessable Entity: Idempotency-Key reused with another request
         500 Internal Server Error: Database error
     """
-    repository = SQLAlchemyTaskRepository(db)
-    service = TaskService(repository)
-    try:
-        service.create_multiple_invoices_task(
-            current_company, request.action_type, request.invoices
-        )
-        return JSONResponse(
-            content={"message": "Multiple invoices task created successfully"},
-            status_code=status.HTTP_200_OK,
-        )
-    except DuplicateTaskException as e:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"message": e.message, "code": e.code, "duplicates": e.duplicates},
-        )
 
-    except DatabaseException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": e.message, "code": e.code, "details": e.details},
-        )
+    async def create_tasks():
+        try:
+            tasks_uuid = await db.run(
+                lambda session: _task_service(session).create_multiple_invoices_task(
+                    current_company, request.action_type, request.invoices
+                )
+            )
+            task_notifier.notify(current_company.company_uuid)
+            return FastJSONResponse(
+                content={
+                    "message": "Multiple invoices task created successfully",
+                    "tasks_uuid": [str(task_uuid) for task_uuid in tasks_uuid],
+                },
+                status_code=status.HTTP_200_OK,
+            )
+        except DuplicateTaskException as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": e.message,
+                    "code": e.code,
+                    "duplicates": e.duplicates,
+                },
+            )
+
+        except DatabaseException as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={"message": e.message, "code": e.code, "details": e.details},
+            )
+
+    return await _run_idempotent(
+        current_company,
+        db,
+        idempotency_key,
+        _request_hash("/tasks/supplier/sign_all_invoices", request),
+        create_tasks,
+    )
 
 
-@app.post("/tasks/status/singleInvoice", status_code=status.HTTP_200_OK)
-def get_single_invoice_tasks_status(
+@app.post(
+    "/tasks/status/singleInvoice",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_STATUS))],
+)
+async def get_single_invoice_tasks_status(
     tasks: List[SingleInvoiceStatusRequest],
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: DatabaseSession = Depends(get_db),
 ):
     """
     Get status of single invoice tasks.
@@ -306,13 +959,18 @@ def get_single_invoice_tasks_status(
         ]
     }
     ```
-    """
-    task_repository = SQLAlchemyTaskRepository(db)
-    task_service = TaskService(task_repository)
 
+    Notes:
+        - Invoices are matched on the exact (my_company_idno, seria, number) key
+        - Responds 403 Forbidden if any matched invoice belongs to another company
+    """
     try:
-        result = task_service.get_single_invoice_tasks_status(current_company, tasks)
-        return JSONResponse(content=result.dict(), status_code=status.HTTP_200_OK)
+        result = await db.run(
+            lambda session: _task_service(session).get_single_invoice_tasks_status(
+                current_company, tasks
+            )
+        )
+        return FastJSONResponse(content=result.dict(), status_code=status.HTTP_200_OK)
     except DatabaseException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -320,11 +978,11 @@ def get_single_invoice_tasks_status(
         )
 
 
-@app.put("/tasks/status")
-def update_tasks_status(
+@app.put("/tasks/status", dependencies=[Depends(_rate_limit(RATE_LIMIT_MACHINE))])
+async def update_tasks_status(
     request: List[TaskStatusUpdateByUUIDRequest],
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: DatabaseSession = Depends(get_db),
 ):
     """
     Update status of tasks by their UUIDs.
@@ -334,11 +992,17 @@ def update_tasks_status(
     [
         {
             "task_uuid": "550e8400-e29b-41d4-a716-446655440000",
-            "status": "COMPLETED"
+            "status": "COMPLETED",
+            "attempt": 1
         }
     ]
     ```
 
+    "attempt" is the one the task was handed out with by the machine
+    endpoints (0, the default, for tasks that were never claimed). Updates
+    carrying another attempt than the task's current one are not applied:
+    they come from a machine whose lease expired before it reported.
+
     Task Statuses:
         - WAITING: Task is waiting to be processed
         - PROCESSING: Task is currently being processed
@@ -347,18 +1011,26 @@ def update_tasks_status(
         - USB_NOT_FOUND: USB device required for signing was not found
 
     Returns:
-        200 OK: Status updated successfully
+        200 OK: Status updated successfully, with the number of updated rows
+            in "updated_tasks" (lower than the distinct task count if an update
+            was lost or came from a stale attempt)
         404 Not Found: Task not found
         403 Forbidden: Task doesn't belong to company
         400 Bad Request: Invalid status
         500 Internal Server Error: Database error
     """
-    repository = SQLAlchemyTaskRepository(db)
-    service = TaskService(repository)
     try:
-        service.update_tasks_status_by_uuid(current_company, request)
-        return JSONResponse(
-            content={"message": "Tasks status updated successfully"},
+        updated_tasks = await db.run(
+            lambda session: _task_service(session).update_tasks_status_by_uuid(
+                current_company, request
+            )
+        )
+        task_status_notifier.notify(current_company.company_uuid)
+        return FastJSONResponse(
+            content={
+                "message": "Tasks status updated successfully",
+                "updated_tasks": updated_tasks,
+            },
             status_code=status.HTTP_200_OK,
         )
     except TaskNotFoundException as e:
@@ -368,6 +1040,7 @@ def update_tasks_status(
                 "message": e.message,
                 "code": e.code,
                 "task_uuid": str(e.task_uuid),
+                "tasks_uuid": [str(task_uuid) for task_uuid in e.tasks_uuid],
             },
         )
     except InvalidStatusException as e:
@@ -378,7 +1051,7 @@ def update_tasks_status(
     except TaskNotOwnedException as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail={"message": e.message, "code": e.code},
+            detail={"message": e.message, "code": e.code, "tasks": e.task_details},
         )
     except DatabaseException as e:
         raise HTTPException(
@@ -387,13 +1060,31 @@ def update_tasks_status(
         )
 
 
-@app.get("/machine/tasks", status_code=status.HTTP_200_OK)
-def get_structured_waiting_tasks_for_machine(
+@app.get(
+    "/machine/tasks",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_MACHINE))],
+)
+async def get_structured_waiting_tasks_for_machine(
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
+    wait: int = Query(0, ge=0),
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: DatabaseSession = Depends(get_db),
 ):
     """
-    Get all waiting tasks structured by person name and IDNO for the machine.
+    Get a page of waiting tasks structured by person name and IDNO for the machine.
+
+    Tasks are returned oldest first. Pages are keyed on the task creation time
+    and UUID, so pass the returned `next_cursor` back as `cursor` to read the
+    following page; it is null once fewer than `limit` tasks were left.
+
+    Query Parameters:
+        limit: Maximum number of tasks in the page (defaults to and is capped
+            at MACHINE_TASKS_PAGE_SIZE)
+        cursor: `next_cursor` of the previous page, omitted for the first page
+        wait: Seconds to hold the request open until tasks appear (long polling,
+            capped at MACHINE_LONG_POLL_MAX_WAIT). Defaults to 0, answering at once
 
     Returns:
     ```json
@@ -405,7 +1096,8 @@ def get_structured_waiting_tasks_for_machine(
                         "seria": "AA",
                         "number": "123",
                         "task_uuid": "uuid",
-                        "action_type": "BuyerSignInvoice"
+                        "action_type": "BuyerSignInvoice",
+                        "attempt": 0
                     }
                 ]
             }
@@ -414,17 +1106,167 @@ def get_structured_waiting_tasks_for_machine(
             {
                 "my_company_idno": "IDNO1",
                 "task_uuid": "uuid",
-                "action_type": "SupplierSignAllDraftedInvoices"
+                "action_type": "SupplierSignAllDraftedInvoices",
+                "attempt": 0
             }
-        ]
+        ],
+        "next_cursor": "MjAyNS0wMi0xMVQxMjowMDowMHx1dWlk"
+    }
+    ```
+    """
+    config = Config()
+    try:
+        result = await _long_poll_machine_tasks(
+            current_company,
+            db,
+            wait,
+            lambda session: _task_service(
+                session
+            ).get_structured_waiting_tasks_for_machine(
+                current_company,
+                min(
+                    limit or config.MACHINE_TASKS_PAGE_SIZE,
+                    config.MACHINE_TASKS_PAGE_SIZE,
+                ),
+                cursor,
+            ),
+        )
+        return FastJSONResponse(content=result, status_code=status.HTTP_200_OK)
+    except DatabaseException as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": e.message, "code": e.code, "details": e.details},
+        )
+
+
+@app.post(
+    "/machine/tasks/claim",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_MACHINE))],
+)
+async def claim_waiting_tasks_for_machine(
+    limit: Optional[int] = Query(None, ge=1),
+    wait: int = Query(0, ge=0),
+    current_company: Company = Depends(get_current_company),
+    db: DatabaseSession = Depends(get_db),
+):
+    """
+    Claim a batch of waiting tasks for the machine.
+
+    Unlike GET /machine/tasks, the returned tasks are moved to PROCESSING with
+    a lease, so several machines polling with the same company token never
+    receive the same task.
+
+    Authentication:
+        Requires Bearer token in Authorization header
+
+    Query Parameters:
+        limit: Maximum number of tasks to claim (defaults to and is capped at
+            MACHINE_CLAIM_LIMIT)
+        wait: Seconds to hold the request open until tasks appear (long polling,
+            capped at MACHINE_LONG_POLL_MAX_WAIT). Defaults to 0, answering at once
+
+    Returns:
+    ```json
+    {
+        "SingleInvoiceTask": {
+            "Person_Name": {
+                "IDNO1": [
+                    {
+                        "seria": "AA",
+                        "number": "123",
+                        "task_uuid": "uuid",
+                        "action_type": "BuyerSignInvoice",
+                        "attempt": 1
+                    }
+                ]
+            }
+        },
+        "MultipleInvoicesTask": {},
+        "lease_expires_at": "2025-02-11T12:15:00"
+    }
+    ```
+
+    Notes:
+        - Report the result of every claimed task through PUT /tasks/status
+          before the lease expires, with the task's "attempt": once the lease
+          expires and the task is claimed again, reports of the earlier
+          attempt are ignored
+        - Renew the lease through POST /machine/tasks/lease before starting
+          each task, so a long batch does not outlive it
+    """
+    config = Config()
+    try:
+        result = await _long_poll_machine_tasks(
+            current_company,
+            db,
+            wait,
+            lambda session: _task_service(
+                session
+            ).claim_structured_waiting_tasks_for_machine(
+                current_company,
+                min(limit or config.MACHINE_CLAIM_LIMIT, config.MACHINE_CLAIM_LIMIT),
+                config.TASK_LEASE_SECONDS,
+            ),
+        )
+        if _has_machine_tasks(result):
+            task_status_notifier.notify(current_company.company_uuid)
+        return FastJSONResponse(content=result, status_code=status.HTTP_200_OK)
+    except DatabaseException as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": e.message, "code": e.code, "details": e.details},
+        )
+
+
+@app.post(
+    "/machine/tasks/lease",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(_rate_limit(RATE_LIMIT_MACHINE))],
+)
+async def renew_task_leases(
+    request: List[TaskLeaseRenewalRequest],
+    current_company: Company = Depends(get_current_company),
+    db: DatabaseSession = Depends(get_db),
+):
+    """
+    Renew the leases of claimed tasks the machine is still working on.
+
+    Authentication:
+        Requires Bearer token in Authorization header
+
+    Request Body:
+    ```json
+    [
+        {
+            "task_uuid": "550e8400-e29b-41d4-a716-446655440000",
+            "attempt": 1
+        }
+    ]
+    ```
+
+    Returns:
+    ```json
+    {
+        "renewed": ["550e8400-e29b-41d4-a716-446655440000"],
+        "lease_expires_at": "2025-02-11T12:30:00"
     }
     ```
+
+    Notes:
+        - Call it before starting each claimed task: the lease is extended by
+          TASK_LEASE_SECONDS from now
+        - A task missing from "renewed" is no longer held by this claim (its
+          lease expired and it was requeued or claimed again) and must not be
+          processed
     """
     try:
-        task_repository = SQLAlchemyTaskRepository(db)
-        task_service = TaskService(task_repository)
-        result = task_service.get_structured_waiting_tasks_for_machine(current_company)
-        return JSONResponse(content=result, status_code=status.HTTP_200_OK)
+        result = await db.run(
+            lambda session: _task_service(session).renew_task_leases(
+                current_company, request, Config.TASK_LEASE_SECONDS
+            )
+        )
+        return FastJSONResponse(content=result, status_code=status.HTTP_200_OK)
     except DatabaseException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -432,6 +1274,117 @@ def get_structured_waiting_tasks_for_machine(
         )
 
 
+def _format_task_status_event(event: TaskStatusEvent) -> str:
+    data = json.dumps(
+        {
+            "task_uuid": str(event.task_uuid),
+            "status": event.status.value,
+            "created_at": event.created_at.isoformat(),
+        }
+    )
+    return f"id: {event.event_id}\nevent: task_status\ndata: {data}\n\n"
+
+
+async def _stream_task_status_events(
+    current_company: Company,
+    db: DatabaseSession,
+    last_event_id: Optional[int],
+    keepalive: float,
+):
+    """
+    Yield the company's task status changes as Server-Sent Events, forever.
+
+    Events are read from the status log after `last_event_id`, or after the
+    latest logged event when the client starts fresh, following the
+    (transaction_id, event_id) cursor of the last event sent. While there is
+    nothing to send the session is closed and the stream waits on the status
+    notifier, sending a comment every `keepalive` seconds to keep the
+    connection open.
+    """
+    cursor = await db.run(
+        lambda session: _task_service(session).get_task_status_event_cursor(
+            current_company, last_event_id
+        )
+    )
+    yield "retry: 3000\n\n"
+
+    while True:
+        version = task_status_notifier.version(current_company.company_uuid)
+        events, held_back = await db.run(
+            lambda session: _task_service(session).get_task_status_events(
+                current_company, cursor, TASK_STATUS_STREAM_BATCH_SIZE
+            )
+        )
+        for event in events:
+            cursor = (event.transaction_id, event.event_id)
+            yield _format_task_status_event(event)
+        if len(events) == TASK_STATUS_STREAM_BATCH_SIZE:
+            continue
+
+        await db.close()
+        if held_back:
+            # Committed changes wait for older transactions to end
+            await asyncio.sleep(TASK_STATUS_STREAM_HELD_BACK_DELAY)
+            continue
+        if not await task_status_notifier.wait(
+            current_company.company_uuid, version, keepalive
+        ):
+            yield ": keep-alive\n\n"
+
+
+@app.get("/tasks/status/stream", dependencies=[Depends(_rate_limit(RATE_LIMIT_STATUS))])
+async def stream_task_status_changes(
+    last_event_id_query: Optional[int] = Query(None, alias="last_event_id", ge=0),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_company: Company = Depends(get_current_company),
+    db: DatabaseSession = Depends(get_db),
+):
+    """
+    Stream status changes of the company's tasks as Server-Sent Events.
+
+    Authentication:
+        Requires Bearer token in Authorization header
+
+    Resumption:
+        Every event carries an id. After a disconnect, reconnect with the
+        Last-Event-ID header (sent automatically by EventSource) or the
+        last_event_id query parameter to receive the changes missed meanwhile.
+        Without either, only changes happening after the connection are sent.
+
+    Event Example:
+    ```
+    id: 42
+    event: task_status
+    data: {"task_uuid": "550e8400-e29b-41d4-a716-446655440000", "status": "COMPLETED", "created_at": "2025-02-11T12:00:00"}
+    ```
+
+    Notes:
+        - Changes are kept for TASK_STATUS_EVENTS_RETENTION seconds; resuming
+          from an event already pruned sends all the changes still kept
+        - A change is only sent once every transaction that started before
+          the one making it has ended, so that a reconnecting client misses
+          none; ids follow the order changes are logged in, not always the
+          order they are sent in
+        - Comment lines are sent every TASK_STATUS_STREAM_KEEPALIVE seconds
+          while there is no change
+    """
+    last_event_id = (
+        last_event_id_header
+        if last_event_id_header is not None
+        else last_event_id_query
+    )
+    return StreamingResponse(
+        _stream_task_status_events(
+            current_company,
+            db,
+            last_event_id,
+            Config.TASK_STATUS_STREAM_KEEPALIVE,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.exception_handler(DuplicateTaskException)
 async def duplicate_task_exception_handler(request, exc: DuplicateTaskException):
     return JSONResponse(
@@ -464,6 +1417,45 @@ async def invalid_status_exception_handler(request, exc: InvalidStatusException)
     )
 
 
+@app.exception_handler(IdempotencyKeyInProgressException)
+async def idempotency_key_in_progress_exception_handler(
+    request, exc: IdempotencyKeyInProgressException
+):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"message": exc.message, "code": exc.code},
+    )
+
+
+@app.exception_handler(IdempotencyKeyReusedException)
+async def idempotency_key_reused_exception_handler(
+    request, exc: IdempotencyKeyReusedException
+):
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"message": exc.message, "code": exc.code},
+    )
+
+
+@app.exception_handler(RateLimitExceededException)
+async def rate_limit_exceeded_exception_handler(
+    request, exc: RateLimitExceededException
+):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"message": exc.message, "code": exc.code, "budget": exc.budget},
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+    )
+
+
+@app.exception_handler(InvalidCursorException)
+async def invalid_cursor_exception_handler(request, exc: InvalidCursorException):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"message": exc.message, "code": exc.code},
+    )
+
+
 @app.exception_handler(TaskNotOwnedException)
 async def task_not_owned_exception_handler(request, exc: TaskNotOwnedException):
     return JSONResponse(
@@ -488,6 +1480,7 @@ async def task_not_found_exception_handler(request, exc: TaskNotFoundException):
             "message": exc.message,
             "code": exc.code,
             "task_uuid": str(exc.task_uuid),
+            "tasks_uuid": [str(task_uuid) for task_uuid in exc.tasks_uuid],
         },
     )
 
@@ -39,3 +39,20 @@ def test_regenerate_auth_token(company_service, mock_repository, test_company):
 
     # Assert
     assert new_token != original_token
+
+
+def test_regenerate_auth_token_revokes_old_token_in_one_call(mock_repository):
+    # Arrange
+    token_cache = MagicMock(ttl=60)
+    company_service = CompanyService(mock_repository, token_cache)
+    original_token = mock_repository.find_by_token.return_value.auth_token
+
+    # Act
+    company = company_service.regenerate_auth_token(original_token)
+
+    # Assert
+    mock_repository.replace_auth_token.assert_called_once_with(
+        company, original_token, 60
+    )
+    mock_repository.update_company.assert_not_called()
+    token_cache.invalidate.assert_called_once_with(original_token)
@@ -0,0 +1,116 @@
+import pytest
+from uuid import uuid4
+from unittest.mock import MagicMock
+from application.task_service import TaskService
+from domain.company.company import Company
+from domain.exceptions import DuplicateTaskException, TaskExistsException
+from domain.task.schemas import SingleInvoiceAction, SingleInvoiceData
+
+
+@pytest.fixture
+def mock_repository():
+    repository = MagicMock()
+    repository.get_existing_single_invoice_entries.return_value = set()
+    return repository
+
+
+@pytest.fixture
+def task_service(mock_repository):
+    return TaskService(mock_repository)
+
+
+@pytest.fixture
+def company():
+    return Company(name="Test Company")
+
+
+def _invoice(seria, number):
+    return SingleInvoiceData(
+        my_company_idno="123",
+        person_name_certificate="Person",
+        seria=seria,
+        number=number,
+    )
+
+
+def test_create_single_invoice_task_checks_batch_in_one_query(
+    task_service, mock_repository, company
+):
+    # Arrange
+    invoices = [_invoice("A", str(number)) for number in range(100)]
+    mock_repository.create_single_invoice_tasks.return_value = [uuid4()]
+
+    # Act
+    task_service.create_single_invoice_task(
+        company, SingleInvoiceAction.BUYER_SIGN_INVOICE.value, invoices
+    )
+
+    # Assert
+    mock_repository.get_existing_single_invoice_entries.assert_called_once()
+    (keys,) = mock_repository.get_existing_single_invoice_entries.call_args.args
+    assert len(keys) == 100
+    mock_repository.single_invoice_entry_exists.assert_not_called()
+    mock_repository.create_single_invoice_tasks.assert_called_once()
+
+
+def test_create_single_invoice_task_existing_tasks(
+    task_service, mock_repository, company
+):
+    # Arrange
+    invoices = [_invoice("A", "1"), _invoice("A", "2")]
+    mock_repository.get_existing_single_invoice_entries.return_value = {
+        ("123", "A", "2")
+    }
+
+    # Act & Assert
+    with pytest.raises(TaskExistsException) as exc_info:
+        task_service.create_single_invoice_task(
+            company, SingleInvoiceAction.BUYER_SIGN_INVOICE.value, invoices
+        )
+
+    assert [task["number"] for task in exc_info.value.existing_tasks] == ["2"]
+    mock_repository.create_single_invoice_tasks.assert_not_called()
+
+
+def test_create_single_invoice_task_duplicates(task_service, mock_repository, company):
+    # Arrange
+    invoices = [_invoice("A", "1"), _invoice("A", "2"), _invoice("A", "1")]
+
+    # Act & Assert
+    with pytest.raises(DuplicateTaskException) as exc_info:
+        task_service.create_single_invoice_task(
+            company, SingleInvoiceAction.BUYER_SIGN_INVOICE.value, invoices
+        )
+
+    assert exc_info.value.code == "DUPLICATE_TASKS"
+    assert len(exc_info.value.duplicates) == 1
+    mock_repository.get_existing_single_invoice_entries.assert_called_once()
+    mock_repository.create_single_invoice_tasks.assert_not_called()
+
+
+def test_create_single_invoice_task_numbers_with_leading_zeros(
+    task_service, mock_repository, company
+):
+    # Arrange
+    mock_repository.get_existing_single_invoice_entries.return_value = {
+        ("123", "A", "123")
+    }
+
+    # Act & Assert
+    with pytest.raises(TaskExistsException) as exc_info:
+        task_service.create_single_invoice_task(
+            company,
+            SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            [_invoice("A", "0123")],
+        )
+    assert [task["number"] for task in exc_info.value.existing_tasks] == ["0123"]
+
+    mock_repository.get_existing_single_invoice_entries.return_value = set()
+    with pytest.raises(DuplicateTaskException) as exc_info:
+        task_service.create_single_invoice_task(
+            company,
+            SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            [_invoice("A", "5"), _invoice("A", "05")],
+        )
+    assert len(exc_info.value.duplicates) == 1
+    mock_repository.create_single_invoice_tasks.assert_not_called()
@@ -0,0 +1,16 @@
+import pytest
+from benchmarks import json_response
+
+
+def test_json_response_benchmark_for_10k_tasks():
+    pytest.importorskip("orjson")
+
+    results = {result["serializer"]: result for result in json_response.run(10_000, 5)}
+
+    assert set(results) == {"json", "orjson"}
+    # Both serializers decode back to the same payload
+    assert all(result["decoded"] for result in results.values())
+    assert all(
+        result["gzip_bytes"] < result["bytes"] / 4 for result in results.values()
+    )
+    assert results["orjson"]["gzip_bytes"] <= results["json"]["gzip_bytes"] * 1.05
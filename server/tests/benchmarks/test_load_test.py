@@ -0,0 +1,117 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from benchmarks import load_test
+from domain.company.models import Base as CompanyBase
+from domain.task.models import Base as TaskBase
+from infrastructure.persistence.database_session import ThreadpoolDatabaseSession
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    import main
+
+    # The simulated machines poll in a tight loop
+    monkeypatch.setattr(main.rate_limiter, "budgets", {})
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'load.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    CompanyBase.metadata.create_all(engine)
+    TaskBase.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    async def get_db():
+        db = ThreadpoolDatabaseSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    main.app.dependency_overrides[main.get_db] = get_db
+    try:
+        yield main.app
+    finally:
+        main.app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def _run(app, **options):
+    async def load():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await load_test.run_async(client, **options)
+
+    return asyncio.run(load())
+
+
+def test_load_test_reports_every_task_of_every_company(app):
+    # Act
+    results = _run(
+        app,
+        companies=3,
+        batches=2,
+        batch_size=5,
+        rate=0,
+        machines=2,
+        processing_ms=1,
+        failure_rate=0.5,
+        wait=0,
+        poll_interval=0.01,
+        timeout=30,
+        seed=1,
+    )
+
+    # Assert
+    endpoints = {result["endpoint"]: result for result in results}
+    assert endpoints["POST /tasks/buyer/sign_single_invoice"]["requests"] == 6
+    assert all(result["error_rate"] == 0 for result in results[:-1])
+    tasks = endpoints[None]
+    assert tasks["tasks_reported"] == tasks["tasks_submitted"] == 30
+    assert tasks["tasks_unreported"] == 0
+    assert tasks["tasks_failed"] + tasks["tasks_completed"] == 30
+    assert 0 < tasks["tasks_failed"] < 30
+    assert tasks["p99_ms"] >= tasks["p50_ms"]
+
+
+def test_load_test_polls_machine_tasks_without_claiming(app):
+    results = _run(
+        app,
+        companies=2,
+        batches=1,
+        batch_size=3,
+        rate=0,
+        claim=False,
+        wait=0,
+        poll_interval=0.01,
+        timeout=30,
+    )
+
+    endpoints = {result["endpoint"]: result for result in results}
+    assert "GET /machine/tasks" in endpoints
+    assert endpoints[None]["tasks_reported"] == 6
+
+
+def test_machine_tasks_walks_machine_tasks_response():
+    payload = {
+        "SingleInvoiceTask": {"Person": {"123": [{"task_uuid": "a", "attempt": 1}]}},
+        "MultipleInvoicesTask": [{"task_uuid": "b", "attempt": 0}],
+        "next_cursor": None,
+    }
+
+    assert load_test._machine_tasks(payload) == [
+        {"task_uuid": "a", "attempt": 1},
+        {"task_uuid": "b", "attempt": 0},
+    ]
+
+
+def test_retry_after_of_rate_limited_responses():
+    limited = httpx.Response(429, headers={"Retry-After": "2"})
+
+    assert load_test._retry_after(limited) == 2
+    assert load_test._retry_after(httpx.Response(200)) is None
+    assert load_test._retry_after(None) is None
@@ -0,0 +1,15 @@
+from benchmarks import machine_poll
+
+
+def test_machine_poll_benchmark_runs_without_and_with_indexes(tmp_path):
+    results = machine_poll.run(
+        f"sqlite:///{tmp_path / 'poll.db'}",
+        finished=200,
+        waiting=5,
+        companies=3,
+        iterations=3,
+    )
+
+    assert [result["indexes"] for result in results] == [False, True]
+    assert all(result["iterations"] == 3 for result in results)
+    assert all(result["p95_ms"] >= result["p50_ms"] for result in results)
@@ -0,0 +1,18 @@
+from benchmarks import task_lifecycle
+
+
+def test_task_lifecycle_benchmark_covers_every_scenario_and_size():
+    results = task_lifecycle.run(sizes=(5, 20), iterations=2, polls=3)
+
+    assert [(result["scenario"], result["size"]) for result in results] == [
+        ("create", 5),
+        ("create", 20),
+        ("machine_poll", task_lifecycle.MACHINE_POLL_LIMIT),
+        ("status_query", 5),
+        ("status_query", 20),
+        ("status_update", 5),
+        ("status_update", 20),
+    ]
+    assert results[2]["backlog"] == 50
+    assert all(result["dialect"] == "sqlite" for result in results)
+    assert all(result["p95_ms"] >= result["p50_ms"] for result in results)
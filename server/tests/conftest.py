@@ -1,4 +1,6 @@
+import os
 import pytest
+from contextlib import contextmanager
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -7,6 +9,21 @@ from domain.company.models import Base as CompanyBase, CompanyModel
 from uuid import uuid4
 import datetime
 
+# main.py builds its engine and settings at import time
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_NAME", "eFactura_test")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("TASK_REAPER_INTERVAL", "0")
+os.environ.setdefault("TASK_ARCHIVE_INTERVAL", "0")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "postgres: needs the Postgres server of the DB_* settings"
+    )
+
 
 @pytest.fixture(scope="session")
 def test_db_path(tmp_path_factory):
@@ -17,7 +34,11 @@ def test_db_path(tmp_path_factory):
 @pytest.fixture(scope="session")
 def engine(test_db_path):
     """Create engine with physical SQLite database"""
-    engine = create_engine(f"sqlite:///{test_db_path}")
+    engine = create_engine(
+        f"sqlite:///{test_db_path}",
+        # Endpoints run in FastAPI's threadpool, sharing the test connection
+        connect_args={"check_same_thread": False},
+    )
     # Create all tables
     TaskBase.metadata.create_all(engine)
     CompanyBase.metadata.create_all(engine)
@@ -85,3 +106,58 @@ def company_service(db_session):
     from application.company_service import CompanyService
 
     return CompanyService(SQLAlchemyCompanyRepository(db_session))
+
+
+@pytest.fixture
+def client(db_session):
+    """Return a test client for the API, sharing the test database session"""
+    from fastapi.testclient import TestClient
+    import main
+
+    from infrastructure.persistence.database_session import (
+        ThreadpoolDatabaseSession,
+    )
+
+    main.app.dependency_overrides[main.get_db] = lambda: ThreadpoolDatabaseSession(
+        db_session
+    )
+    try:
+        with TestClient(main.app) as test_client:
+            yield test_client
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers(test_company):
+    """Return the Authorization header of the test company"""
+    return {"Authorization": f"Bearer {test_company.auth_token}"}
+
+
+@pytest.fixture
+def assert_max_queries(engine):
+    """
+    Return a context manager failing the test when the block runs more SQL
+    statements than allowed, listing them.
+
+    Usage:
+        with assert_max_queries(3):
+            client.post(...)
+    """
+    from infrastructure.monitoring.query_metrics import (
+        instrument_engine,
+        track_queries,
+    )
+
+    instrument_engine(engine)
+
+    @contextmanager
+    def assert_max_queries(limit):
+        with track_queries(record_statements=True) as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"{stats.count} SQL statements ran, expected at most {limit}:\n"
+            + "\n".join(stats.statements)
+        )
+
+    return assert_max_queries
@@ -0,0 +1,78 @@
+import datetime
+import gzip
+import json
+from sqlalchemy import update
+from domain.task.models import CompanyTaskModel
+from domain.task.schemas import SingleInvoiceAction, SingleInvoiceData, TaskStatus
+from infrastructure.background.task_archiver import TaskArchiver
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+
+def _archiver(db_session, archive_dir, retention_days=30):
+    # The archiver closes its session after every sweep; keep the test one open
+    db_session.close = lambda: None
+    return TaskArchiver(
+        lambda: db_session,
+        interval=60,
+        retention_days=retention_days,
+        batch_size=2,
+        archive_dir=str(archive_dir),
+        partitions_ahead=3,
+    )
+
+
+def test_run_once_writes_finished_tasks_to_gzip_archive(
+    db_session, test_company, tmp_path
+):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="ARCH",
+                number=str(number),
+            )
+            for number in range(3)
+        ],
+    )
+    db_session.execute(
+        update(CompanyTaskModel)
+        .where(CompanyTaskModel.task_uuid.in_(tasks_uuid))
+        .values(
+            status=TaskStatus.COMPLETED.value,
+            created_at=datetime.datetime(2020, 1, 1),
+        )
+    )
+    db_session.commit()
+
+    # Act
+    path = _archiver(db_session, tmp_path).run_once()
+
+    # Assert
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        archived = [json.loads(line) for line in archive]
+    assert sorted(task["task_uuid"] for task in archived) == sorted(
+        str(task_uuid) for task_uuid in tasks_uuid
+    )
+    assert all(task["data"]["seria"] == "ARCH" for task in archived)
+    assert (
+        db_session.query(CompanyTaskModel)
+        .filter(CompanyTaskModel.task_uuid.in_(tasks_uuid))
+        .count()
+        == 0
+    )
+
+
+def test_run_once_without_finished_tasks_writes_nothing(db_session, tmp_path):
+    assert _archiver(db_session, tmp_path).run_once() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_once_with_archiving_disabled(db_session, tmp_path):
+    assert _archiver(db_session, tmp_path, retention_days=0).run_once() is None
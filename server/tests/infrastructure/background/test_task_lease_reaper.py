@@ -0,0 +1,46 @@
+import datetime
+from infrastructure.background.task_lease_reaper import TaskLeaseReaper
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.models import CompanyTaskModel
+from domain.task.schemas import SingleInvoiceAction, SingleInvoiceData, TaskStatus
+
+
+def test_task_lease_reaper_run_once(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="LR",
+                number="1",
+            )
+        ],
+    )
+    repository.claim_waiting_tasks_for_machine(
+        test_company.company_uuid, 10, datetime.datetime(2025, 1, 1)
+    )
+    reaper = TaskLeaseReaper(lambda: db_session, interval=60, max_attempts=3)
+
+    # Act
+    released = reaper.run_once()
+
+    # Assert
+    assert released == 1
+    assert (
+        db_session.get(CompanyTaskModel, task_uuid).status == TaskStatus.WAITING.value
+    )
+
+
+def test_task_lease_reaper_start_stop(db_session):
+    reaper = TaskLeaseReaper(lambda: db_session, interval=3600, max_attempts=3)
+
+    reaper.start()
+    reaper.stop()
+
+    assert reaper._thread is None
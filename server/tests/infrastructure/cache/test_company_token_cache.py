@@ -0,0 +1,145 @@
+import datetime
+from uuid import uuid4
+from domain.company.company import Company
+from domain.company.models import AuthTokenInvalidationModel
+from infrastructure.cache.company_token_cache import CompanyTokenCache
+from infrastructure.persistence.sqlalchemy_company_repository import (
+    SQLAlchemyCompanyRepository,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _revoke_token(repository, company):
+    revoked_token = company.auth_token
+    company.auth_token = str(uuid4())
+    repository.replace_auth_token(company, revoked_token, retention=60)
+    return revoked_token
+
+
+def _cache(clock, ttl=60, max_size=10, sync_interval=1):
+    return CompanyTokenCache(
+        ttl=ttl, max_size=max_size, sync_interval=sync_interval, clock=clock
+    )
+
+
+def test_get_returns_cached_company_until_ttl():
+    # Arrange
+    clock = FakeClock()
+    cache = _cache(clock, ttl=60)
+    company = Company("Cached")
+    cache.put(company.auth_token, company)
+
+    # Act & Assert
+    clock.now = 59
+    assert cache.get(company.auth_token) is company
+    clock.now = 60
+    assert cache.get(company.auth_token) is None
+
+
+def test_put_evicts_least_recently_used_token():
+    # Arrange
+    cache = _cache(FakeClock(), max_size=2)
+    first, second, third = Company("First"), Company("Second"), Company("Third")
+    cache.put(first.auth_token, first)
+    cache.put(second.auth_token, second)
+    cache.get(first.auth_token)
+
+    # Act
+    cache.put(third.auth_token, third)
+
+    # Assert
+    assert cache.get(first.auth_token) is first
+    assert cache.get(second.auth_token) is None
+    assert cache.get(third.auth_token) is third
+
+
+def test_invalidate_drops_token():
+    cache = _cache(FakeClock())
+    company = Company("Invalidated")
+    cache.put(company.auth_token, company)
+
+    cache.invalidate(company.auth_token)
+
+    assert cache.get(company.auth_token) is None
+
+
+def test_sync_drops_tokens_invalidated_by_other_workers(db_session):
+    # Arrange
+    clock = FakeClock()
+    repository = SQLAlchemyCompanyRepository(db_session)
+    this_worker = _cache(clock, sync_interval=1)
+    this_worker.sync(repository)
+    company = Company("Shared")
+    repository.save(company)
+    this_worker.put(company.auth_token, company)
+
+    # Act
+    revoked_token = _revoke_token(repository, company)
+    not_due = this_worker.sync_due()
+    clock.now = 1
+    due = this_worker.sync_due()
+    this_worker.sync(repository)
+
+    # Assert
+    assert not_due is False
+    assert due is True
+    assert this_worker.get(revoked_token) is None
+    assert this_worker.sync_due() is False
+
+
+def test_first_sync_skips_older_invalidations(db_session):
+    # Arrange
+    repository = SQLAlchemyCompanyRepository(db_session)
+    company = Company("Reissued")
+    repository.save(company)
+    revoked_token = _revoke_token(repository, company)
+    cache = _cache(FakeClock())
+
+    # Act
+    cache.sync(repository)
+    cache.put(revoked_token, company)
+    cache.sync(repository)
+
+    # Assert
+    assert cache.get(revoked_token) is company
+
+
+def _record_invalidation(db_session, auth_token, invalidation_id, transaction_id):
+    db_session.add(
+        AuthTokenInvalidationModel(
+            invalidation_id=invalidation_id,
+            auth_token=auth_token,
+            created_at=datetime.datetime.now(),
+            transaction_id=transaction_id,
+        )
+    )
+    db_session.flush()
+
+
+def test_sync_drops_tokens_invalidated_in_commit_order(db_session):
+    # Arrange
+    repository = SQLAlchemyCompanyRepository(db_session)
+    cache = _cache(FakeClock())
+    cache.sync(repository)
+    early, late = Company("Early"), Company("Late")
+    cache.put(early.auth_token, early)
+    cache.put(late.auth_token, late)
+    _record_invalidation(db_session, early.auth_token, 1002, transaction_id=20)
+    cache.sync(repository)
+
+    # Act
+    # A lower id committed by a later transaction, as a transaction that took
+    # its id first and committed last leaves on Postgres
+    _record_invalidation(db_session, late.auth_token, 1001, transaction_id=30)
+    cache.sync(repository)
+
+    # Assert
+    assert cache.get(early.auth_token) is None
+    assert cache.get(late.auth_token) is None
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+from infrastructure.monitoring.pool_metrics import PoolMetrics
+
+
+@pytest.fixture
+def metrics():
+    return PoolMetrics()
+
+
+def _engine(metrics, tmp_path, **pool_options):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=metrics.instrument(),
+        pool_timeout=0.05,
+        **pool_options,
+    )
+
+
+def test_snapshot_counts_checkouts_and_overflow(metrics, tmp_path):
+    # Arrange
+    engine = _engine(metrics, tmp_path, pool_size=1, max_overflow=1)
+
+    # Act
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        busy = metrics.snapshot(engine.pool)
+    idle = metrics.snapshot(engine.pool)
+
+    # Assert
+    assert busy["checked_out"] == 2
+    assert busy["overflow"] == 1
+    assert idle["checked_out"] == 0
+    assert idle["checkouts_total"] == 2
+    assert idle["overflow_max"] == 1
+    assert idle["checkout_timeouts_total"] == 0
+
+
+def test_snapshot_counts_checkout_timeouts(metrics, tmp_path):
+    # Arrange
+    engine = _engine(metrics, tmp_path, pool_size=1, max_overflow=0)
+
+    # Act
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    snapshot = metrics.snapshot(engine.pool)
+
+    # Assert
+    assert snapshot["checkout_timeouts_total"] == 1
+    assert snapshot["checkout_wait_seconds_max"] >= 0.05
+
+
+def test_db_pool_metrics_endpoint(client):
+    response = client.get("/metrics/db-pool")
+
+    assert response.status_code == 200
+    assert response.json()["sync"]["pool_size"] == 5
+    assert response.json()["async"] is None
@@ -0,0 +1,53 @@
+from infrastructure.monitoring.prometheus import Histogram, counter, gauge, render
+
+
+def test_counter_renders_labelled_series():
+    # Arrange
+    requests = counter("requests_total", "Served requests", ("route", "status"))
+
+    # Act
+    requests.inc(("/tasks", 200))
+    requests.inc(("/tasks", 200))
+    requests.inc(("/tasks", 500), 3)
+
+    # Assert
+    assert requests.render() == [
+        "# HELP requests_total Served requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="/tasks",status="200"} 2',
+        'requests_total{route="/tasks",status="500"} 3',
+    ]
+
+
+def test_gauge_escapes_label_values():
+    depth = gauge("depth", "Queue depth", ("name",))
+
+    depth.set(('a "quoted"\\name',), 1.5)
+
+    assert depth.render()[-1] == 'depth{name="a \\"quoted\\"\\\\name"} 1.5'
+
+
+def test_histogram_renders_cumulative_buckets():
+    # Arrange
+    latency = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+
+    # Act
+    latency.observe(("/tasks",), 0.05)
+    latency.observe(("/tasks",), 0.5)
+    latency.observe(("/tasks",), 2)
+
+    # Assert
+    assert latency.render()[2:] == [
+        'latency_seconds_bucket{route="/tasks",le="0.1"} 1',
+        'latency_seconds_bucket{route="/tasks",le="1"} 2',
+        'latency_seconds_bucket{route="/tasks",le="+Inf"} 3',
+        'latency_seconds_sum{route="/tasks"} 2.55',
+        'latency_seconds_count{route="/tasks"} 3',
+    ]
+
+
+def test_render_joins_families_with_trailing_newline():
+    text = render([counter("a_total", "A"), gauge("b", "B")])
+
+    assert text.endswith("\n")
+    assert "# TYPE a_total counter\n# HELP b B\n# TYPE b gauge\n" in text
@@ -0,0 +1,67 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from infrastructure.monitoring.query_budget import QueryBudgetMiddleware
+from infrastructure.monitoring.query_metrics import instrument_engine
+
+
+@pytest.fixture
+def query_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'budget.db'}")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def _client(engine, **options):
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, **options)
+
+    def run_queries(count: int):
+        with engine.connect() as connection:
+            for _ in range(count):
+                connection.execute(text("SELECT 1"))
+        return PlainTextResponse("ok")
+
+    app.get("/items/{count}")(run_queries)
+    app.get("/stream/{count}")(run_queries)
+    return TestClient(app)
+
+
+def test_logs_requests_over_budget(query_engine, caplog):
+    client = _client(query_engine, budget=2)
+
+    with caplog.at_level(logging.WARNING):
+        client.get("/items/2")
+        client.get("/items/3")
+
+    assert len(caplog.records) == 1
+    assert (
+        caplog.records[0]
+        .getMessage()
+        .startswith("GET /items/{count} ran 3 SQL statements")
+    )
+
+
+def test_exposes_query_headers(query_engine):
+    client = _client(query_engine, budget=0, expose_headers=True)
+
+    response = client.get("/items/4")
+
+    assert response.headers["X-DB-Query-Count"] == "4"
+    assert float(response.headers["X-DB-Query-Time"]) >= 0
+
+
+def test_leaves_excluded_paths_alone(query_engine, caplog):
+    client = _client(
+        query_engine, budget=1, expose_headers=True, exclude_paths=("/stream/5",)
+    )
+
+    with caplog.at_level(logging.WARNING):
+        response = client.get("/stream/5")
+
+    assert "X-DB-Query-Count" not in response.headers
+    assert not caplog.records
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, exc, text
+from infrastructure.monitoring.query_metrics import instrument_engine, track_queries
+import pytest
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_track_queries_counts_statements_of_the_block(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+        with track_queries() as stats:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+
+    assert stats.count == 2
+    assert stats.seconds > 0
+
+
+def test_track_queries_counts_failed_statements(engine):
+    with engine.connect() as connection, track_queries() as stats:
+        with pytest.raises(exc.OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+
+    assert stats.count == 1
+
+
+def test_instrument_engine_twice_counts_statements_once(engine):
+    instrument_engine(engine)
+
+    with engine.connect() as connection, track_queries() as stats:
+        connection.execute(text("SELECT 1"))
+
+    assert stats.count == 1
+
+
+def test_nested_blocks_all_count_statements(engine):
+    with engine.connect() as connection, track_queries() as outer:
+        connection.execute(text("SELECT 1"))
+        with track_queries(record_statements=True) as inner:
+            connection.execute(text("SELECT 2"))
+
+    assert outer.count == 2
+    assert inner.count == 1
+    assert inner.statements == ["SELECT 2"]
+    assert outer.statements == []
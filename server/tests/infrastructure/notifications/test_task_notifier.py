@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from uuid import uuid4
+from infrastructure.notifications.task_notifier import TaskNotifier
+
+
+def test_wait_times_out_without_notification():
+    notifier = TaskNotifier()
+    company_uuid = uuid4()
+
+    notified = asyncio.run(
+        notifier.wait(company_uuid, notifier.version(company_uuid), 0.05)
+    )
+
+    assert notified is False
+
+
+def test_wait_returns_at_once_when_notified_after_version():
+    # Arrange
+    notifier = TaskNotifier()
+    company_uuid = uuid4()
+    version = notifier.version(company_uuid)
+    notifier.notify(company_uuid)
+
+    # Act
+    notified = asyncio.run(notifier.wait(company_uuid, version, 5))
+
+    # Assert
+    assert notified is True
+
+
+def test_notify_from_another_thread_wakes_waiter():
+    notifier = TaskNotifier()
+    company_uuid = uuid4()
+    other_company_uuid = uuid4()
+
+    async def wait_and_notify():
+        version = notifier.version(company_uuid)
+        loop = asyncio.get_running_loop()
+        loop.call_later(
+            0.05,
+            lambda: threading.Thread(
+                target=notifier.notify, args=(other_company_uuid,)
+            ).start(),
+        )
+        loop.call_later(
+            0.1,
+            lambda: threading.Thread(
+                target=notifier.notify, args=(company_uuid,)
+            ).start(),
+        )
+        started = loop.time()
+        notified = await notifier.wait(company_uuid, version, 5)
+        return notified, loop.time() - started
+
+    notified, elapsed = asyncio.run(wait_and_notify())
+
+    assert notified is True
+    assert elapsed < 1
+    assert notifier._waiters == {}
+
+
+def test_notify_all_wakes_every_company():
+    notifier = TaskNotifier()
+    companies_uuid = [uuid4(), uuid4()]
+
+    async def wait_all():
+        versions = [notifier.version(company_uuid) for company_uuid in companies_uuid]
+        waits = [
+            asyncio.create_task(notifier.wait(company_uuid, version, 5))
+            for company_uuid, version in zip(companies_uuid, versions)
+        ]
+        await asyncio.sleep(0.01)
+        notifier.notify_all()
+        return await asyncio.gather(*waits)
+
+    assert asyncio.run(wait_all()) == [True, True]
@@ -0,0 +1,68 @@
+import uuid
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from domain.company.models import Base as CompanyBase
+from infrastructure.persistence.sqlalchemy_rate_limit_store import (
+    SQLAlchemyRateLimitStore,
+)
+from infrastructure.rate_limit.company_rate_limiter import RateLimitBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rate_limit.db'}")
+    CompanyBase.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_take_shares_the_bucket_between_stores(session_factory, clock):
+    # Arrange: two workers with their own store on the same table
+    first = SQLAlchemyRateLimitStore(session_factory, clock=clock)
+    second = SQLAlchemyRateLimitStore(session_factory, clock=clock)
+    company_uuid = uuid.uuid4()
+    budget = RateLimitBudget(rate=1, burst=2)
+
+    # Act
+    admitted = [
+        first.take(company_uuid, "machine", budget, 1),
+        second.take(company_uuid, "machine", budget, 1),
+    ]
+    retry_after = first.take(company_uuid, "machine", budget, 1)
+
+    # Assert
+    assert admitted == [0, 0]
+    assert retry_after == pytest.approx(1)
+
+
+def test_take_refills_and_keeps_budgets_apart(session_factory, clock):
+    # Arrange
+    store = SQLAlchemyRateLimitStore(session_factory, clock=clock)
+    company_uuid = uuid.uuid4()
+    budget = RateLimitBudget(rate=4, burst=1)
+    store.take(company_uuid, "write", budget, 1)
+
+    # Act
+    denied = store.take(company_uuid, "write", budget, 1)
+    other_budget = store.take(company_uuid, "status", budget, 1)
+    clock.now += 0.25
+    refilled = store.take(company_uuid, "write", budget, 1)
+
+    # Assert
+    assert denied == pytest.approx(0.25)
+    assert other_budget == 0
+    assert refilled == 0
@@ -0,0 +1,108 @@
+import datetime
+import pytest
+from sqlalchemy import event, update
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.models import CompanyTaskModel, SingleInvoiceTaskDataModel
+from domain.task.schemas import SingleInvoiceAction, SingleInvoiceData, TaskStatus
+from domain.exceptions import DatabaseException
+
+OLD = datetime.datetime(2020, 1, 1)
+CUTOFF = datetime.datetime(2021, 1, 1)
+
+
+def _create_tasks(repository, company_uuid, statuses, created_at):
+    tasks_uuid = repository.create_single_invoice_tasks(
+        company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria=f"AR{created_at.year}",
+                number=str(number),
+            )
+            for number in range(len(statuses))
+        ],
+    )
+    for task_uuid, task_status in zip(tasks_uuid, statuses):
+        repository.session.execute(
+            update(CompanyTaskModel)
+            .where(CompanyTaskModel.task_uuid == task_uuid)
+            .values(status=task_status.value, created_at=created_at)
+        )
+    repository.session.commit()
+    return tasks_uuid
+
+
+def test_archive_finished_tasks_exports_and_deletes_old_finished_tasks(
+    db_session, test_company
+):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    old_tasks_uuid = _create_tasks(
+        repository,
+        test_company.company_uuid,
+        [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.WAITING],
+        OLD,
+    )
+    recent_tasks_uuid = _create_tasks(
+        repository,
+        test_company.company_uuid,
+        [TaskStatus.COMPLETED],
+        datetime.datetime(2030, 1, 1),
+    )
+    exported = []
+
+    # Act
+    archived = repository.archive_finished_tasks(CUTOFF, 10, exported.extend)
+
+    # Assert
+    assert archived == 2
+    assert {task["task_uuid"] for task in exported} == set(old_tasks_uuid[:2])
+    assert exported[0]["data"]["seria"] == "AR2020"
+    assert exported[0]["company_uuid"] == test_company.company_uuid
+    remaining = {
+        task_uuid
+        for (task_uuid,) in db_session.query(CompanyTaskModel.task_uuid).filter(
+            CompanyTaskModel.company_uuid == test_company.company_uuid
+        )
+    }
+    assert remaining == {old_tasks_uuid[2], *recent_tasks_uuid}
+    assert db_session.get(SingleInvoiceTaskDataModel, old_tasks_uuid[0]) is None
+
+
+def test_archive_finished_tasks_deletes_nothing_when_export_fails(
+    db_session, test_company
+):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    _create_tasks(repository, test_company.company_uuid, [TaskStatus.COMPLETED], OLD)
+    statements = []
+    connection = db_session.connection()
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    def failing_export(tasks):
+        raise OSError("disk full")
+
+    # Act
+    event.listen(connection, "before_cursor_execute", listener)
+    try:
+        with pytest.raises(DatabaseException):
+            repository.archive_finished_tasks(CUTOFF, 10, failing_export)
+    finally:
+        event.remove(connection, "before_cursor_execute", listener)
+
+    # Assert
+    assert statements
+    assert not any(statement.startswith("DELETE") for statement in statements)
+
+
+def test_partition_management_is_a_no_op_without_partitioned_table(db_session):
+    repository = SQLAlchemyTaskRepository(db_session)
+
+    assert repository.ensure_task_partitions(datetime.date(2030, 1, 1)) == []
+    assert repository.drop_empty_task_partitions(datetime.date(2030, 1, 1)) == []
@@ -0,0 +1,152 @@
+import pytest
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.models import (
+    CompanyTaskModel,
+    MultipleInvoicesTaskDataModel,
+    SingleInvoiceTaskDataModel,
+)
+from domain.task.schemas import (
+    MultipleInvoicesAction,
+    MultipleInvoicesData,
+    SingleInvoiceAction,
+    SingleInvoiceData,
+    TaskStatus,
+    TaskType,
+)
+from domain.exceptions import DatabaseException
+
+
+def _single_invoices(count, seria="A"):
+    return [
+        SingleInvoiceData(
+            my_company_idno="123",
+            person_name_certificate="Person",
+            seria=seria,
+            number=str(number),
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def test_create_single_invoice_tasks(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    invoices = _single_invoices(50)
+
+    # Act
+    tasks_uuid = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        invoices,
+    )
+
+    # Assert
+    assert len(tasks_uuid) == 50
+    company_tasks = (
+        db_session.query(CompanyTaskModel)
+        .filter(CompanyTaskModel.task_uuid.in_(tasks_uuid))
+        .all()
+    )
+    assert len(company_tasks) == 50
+    assert all(task.company_uuid == test_company.company_uuid for task in company_tasks)
+    assert all(task.status == TaskStatus.WAITING.value for task in company_tasks)
+    assert all(
+        task.task_type == TaskType.SINGLE_INVOICE_TASK.value for task in company_tasks
+    )
+
+    first_entry = db_session.get(SingleInvoiceTaskDataModel, tasks_uuid[0])
+    assert first_entry.seria == "A"
+    assert first_entry.number == 1
+
+
+def test_create_single_invoice_tasks_is_all_or_nothing(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    invoices = _single_invoices(3, seria="B") + _single_invoices(1, seria="B")
+
+    # Act & Assert
+    with pytest.raises(DatabaseException):
+        repository.create_single_invoice_tasks(
+            test_company.company_uuid,
+            SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            invoices,
+        )
+
+    assert (
+        db_session.query(SingleInvoiceTaskDataModel)
+        .filter(SingleInvoiceTaskDataModel.seria == "B")
+        .count()
+        == 0
+    )
+
+
+def test_create_single_invoice_tasks_empty_batch(db_session, test_company):
+    repository = SQLAlchemyTaskRepository(db_session)
+
+    assert (
+        repository.create_single_invoice_tasks(
+            test_company.company_uuid,
+            SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            [],
+        )
+        == []
+    )
+
+
+def test_create_multiple_invoices_tasks(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    invoices = [
+        MultipleInvoicesData(
+            my_company_idno="123",
+            person_name_certificate="Person",
+            buyer_idno=str(buyer_idno),
+            signature_type="LONG",
+        )
+        for buyer_idno in range(10)
+    ]
+
+    # Act
+    tasks_uuid = repository.create_multiple_invoices_tasks(
+        test_company.company_uuid,
+        MultipleInvoicesAction.SUPPLIER_SIGN_ALL_DRAFTED_INVOICES.value,
+        invoices,
+    )
+
+    # Assert
+    assert len(tasks_uuid) == 10
+    assert (
+        db_session.query(MultipleInvoicesTaskDataModel)
+        .filter(MultipleInvoicesTaskDataModel.task_uuid.in_(tasks_uuid))
+        .count()
+        == 10
+    )
+    assert (
+        db_session.query(CompanyTaskModel)
+        .filter(
+            CompanyTaskModel.task_uuid.in_(tasks_uuid),
+            CompanyTaskModel.task_type == TaskType.MULTIPLE_INVOICES_TASK.value,
+        )
+        .count()
+        == 10
+    )
+
+
+def test_get_existing_single_invoice_entries(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _single_invoices(3, seria="C"),
+    )
+
+    # Act
+    existing = repository.get_existing_single_invoice_entries(
+        [("123", "C", "2"), ("123", "C", "4"), ("123", "D", "1"), ("999", "C", "1")]
+    )
+
+    # Assert
+    assert existing == {("123", "C", "2")}
@@ -0,0 +1,200 @@
+import datetime
+import pytest
+from uuid import uuid4
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import Session
+from config import Config
+from domain.company.models import Base as CompanyBase, CompanyModel
+from infrastructure.persistence import sqlalchemy_task_repository
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.models import (
+    Base as TaskBase,
+    CompanyTaskModel,
+    SingleInvoiceTaskDataModel,
+)
+from domain.task.schemas import SingleInvoiceAction, SingleInvoiceData, TaskStatus
+
+
+def _invoices(numbers, seria="BL"):
+    return [
+        SingleInvoiceData(
+            my_company_idno="123",
+            person_name_certificate="Person",
+            seria=seria,
+            number=str(number),
+        )
+        for number in numbers
+    ]
+
+
+def test_bulk_load_skips_and_reports_conflicts(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (existing_task_uuid,) = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices([2]),
+    )
+
+    # Act
+    tasks_uuid = repository.bulk_load_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices([1, 2, 3, 1]),
+    )
+
+    # Assert
+    assert [task_uuid is None for task_uuid in tasks_uuid] == [
+        False,
+        True,
+        False,
+        True,
+    ]
+    loaded_tasks = (
+        db_session.query(CompanyTaskModel)
+        .filter(CompanyTaskModel.task_uuid.in_([tasks_uuid[0], tasks_uuid[2]]))
+        .all()
+    )
+    assert len(loaded_tasks) == 2
+    assert all(task.status == TaskStatus.WAITING.value for task in loaded_tasks)
+    assert (
+        db_session.query(SingleInvoiceTaskDataModel)
+        .filter(SingleInvoiceTaskDataModel.seria == "BL")
+        .count()
+        == 3
+    )
+
+
+def test_bulk_load_checks_conflicts_in_batches(db_session, test_company, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(sqlalchemy_task_repository, "BULK_LOAD_CHECK_BATCH_SIZE", 3)
+    repository = SQLAlchemyTaskRepository(db_session)
+    repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices([7, 9]),
+    )
+
+    # Act
+    tasks_uuid = repository.bulk_load_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices(range(10)),
+    )
+
+    # Assert
+    assert [
+        number for number, task_uuid in enumerate(tasks_uuid) if task_uuid is None
+    ] == [7, 9]
+
+
+def test_bulk_load_empty_batch(db_session, test_company):
+    repository = SQLAlchemyTaskRepository(db_session)
+
+    assert (
+        repository.bulk_load_single_invoice_tasks(
+            test_company.company_uuid,
+            SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            [],
+        )
+        == []
+    )
+
+
+def test_bulk_load_numbers_with_leading_zeros(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices([7], seria="LZ"),
+    )
+
+    # Act
+    tasks_uuid = repository.bulk_load_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices(["007", "8", "08"], seria="LZ"),
+    )
+
+    # Assert
+    assert [task_uuid is None for task_uuid in tasks_uuid] == [True, False, True]
+
+
+@pytest.fixture
+def postgres_session():
+    # The COPY path only runs on psycopg2; the Postgres server is the one of
+    # the DB_* settings, the test's rows are rolled back
+    if not Config.DB_HOST:
+        pytest.skip("DB_HOST is not set")
+    engine = create_engine(
+        f"postgresql+psycopg2://{Config.DB_USER}:{Config.DB_PASSWORD}"
+        f"@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+    )
+    try:
+        connection = engine.connect()
+    except exc.OperationalError as e:
+        engine.dispose()
+        pytest.skip(f"Database is not available: {e}")
+    transaction = connection.begin()
+    CompanyBase.metadata.create_all(connection)
+    TaskBase.metadata.create_all(connection)
+    # Repository commits only release savepoints of the test transaction
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+
+@pytest.mark.postgres
+def test_bulk_load_with_copy_reports_conflicts_in_input_order(postgres_session):
+    # Arrange
+    company = CompanyModel(
+        company_uuid=uuid4(),
+        name=f"Bulk load {uuid4()}",
+        auth_token=str(uuid4()),
+        created_at=datetime.datetime.now(),
+    )
+    postgres_session.add(company)
+    postgres_session.flush()
+    repository = SQLAlchemyTaskRepository(postgres_session)
+    (existing_task_uuid,) = repository.create_single_invoice_tasks(
+        company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices([2], seria="COPY"),
+    )
+
+    # Act
+    tasks_uuid = repository.bulk_load_single_invoice_tasks(
+        company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        _invoices([1, 2, 3, "01", 4], seria="COPY"),
+    )
+
+    # Assert
+    assert [task_uuid is None for task_uuid in tasks_uuid] == [
+        False,
+        True,
+        False,
+        True,
+        False,
+    ]
+    loaded_numbers = dict(
+        postgres_session.query(
+            SingleInvoiceTaskDataModel.task_uuid, SingleInvoiceTaskDataModel.number
+        ).filter(
+            SingleInvoiceTaskDataModel.task_uuid.in_(
+                [task_uuid for task_uuid in tasks_uuid if task_uuid is not None]
+            )
+        )
+    )
+    assert [
+        loaded_numbers[task_uuid] for task_uuid in tasks_uuid if task_uuid is not None
+    ] == [1, 3, 4]
+    assert existing_task_uuid not in tasks_uuid
@@ -0,0 +1,300 @@
+import datetime
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.models import CompanyTaskModel
+from domain.task.schemas import (
+    MultipleInvoicesAction,
+    MultipleInvoicesData,
+    SingleInvoiceAction,
+    SingleInvoiceData,
+    TaskLeaseRenewalRequest,
+    TaskStatus,
+    TaskStatusUpdateByUUIDRequest,
+)
+
+
+def _lease_expires_at():
+    return datetime.datetime(2030, 1, 1, 12, 0)
+
+
+def _claimed_tasks_uuid(claimed_tasks):
+    return [
+        task["task_uuid"]
+        for task_type in ("SingleInvoiceTask", "MultipleInvoicesTask")
+        for tasks_by_idno in claimed_tasks[task_type].values()
+        for tasks in tasks_by_idno.values()
+        for task in tasks
+    ]
+
+
+def test_claim_waiting_tasks_for_machine(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    single_tasks_uuid = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="CL",
+                number=str(number),
+            )
+            for number in range(4)
+        ],
+    )
+    multiple_tasks_uuid = repository.create_multiple_invoices_tasks(
+        test_company.company_uuid,
+        MultipleInvoicesAction.SUPPLIER_SIGN_ALL_DRAFTED_INVOICES.value,
+        [
+            MultipleInvoicesData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                buyer_idno="456",
+                signature_type="LONG",
+            )
+        ],
+    )
+
+    # Act
+    first_claim = _claimed_tasks_uuid(
+        repository.claim_waiting_tasks_for_machine(
+            test_company.company_uuid, 3, _lease_expires_at()
+        )
+    )
+    second_claim = _claimed_tasks_uuid(
+        repository.claim_waiting_tasks_for_machine(
+            test_company.company_uuid, 3, _lease_expires_at()
+        )
+    )
+    third_claim = repository.claim_waiting_tasks_for_machine(
+        test_company.company_uuid, 3, _lease_expires_at()
+    )
+
+    # Assert
+    assert len(first_claim) == 3
+    assert len(second_claim) == 2
+    assert not set(first_claim) & set(second_claim)
+    assert sorted(first_claim + second_claim) == sorted(
+        str(task_uuid) for task_uuid in single_tasks_uuid + multiple_tasks_uuid
+    )
+    assert third_claim == {"SingleInvoiceTask": {}, "MultipleInvoicesTask": {}}
+
+    claimed_tasks = (
+        db_session.query(CompanyTaskModel)
+        .filter(CompanyTaskModel.company_uuid == test_company.company_uuid)
+        .all()
+    )
+    assert all(task.status == TaskStatus.PROCESSING.value for task in claimed_tasks)
+    assert all(task.lease_expires_at == _lease_expires_at() for task in claimed_tasks)
+
+
+def test_claim_waiting_tasks_for_machine_skips_other_statuses(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="CS",
+                number="1",
+            )
+        ],
+    )
+    db_session.query(CompanyTaskModel).filter(
+        CompanyTaskModel.task_uuid == task_uuid
+    ).update({CompanyTaskModel.status: TaskStatus.COMPLETED.value})
+
+    # Act
+    claimed_tasks = repository.claim_waiting_tasks_for_machine(
+        test_company.company_uuid, 10, _lease_expires_at()
+    )
+
+    # Assert
+    assert claimed_tasks == {"SingleInvoiceTask": {}, "MultipleInvoicesTask": {}}
+
+
+def test_claim_waiting_tasks_across_months(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = repository.create_single_invoice_tasks(
+        test_company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="CM",
+                number=str(number),
+            )
+            for number in range(3)
+        ],
+    )
+    for month, task_uuid in zip((9, 10, 11), tasks_uuid):
+        db_session.query(CompanyTaskModel).filter(
+            CompanyTaskModel.task_uuid == task_uuid
+        ).update({CompanyTaskModel.created_at: datetime.datetime(2026, month, 15)})
+    db_session.commit()
+
+    # Act
+    claimed_tasks = _claimed_tasks_uuid(
+        repository.claim_waiting_tasks_for_machine(
+            test_company.company_uuid, 2, _lease_expires_at()
+        )
+    )
+
+    # Assert
+    assert sorted(claimed_tasks) == sorted(str(uuid) for uuid in tasks_uuid[:2])
+    statuses = dict(
+        db_session.query(CompanyTaskModel.task_uuid, CompanyTaskModel.status).filter(
+            CompanyTaskModel.company_uuid == test_company.company_uuid
+        )
+    )
+    assert statuses[tasks_uuid[2]] == TaskStatus.WAITING.value
+
+
+def _claimed_tasks(repository, db_session, company_uuid, seria, count, attempts):
+    tasks_uuid = repository.create_single_invoice_tasks(
+        company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria=seria,
+                number=str(number),
+            )
+            for number in range(count)
+        ],
+    )
+    db_session.query(CompanyTaskModel).filter(
+        CompanyTaskModel.task_uuid.in_(tasks_uuid)
+    ).update(
+        {
+            CompanyTaskModel.status: TaskStatus.PROCESSING.value,
+            CompanyTaskModel.lease_expires_at: datetime.datetime(2025, 1, 1),
+            CompanyTaskModel.attempts: attempts,
+        }
+    )
+    return tasks_uuid
+
+
+def test_requeue_expired_tasks(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    retried_uuid = _claimed_tasks(
+        repository, db_session, test_company.company_uuid, "RQ", 2, attempts=1
+    )
+    exhausted_uuid = _claimed_tasks(
+        repository, db_session, test_company.company_uuid, "RF", 1, attempts=3
+    )
+    (leased_uuid,) = _claimed_tasks(
+        repository, db_session, test_company.company_uuid, "RL", 1, attempts=1
+    )
+    db_session.query(CompanyTaskModel).filter(
+        CompanyTaskModel.task_uuid == leased_uuid
+    ).update({CompanyTaskModel.lease_expires_at: _lease_expires_at()})
+
+    # Act
+    released = repository.requeue_expired_tasks(
+        datetime.datetime(2026, 1, 1), max_attempts=3
+    )
+
+    # Assert
+    assert released == 3
+    statuses = dict(
+        db_session.query(CompanyTaskModel.task_uuid, CompanyTaskModel.status).all()
+    )
+    assert [statuses[task_uuid] for task_uuid in retried_uuid] == [
+        TaskStatus.WAITING.value,
+        TaskStatus.WAITING.value,
+    ]
+    assert statuses[exhausted_uuid[0]] == TaskStatus.FAILED.value
+    assert statuses[leased_uuid] == TaskStatus.PROCESSING.value
+
+
+def test_claim_increments_attempts(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = _claimed_tasks(
+        repository, db_session, test_company.company_uuid, "CA", 1, attempts=1
+    )
+    repository.requeue_expired_tasks(datetime.datetime(2026, 1, 1), max_attempts=3)
+
+    # Act
+    repository.claim_waiting_tasks_for_machine(
+        test_company.company_uuid, 10, _lease_expires_at()
+    )
+
+    # Assert
+    task = db_session.get(CompanyTaskModel, task_uuid)
+    db_session.refresh(task)
+    assert task.status == TaskStatus.PROCESSING.value
+    assert task.attempts == 2
+
+
+def test_status_update_of_an_expired_attempt_is_ignored(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = _claimed_tasks(
+        repository, db_session, test_company.company_uuid, "FA", 1, attempts=1
+    )
+    repository.requeue_expired_tasks(datetime.datetime(2026, 1, 1), max_attempts=3)
+    claimed_tasks = repository.claim_waiting_tasks_for_machine(
+        test_company.company_uuid, 10, _lease_expires_at()
+    )
+    (claimed_task,) = claimed_tasks["SingleInvoiceTask"]["Person"]["123"]
+
+    # Act
+    stale = repository.update_tasks_status(
+        [TaskStatusUpdateByUUIDRequest(task_uuid=task_uuid, status="FAILED", attempt=1)]
+    )
+    current = repository.update_tasks_status(
+        [
+            TaskStatusUpdateByUUIDRequest(
+                task_uuid=task_uuid,
+                status="COMPLETED",
+                attempt=claimed_task["attempt"],
+            )
+        ]
+    )
+
+    # Assert
+    assert claimed_task["attempt"] == 2
+    assert (stale, current) == (0, 1)
+    task = db_session.get(CompanyTaskModel, task_uuid)
+    db_session.refresh(task)
+    assert task.status == TaskStatus.COMPLETED.value
+
+
+def test_renew_task_leases_of_the_current_attempt(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    current_task_uuid, stale_task_uuid = _claimed_tasks(
+        repository, db_session, test_company.company_uuid, "LR", 2, attempts=2
+    )
+    renewed_until = datetime.datetime(2030, 1, 1, 12, 15)
+
+    # Act
+    renewed = repository.renew_task_leases(
+        test_company.company_uuid,
+        [
+            TaskLeaseRenewalRequest(task_uuid=current_task_uuid, attempt=2),
+            TaskLeaseRenewalRequest(task_uuid=stale_task_uuid, attempt=1),
+        ],
+        renewed_until,
+    )
+
+    # Assert
+    assert renewed == [current_task_uuid]
+    leases = dict(
+        db_session.query(
+            CompanyTaskModel.task_uuid, CompanyTaskModel.lease_expires_at
+        ).filter(CompanyTaskModel.task_uuid.in_([current_task_uuid, stale_task_uuid]))
+    )
+    assert leases[current_task_uuid] == renewed_until
+    assert leases[stale_task_uuid] == datetime.datetime(2025, 1, 1)
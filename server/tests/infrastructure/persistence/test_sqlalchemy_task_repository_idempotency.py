@@ -0,0 +1,148 @@
+import datetime
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+
+def test_claim_idempotency_key_once(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    now = datetime.datetime(2026, 10, 18)
+
+    # Act
+    first = repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", now
+    )
+    second = repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "other-hash", now
+    )
+    repository.save_idempotent_response(
+        test_company.company_uuid, "key", now, 200, '{"ok": true}'
+    )
+    third = repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", now
+    )
+
+    # Assert
+    assert first is None
+    assert second.request_hash == "hash"
+    assert second.response_status is None
+    assert (third.response_status, third.response_body) == (200, '{"ok": true}')
+
+
+def test_release_keeps_completed_keys(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    now = datetime.datetime(2026, 10, 18)
+    for key in ("running", "completed"):
+        repository.claim_idempotency_key(test_company.company_uuid, key, "hash", now)
+    repository.save_idempotent_response(
+        test_company.company_uuid, "completed", now, 200, "{}"
+    )
+
+    # Act
+    for key in ("running", "completed"):
+        repository.release_idempotency_key(test_company.company_uuid, key, now)
+
+    # Assert
+    assert (
+        repository.claim_idempotency_key(
+            test_company.company_uuid, "running", "hash", now
+        )
+        is None
+    )
+    assert (
+        repository.claim_idempotency_key(
+            test_company.company_uuid, "completed", "hash", now
+        ).response_status
+        == 200
+    )
+
+
+def test_delete_idempotency_keys_before(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    repository.claim_idempotency_key(
+        test_company.company_uuid, "old", "hash", datetime.datetime(2026, 10, 1)
+    )
+    repository.claim_idempotency_key(
+        test_company.company_uuid, "new", "hash", datetime.datetime(2026, 10, 18)
+    )
+
+    # Act
+    deleted = repository.delete_idempotency_keys_before(datetime.datetime(2026, 10, 10))
+
+    # Assert
+    assert deleted == 1
+    assert (
+        repository.claim_idempotency_key(
+            test_company.company_uuid, "new", "hash", datetime.datetime(2026, 10, 18)
+        )
+        is not None
+    )
+
+
+def test_claim_takes_over_expired_in_progress_claim(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    claimed_at = datetime.datetime(2026, 10, 18, 12, 0)
+    retried_at = claimed_at + datetime.timedelta(minutes=10)
+    repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", claimed_at
+    )
+
+    # Act
+    live = repository.claim_idempotency_key(
+        test_company.company_uuid,
+        "key",
+        "hash",
+        retried_at,
+        claimed_at - datetime.timedelta(seconds=1),
+    )
+    other_request = repository.claim_idempotency_key(
+        test_company.company_uuid,
+        "key",
+        "other-hash",
+        retried_at,
+        retried_at,
+    )
+    taken_over = repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", retried_at, retried_at
+    )
+
+    # Assert
+    assert live.response_status is None
+    assert other_request.request_hash == "hash"
+    assert taken_over is None
+
+
+def test_superseded_claim_neither_saves_nor_releases(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    claimed_at = datetime.datetime(2026, 10, 18, 12, 0)
+    retried_at = claimed_at + datetime.timedelta(minutes=10)
+    repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", claimed_at
+    )
+    repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", retried_at, retried_at
+    )
+
+    # Act
+    repository.release_idempotency_key(test_company.company_uuid, "key", claimed_at)
+    repository.save_idempotent_response(
+        test_company.company_uuid, "key", claimed_at, 500, "{}"
+    )
+    in_progress = repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", retried_at
+    )
+    repository.save_idempotent_response(
+        test_company.company_uuid, "key", retried_at, 200, "{}"
+    )
+    completed = repository.claim_idempotency_key(
+        test_company.company_uuid, "key", "hash", retried_at
+    )
+
+    # Assert
+    assert in_progress.response_status is None
+    assert completed.response_status == 200
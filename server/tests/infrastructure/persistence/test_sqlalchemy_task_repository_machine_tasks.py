@@ -0,0 +1,135 @@
+from sqlalchemy import event
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.schemas import (
+    MultipleInvoicesAction,
+    MultipleInvoicesData,
+    SingleInvoiceAction,
+    SingleInvoiceData,
+)
+
+
+def test_get_structured_waiting_tasks_for_machine_in_one_query(
+    db_session, test_company
+):
+    # Arrange
+    company_uuid = test_company.company_uuid
+    repository = SQLAlchemyTaskRepository(db_session)
+    single_tasks_uuid = repository.create_single_invoice_tasks(
+        company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno=idno,
+                person_name_certificate=person,
+                seria="MT",
+                number=str(number),
+            )
+            for number, (person, idno) in enumerate(
+                [("Ana", "111"), ("Ana", "111"), ("Ana", "222"), ("Ion", "111")]
+            )
+        ],
+    )
+    (multiple_task_uuid,) = repository.create_multiple_invoices_tasks(
+        company_uuid,
+        MultipleInvoicesAction.SUPPLIER_SIGN_ALL_DRAFTED_INVOICES.value,
+        [
+            MultipleInvoicesData(
+                my_company_idno="111",
+                person_name_certificate="Ana",
+                buyer_idno="999",
+                signature_type="SHORT",
+            )
+        ],
+    )
+    statements = []
+    connection = db_session.connection()
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    # Act
+    event.listen(connection, "before_cursor_execute", listener)
+    try:
+        tasks, next_key = repository.get_structured_waiting_tasks_for_machine(
+            company_uuid
+        )
+    finally:
+        event.remove(connection, "before_cursor_execute", listener)
+
+    # Assert
+    assert len(statements) == 1
+    assert next_key is None
+    single_tasks = tasks["SingleInvoiceTask"]
+    assert {person: sorted(by_idno) for person, by_idno in single_tasks.items()} == {
+        "Ana": ["111", "222"],
+        "Ion": ["111"],
+    }
+    assert sorted(task["number"] for task in single_tasks["Ana"]["111"]) == ["0", "1"]
+    assert single_tasks["Ion"]["111"] == [
+        {
+            "seria": "MT",
+            "number": "3",
+            "task_uuid": str(single_tasks_uuid[3]),
+            "action_type": SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+            "attempt": 0,
+        }
+    ]
+    assert tasks["MultipleInvoicesTask"] == {
+        "Ana": {
+            "111": [
+                {
+                    "buyer_idno": "999",
+                    "signature_type": "SHORT",
+                    "task_uuid": str(multiple_task_uuid),
+                    "action_type": MultipleInvoicesAction.SUPPLIER_SIGN_ALL_DRAFTED_INVOICES.value,
+                    "attempt": 0,
+                }
+            ]
+        }
+    }
+
+
+def test_get_structured_waiting_tasks_for_machine_pages_by_key(
+    db_session, test_company
+):
+    # Arrange
+    company_uuid = test_company.company_uuid
+    repository = SQLAlchemyTaskRepository(db_session)
+    repository.create_single_invoice_tasks(
+        company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="111",
+                person_name_certificate="Ana",
+                seria="PG",
+                number=str(number),
+            )
+            for number in range(5)
+        ],
+    )
+
+    # Act
+    pages = []
+    after = None
+    while True:
+        tasks, after = repository.get_structured_waiting_tasks_for_machine(
+            company_uuid, limit=2, after=after
+        )
+        pages.append(
+            [task["number"] for task in tasks["SingleInvoiceTask"]["Ana"]["111"]]
+        )
+        if after is None:
+            break
+
+    # Assert
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(number for page in pages for number in page) == [
+        "0",
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
@@ -0,0 +1,97 @@
+import datetime
+from uuid import uuid4
+import pytest
+from sqlalchemy import event
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.company.models import CompanyModel
+from domain.exceptions import TaskNotFoundException, TaskNotOwnedException
+from domain.task.schemas import MultipleInvoicesAction, MultipleInvoicesData
+
+
+def _create_tasks(repository, company_uuid, count):
+    return repository.create_multiple_invoices_tasks(
+        company_uuid,
+        MultipleInvoicesAction.SUPPLIER_SIGN_ALL_DRAFTED_INVOICES.value,
+        [
+            MultipleInvoicesData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                buyer_idno=str(buyer_idno),
+                signature_type="LONG",
+            )
+            for buyer_idno in range(count)
+        ],
+    )
+
+
+@pytest.fixture
+def other_company(db_session):
+    company = CompanyModel(
+        company_uuid=uuid4(),
+        name="Other Company",
+        auth_token=str(uuid4()),
+        created_at=datetime.datetime.now(),
+    )
+    db_session.add(company)
+    db_session.flush()
+    return company
+
+
+def test_verify_company_task_ownership_single_query(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_tasks(repository, test_company.company_uuid, 200)
+    # Reload the company after the commit so it is not counted below
+    company_uuid = test_company.company_uuid
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    connection = db_session.connection()
+    event.listen(connection, "before_cursor_execute", count_statement)
+
+    # Act
+    try:
+        owned = repository.verify_company_task_ownership(company_uuid, tasks_uuid)
+    finally:
+        event.remove(connection, "before_cursor_execute", count_statement)
+
+    # Assert
+    assert owned is True
+    assert len(statements) == 1
+
+
+def test_verify_company_task_ownership_not_found(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_tasks(repository, test_company.company_uuid, 2)
+    missing_uuid = uuid4()
+
+    # Act & Assert
+    with pytest.raises(TaskNotFoundException) as exc_info:
+        repository.verify_company_task_ownership(
+            test_company.company_uuid, tasks_uuid + [missing_uuid]
+        )
+
+    assert exc_info.value.task_uuid == missing_uuid
+    assert exc_info.value.tasks_uuid == [missing_uuid]
+
+
+def test_verify_company_task_ownership_not_owned(
+    db_session, test_company, other_company
+):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    own_tasks_uuid = _create_tasks(repository, test_company.company_uuid, 2)
+    other_tasks_uuid = _create_tasks(repository, other_company.company_uuid, 1)
+
+    # Act & Assert
+    with pytest.raises(TaskNotOwnedException) as exc_info:
+        repository.verify_company_task_ownership(
+            test_company.company_uuid, own_tasks_uuid + other_tasks_uuid
+        )
+
+    assert exc_info.value.task_details == [str(other_tasks_uuid[0])]
@@ -0,0 +1,127 @@
+import datetime
+from uuid import uuid4
+import pytest
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.company.models import CompanyModel
+from domain.exceptions import TaskNotOwnedException
+from domain.task.schemas import (
+    SingleInvoiceAction,
+    SingleInvoiceData,
+    SingleInvoiceStatusRequest,
+    TaskStatus,
+    TaskStatusUpdateByUUIDRequest,
+)
+
+
+def _create_invoices(repository, company_uuid, keys):
+    return repository.create_single_invoice_tasks(
+        company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno=idno,
+                person_name_certificate="Person",
+                seria=seria,
+                number=number,
+            )
+            for idno, seria, number in keys
+        ],
+    )
+
+
+def test_get_single_invoice_tasks_status_matches_exact_keys(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    _create_invoices(
+        repository,
+        test_company.company_uuid,
+        [("111", "S", "1"), ("111", "T", "2"), ("222", "S", "2"), ("222", "T", "1")],
+    )
+    requested = [
+        SingleInvoiceStatusRequest(my_company_idno="111", seria="S", number="1"),
+        SingleInvoiceStatusRequest(my_company_idno="222", seria="T", number="1"),
+    ]
+
+    # Act
+    result = repository.get_single_invoice_tasks_status(
+        test_company.company_uuid, requested
+    )
+
+    # Assert
+    assert sorted(
+        (task.my_company_idno, task.seria, task.number, task.status)
+        for task in result.tasks
+    ) == [("111", "S", "1", "WAITING"), ("222", "T", "1", "WAITING")]
+
+
+def test_get_single_invoice_tasks_status_not_owned(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    other_company = CompanyModel(
+        company_uuid=uuid4(),
+        name="Other Company",
+        auth_token=str(uuid4()),
+        created_at=datetime.datetime.now(),
+    )
+    db_session.add(other_company)
+    db_session.flush()
+    _create_invoices(repository, other_company.company_uuid, [("333", "S", "1")])
+
+    # Act & Assert
+    with pytest.raises(TaskNotOwnedException) as exc_info:
+        repository.get_single_invoice_tasks_status(
+            test_company.company_uuid,
+            [SingleInvoiceStatusRequest(my_company_idno="333", seria="S", number="1")],
+        )
+
+    assert exc_info.value.task_details == [
+        {"my_company_idno": "333", "seria": "S", "number": "1"}
+    ]
+
+
+def test_get_single_invoice_tasks_uuid_matches_exact_keys(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_invoices(
+        repository,
+        test_company.company_uuid,
+        [("444", "S", "1"), ("444", "T", "2"), ("444", "S", "2")],
+    )
+
+    # Act
+    result = repository.get_single_invoice_tasks_uuid(
+        [
+            SingleInvoiceStatusRequest(my_company_idno="444", seria="S", number="1"),
+            SingleInvoiceStatusRequest(my_company_idno="444", seria="T", number="2"),
+        ]
+    )
+
+    # Assert
+    assert sorted(result) == sorted(tasks_uuid[:2])
+
+
+def test_count_tasks_by_status_groups_per_company_and_type(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_invoices(
+        repository,
+        test_company.company_uuid,
+        [("111", "Q", "1"), ("111", "Q", "2"), ("111", "Q", "3")],
+    )
+    repository.update_tasks_status(
+        [TaskStatusUpdateByUUIDRequest(task_uuid=tasks_uuid[0], status="FAILED")]
+    )
+
+    # Act
+    groups = repository.count_tasks_by_status(
+        [TaskStatus.WAITING, TaskStatus.FAILED, TaskStatus.PROCESSING]
+    )
+
+    # Assert
+    assert sorted(
+        (group["task_type"], group["status"], group["count"])
+        for group in groups
+        if group["company_uuid"] == test_company.company_uuid
+    ) == [("SingleInvoiceTask", "FAILED", 1), ("SingleInvoiceTask", "WAITING", 2)]
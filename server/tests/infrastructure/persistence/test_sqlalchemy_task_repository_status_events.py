@@ -0,0 +1,159 @@
+import datetime
+from domain.task.models import TaskStatusEventModel
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.schemas import (
+    SingleInvoiceAction,
+    SingleInvoiceData,
+    TaskStatus,
+    TaskStatusUpdateByUUIDRequest,
+)
+
+
+def _create_tasks(repository, company_uuid, count):
+    return repository.create_single_invoice_tasks(
+        company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="EV",
+                number=str(number),
+            )
+            for number in range(count)
+        ],
+    )
+
+
+def test_status_changes_are_logged(db_session, test_company):
+    # Arrange
+    company_uuid = test_company.company_uuid
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_tasks(repository, company_uuid, 2)
+    start = repository.get_task_status_event_cursor(company_uuid)
+
+    # Act
+    claimed_tasks = repository.claim_waiting_tasks_for_machine(
+        company_uuid, 1, datetime.datetime(2000, 1, 1)
+    )
+    (claimed_task,) = claimed_tasks["SingleInvoiceTask"]["Person"]["123"]
+    (unclaimed_task_uuid,) = [
+        task_uuid
+        for task_uuid in tasks_uuid
+        if str(task_uuid) != claimed_task["task_uuid"]
+    ]
+    repository.requeue_expired_tasks(datetime.datetime(2000, 1, 2), max_attempts=3)
+    repository.update_tasks_status(
+        [
+            TaskStatusUpdateByUUIDRequest(
+                task_uuid=unclaimed_task_uuid, status="COMPLETED"
+            )
+        ]
+    )
+
+    # Assert
+    events, held_back = repository.get_task_status_events(company_uuid, start, 10)
+    assert [event.status for event in events] == [
+        TaskStatus.PROCESSING,
+        TaskStatus.WAITING,
+        TaskStatus.COMPLETED,
+    ]
+    assert (
+        str(events[0].task_uuid)
+        == str(events[1].task_uuid)
+        == claimed_task["task_uuid"]
+    )
+    assert events[2].task_uuid == unclaimed_task_uuid
+    assert events[0].event_id < events[1].event_id < events[2].event_id
+    assert not held_back
+    assert repository.get_task_status_event_cursor(company_uuid) == (
+        0,
+        events[2].event_id,
+    )
+
+
+def test_get_task_status_events_resumes_after_event(db_session, test_company):
+    # Arrange
+    company_uuid = test_company.company_uuid
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_tasks(repository, company_uuid, 3)
+    start = repository.get_task_status_event_cursor(company_uuid)
+    repository.update_tasks_status(
+        [
+            TaskStatusUpdateByUUIDRequest(task_uuid=task_uuid, status="COMPLETED")
+            for task_uuid in tasks_uuid
+        ]
+    )
+    (first_event, *_), _ = repository.get_task_status_events(company_uuid, start, 1)
+
+    # Act
+    remaining_events, _ = repository.get_task_status_events(
+        company_uuid,
+        repository.get_task_status_event_cursor(company_uuid, first_event.event_id),
+        10,
+    )
+
+    # Assert
+    assert len(remaining_events) == 2
+    assert first_event.task_uuid not in {event.task_uuid for event in remaining_events}
+
+
+def test_get_task_status_events_in_transaction_order(db_session, test_company):
+    # Arrange
+    company_uuid = test_company.company_uuid
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = _create_tasks(repository, company_uuid, 1)
+    # A later event id logged by an earlier transaction, as a transaction
+    # that took its id first and committed last would leave on Postgres
+    db_session.add_all(
+        TaskStatusEventModel(
+            company_uuid=company_uuid,
+            task_uuid=task_uuid,
+            status=status,
+            created_at=datetime.datetime(2026, 10, 18),
+            transaction_id=transaction_id,
+        )
+        for status, transaction_id in (("PROCESSING", 20), ("COMPLETED", 10))
+    )
+    db_session.commit()
+
+    # Act
+    events, _ = repository.get_task_status_events(company_uuid, (0, 0), 10)
+    resumed, _ = repository.get_task_status_events(
+        company_uuid,
+        repository.get_task_status_event_cursor(company_uuid, events[0].event_id),
+        10,
+    )
+
+    # Assert
+    assert [event.transaction_id for event in events] == [10, 20]
+    assert events[0].event_id > events[1].event_id
+    assert resumed == events[1:]
+    assert repository.get_task_status_event_cursor(company_uuid) == (
+        20,
+        events[1].event_id,
+    )
+
+
+def test_delete_task_status_events_before(db_session, test_company):
+    # Arrange
+    company_uuid = test_company.company_uuid
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_tasks(repository, company_uuid, 1)
+    repository.update_tasks_status(
+        [TaskStatusUpdateByUUIDRequest(task_uuid=tasks_uuid[0], status="FAILED")]
+    )
+
+    # Act
+    kept = repository.delete_task_status_events_before(datetime.datetime(2000, 1, 1))
+    deleted = repository.delete_task_status_events_before(
+        datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        + datetime.timedelta(seconds=1)
+    )
+
+    # Assert
+    assert kept == 0
+    assert deleted >= 1
+    assert repository.get_task_status_events(company_uuid, (0, 0), 10) == ([], False)
@@ -0,0 +1,120 @@
+from uuid import uuid4
+from sqlalchemy import event
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+from domain.task.models import CompanyTaskModel
+from domain.task.schemas import (
+    MultipleInvoicesAction,
+    MultipleInvoicesData,
+    TaskStatus,
+    TaskStatusUpdateByUUIDRequest,
+)
+
+
+def _create_tasks(repository, company_uuid, count):
+    return repository.create_multiple_invoices_tasks(
+        company_uuid,
+        MultipleInvoicesAction.SUPPLIER_SIGN_ALL_DRAFTED_INVOICES.value,
+        [
+            MultipleInvoicesData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                buyer_idno=str(buyer_idno),
+                signature_type="LONG",
+            )
+            for buyer_idno in range(count)
+        ],
+    )
+
+
+def _statuses(db_session, tasks_uuid):
+    return dict(
+        db_session.query(CompanyTaskModel.task_uuid, CompanyTaskModel.status)
+        .filter(CompanyTaskModel.task_uuid.in_(tasks_uuid))
+        .all()
+    )
+
+
+def test_update_tasks_status_groups_by_status(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = _create_tasks(repository, test_company.company_uuid, 100)
+    updates = [
+        TaskStatusUpdateByUUIDRequest(
+            task_uuid=task_uuid,
+            status=(
+                TaskStatus.COMPLETED.value if index % 2 else TaskStatus.FAILED.value
+            ),
+        )
+        for index, task_uuid in enumerate(tasks_uuid)
+    ]
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    connection = db_session.connection()
+    event.listen(connection, "before_cursor_execute", count_statement)
+
+    # Act
+    try:
+        updated_rows = repository.update_tasks_status(updates)
+    finally:
+        event.remove(connection, "before_cursor_execute", count_statement)
+
+    # Assert
+    assert updated_rows == 100
+    # One UPDATE and one status log INSERT per distinct status
+    assert [statement.split()[0] for statement in statements] == [
+        "INSERT",
+        "UPDATE",
+        "INSERT",
+        "UPDATE",
+    ]
+    statuses = _statuses(db_session, tasks_uuid)
+    assert statuses[tasks_uuid[0]] == TaskStatus.FAILED.value
+    assert statuses[tasks_uuid[1]] == TaskStatus.COMPLETED.value
+
+
+def test_update_tasks_status_last_update_wins(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = _create_tasks(repository, test_company.company_uuid, 1)
+
+    # Act
+    updated_rows = repository.update_tasks_status(
+        [
+            TaskStatusUpdateByUUIDRequest(
+                task_uuid=task_uuid, status=TaskStatus.PROCESSING.value
+            ),
+            TaskStatusUpdateByUUIDRequest(
+                task_uuid=task_uuid, status=TaskStatus.COMPLETED.value
+            ),
+        ]
+    )
+
+    # Assert
+    assert updated_rows == 1
+    assert _statuses(db_session, [task_uuid])[task_uuid] == TaskStatus.COMPLETED.value
+
+
+def test_update_tasks_status_reports_lost_updates(db_session, test_company):
+    # Arrange
+    repository = SQLAlchemyTaskRepository(db_session)
+    (task_uuid,) = _create_tasks(repository, test_company.company_uuid, 1)
+
+    # Act
+    updated_rows = repository.update_tasks_status(
+        [
+            TaskStatusUpdateByUUIDRequest(
+                task_uuid=task_uuid, status=TaskStatus.COMPLETED.value
+            ),
+            TaskStatusUpdateByUUIDRequest(
+                task_uuid=uuid4(), status=TaskStatus.COMPLETED.value
+            ),
+        ]
+    )
+
+    # Assert
+    assert updated_rows == 1
@@ -0,0 +1,71 @@
+import uuid
+import pytest
+from infrastructure.rate_limit.company_rate_limiter import (
+    CompanyRateLimiter,
+    InMemoryRateLimitStore,
+    RateLimitBudget,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return CompanyRateLimiter(
+        InMemoryRateLimitStore(clock=clock),
+        {"write": RateLimitBudget(rate=2, burst=3), "off": RateLimitBudget(0, 0)},
+    )
+
+
+def test_admits_a_burst_then_asks_to_wait(limiter):
+    company_uuid = uuid.uuid4()
+
+    admitted = [limiter.acquire(company_uuid, "write") for _ in range(3)]
+    retry_after = limiter.acquire(company_uuid, "write")
+
+    assert admitted == [0, 0, 0]
+    assert retry_after == pytest.approx(0.5)
+
+
+def test_refills_at_the_budget_rate(limiter, clock):
+    # Arrange
+    company_uuid = uuid.uuid4()
+    for _ in range(3):
+        limiter.acquire(company_uuid, "write")
+
+    # Act
+    clock.now += 0.5
+    refilled = limiter.acquire(company_uuid, "write")
+    exhausted = limiter.acquire(company_uuid, "write")
+    clock.now += 60
+    burst = [limiter.acquire(company_uuid, "write") for _ in range(4)]
+
+    # Assert
+    assert refilled == 0
+    assert exhausted > 0
+    assert burst[:3] == [0, 0, 0]
+    assert burst[3] > 0
+
+
+def test_buckets_are_per_company_and_budget(limiter):
+    # Arrange
+    company_uuid = uuid.uuid4()
+    for _ in range(3):
+        limiter.acquire(company_uuid, "write")
+
+    # Act / Assert
+    assert limiter.acquire(company_uuid, "write") > 0
+    assert limiter.acquire(uuid.uuid4(), "write") == 0
+    assert limiter.acquire(company_uuid, "off") == 0
+    assert limiter.acquire(company_uuid, "unknown") == 0
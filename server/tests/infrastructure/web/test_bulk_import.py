@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from infrastructure.web.bulk_import import (
+    CsvInvoiceParser,
+    NdjsonInvoiceParser,
+    iter_lines,
+)
+
+
+def _lines(chunks, max_line_bytes=64):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [line async for line in iter_lines(stream(), max_line_bytes)]
+
+    return asyncio.run(collect())
+
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    assert _lines([b"fir", b"st\nsec", b"ond\r\n\n", b"third"]) == [
+        (1, "first"),
+        (2, "second"),
+        (4, "third"),
+    ]
+
+
+def test_iter_lines_drops_too_long_lines():
+    assert _lines([b"a" * 40, b"a" * 40, b"\nok\n"], max_line_bytes=64) == [
+        (1, None),
+        (2, "ok"),
+    ]
+
+
+def test_iter_lines_reports_invalid_utf8():
+    assert _lines([b"\xff\xfe\nok"]) == [(1, None), (2, "ok")]
+
+
+def test_ndjson_parser_rejects_non_numeric_number():
+    parser = NdjsonInvoiceParser()
+
+    with pytest.raises(ValueError):
+        parser.parse(
+            '{"my_company_idno": "1", "person_name_certificate": "P", '
+            '"seria": "A", "number": "x"}'
+        )
+
+
+def test_csv_parser_reads_columns_in_header_order():
+    parser = CsvInvoiceParser()
+
+    assert parser.parse("number,seria,my_company_idno,person_name_certificate") is None
+    invoice = parser.parse('7,AB,123,"Doe, John"')
+
+    assert (invoice.number, invoice.seria, invoice.person_name_certificate) == (
+        "7",
+        "AB",
+        "Doe, John",
+    )
+
+
+def test_csv_parser_requires_every_column():
+    with pytest.raises(ValueError, match="number"):
+        CsvInvoiceParser().parse("my_company_idno,person_name_certificate,seria")
@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from infrastructure.web.compression import SelectiveGZipMiddleware
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(
+        SelectiveGZipMiddleware, minimum_size=100, exclude_paths=("/stream",)
+    )
+    app.get("/bulk")(lambda: PlainTextResponse("x" * 1000))
+    app.get("/stream")(lambda: PlainTextResponse("x" * 1000))
+    return TestClient(app)
+
+
+def test_gzips_large_responses():
+    response = _client().get("/bulk", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "x" * 1000
+
+
+def test_leaves_excluded_paths_uncompressed():
+    response = _client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "x" * 1000
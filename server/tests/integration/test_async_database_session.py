@@ -0,0 +1,112 @@
+import asyncio
+import os
+import uuid
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from domain.company.models import Base as CompanyBase
+from domain.task.models import Base as TaskBase
+from infrastructure.persistence.database_session import AsyncDatabaseSession
+
+
+def _async_database_url(driver, tmp_path):
+    if driver == "aiosqlite":
+        pytest.importorskip("aiosqlite")
+        return f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+    pytest.importorskip("asyncpg")
+    # A scratch Postgres database, e.g. postgresql+asyncpg://user:pw@host/db;
+    # tables are created if missing and the test's rows are left in place
+    database_url = os.getenv("TEST_ASYNC_DATABASE_URL")
+    if not database_url:
+        pytest.skip("TEST_ASYNC_DATABASE_URL is not set")
+    return database_url
+
+
+@pytest.fixture(params=["aiosqlite", "asyncpg"])
+def async_session_factory(request, tmp_path):
+    engine = create_async_engine(_async_database_url(request.param, tmp_path))
+
+    async def create_tables():
+        async with engine.begin() as connection:
+            await connection.run_sync(CompanyBase.metadata.create_all)
+            await connection.run_sync(TaskBase.metadata.create_all)
+
+    try:
+        asyncio.run(create_tables())
+    except (OSError, exc.DBAPIError) as e:
+        asyncio.run(engine.dispose())
+        pytest.skip(f"Database is not available: {e}")
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def async_client(async_session_factory):
+    from fastapi.testclient import TestClient
+    import main
+
+    async def get_async_db():
+        db = AsyncDatabaseSession(async_session_factory())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    main.app.dependency_overrides[main.get_db] = get_async_db
+    try:
+        with TestClient(main.app) as test_client:
+            yield test_client
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_endpoints_run_on_async_session(async_client):
+    # Arrange
+    auth_token = async_client.post("/register", json={"name": "Async"}).json()[
+        "auth_token"
+    ]
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    # Unique per run, the Postgres database is not cleaned up
+    seria = uuid.uuid4().hex[:10]
+
+    # Act
+    created = async_client.post(
+        "/tasks/buyer/sign_single_invoice",
+        headers=headers,
+        json={
+            "action_type": "BuyerSignInvoice",
+            "invoices": [
+                {
+                    "my_company_idno": "123",
+                    "person_name_certificate": "Person",
+                    "seria": seria,
+                    "number": "1",
+                }
+            ],
+        },
+    )
+    claimed = async_client.post("/machine/tasks/claim", headers=headers)
+    (claimed_task,) = claimed.json()["SingleInvoiceTask"]["Person"]["123"]
+    updated = async_client.put(
+        "/tasks/status",
+        headers=headers,
+        json=[
+            {
+                "task_uuid": claimed_task["task_uuid"],
+                "status": "COMPLETED",
+                "attempt": claimed_task["attempt"],
+            }
+        ],
+    )
+    statuses = async_client.post(
+        "/tasks/status/singleInvoice",
+        headers=headers,
+        json=[{"my_company_idno": "123", "seria": seria, "number": "1"}],
+    )
+
+    # Assert
+    assert created.status_code == 200
+    assert claimed_task["task_uuid"] == created.json()["tasks_uuid"][0]
+    assert claimed_task["seria"] == seria
+    assert updated.json()["updated_tasks"] == 1
+    assert statuses.json()["tasks"][0]["status"] == "COMPLETED"
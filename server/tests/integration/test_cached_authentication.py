@@ -0,0 +1,37 @@
+from sqlalchemy import event
+
+
+def test_cached_token_skips_companies_query(client, db_session, auth_headers):
+    # Arrange
+    client.get("/machine/tasks", headers=auth_headers)
+    statements = []
+    connection = db_session.connection()
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", listener)
+
+    # Act
+    try:
+        response = client.get("/machine/tasks", headers=auth_headers)
+    finally:
+        event.remove(connection, "before_cursor_execute", listener)
+
+    # Assert
+    assert response.status_code == 200
+    assert not any("companies" in statement for statement in statements)
+
+
+def test_regenerated_token_is_rejected_at_once(client, auth_headers):
+    # Arrange
+    client.get("/machine/tasks", headers=auth_headers)
+
+    # Act
+    response = client.post("/regenerate-token", headers=auth_headers)
+    new_headers = {"Authorization": f"Bearer {response.json()['auth_token']}"}
+
+    # Assert
+    assert response.status_code == 200
+    assert client.get("/machine/tasks", headers=auth_headers).status_code == 401
+    assert client.get("/machine/tasks", headers=new_headers).status_code == 200
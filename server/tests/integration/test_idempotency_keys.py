@@ -0,0 +1,218 @@
+import asyncio
+import datetime
+import pytest
+import main
+from fastapi import Response
+from domain.task.models import CompanyTaskModel
+from domain.task.schemas import SingleInvoiceTaskRequest
+from infrastructure.persistence.database_session import ThreadpoolDatabaseSession
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+
+def _single_invoice_request(number="1"):
+    return {
+        "action_type": "BuyerSignInvoice",
+        "invoices": [
+            {
+                "my_company_idno": "123",
+                "person_name_certificate": "Person",
+                "seria": "IK",
+                "number": number,
+            }
+        ],
+    }
+
+
+def _multiple_invoices_request():
+    return {
+        "action_type": "SupplierSignAllDraftedInvoices",
+        "invoices": [
+            {
+                "my_company_idno": "123",
+                "person_name_certificate": "Person",
+                "buyer_idno": "456",
+                "signature_type": "LONG",
+            }
+        ],
+    }
+
+
+def _company_tasks_count(db_session, test_company):
+    return (
+        db_session.query(CompanyTaskModel)
+        .filter(CompanyTaskModel.company_uuid == test_company.company_uuid)
+        .count()
+    )
+
+
+def test_retry_with_same_key_replays_single_invoice_response(
+    client, auth_headers, db_session, test_company
+):
+    # Arrange
+    headers = {**auth_headers, "Idempotency-Key": "erp-batch-1"}
+    first = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request(),
+        headers=headers,
+    )
+
+    # Act
+    retry = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request(),
+        headers=headers,
+    )
+
+    # Assert
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert _company_tasks_count(db_session, test_company) == 1
+
+
+def test_retry_with_same_key_does_not_duplicate_multiple_invoices_tasks(
+    client, auth_headers, db_session, test_company
+):
+    headers = {**auth_headers, "Idempotency-Key": "erp-batch-2"}
+
+    responses = [
+        client.post(
+            "/tasks/supplier/sign_all_invoices",
+            json=_multiple_invoices_request(),
+            headers=headers,
+        )
+        for _ in range(3)
+    ]
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert len({tuple(response.json()["tasks_uuid"]) for response in responses}) == 1
+    assert _company_tasks_count(db_session, test_company) == 1
+
+
+def test_key_reused_with_another_request_is_rejected(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "erp-batch-3"}
+    client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request("1"),
+        headers=headers,
+    )
+
+    response = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request("2"),
+        headers=headers,
+    )
+
+    assert response.status_code == 422
+    assert response.json()["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+
+def test_failed_request_releases_its_key(client, auth_headers):
+    # Arrange
+    client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request(),
+        headers=auth_headers,
+    )
+    headers = {**auth_headers, "Idempotency-Key": "erp-batch-4"}
+
+    # Act
+    responses = [
+        client.post(
+            "/tasks/buyer/sign_single_invoice",
+            json=_single_invoice_request(),
+            headers=headers,
+        )
+        for _ in range(2)
+    ]
+
+    # Assert
+    assert [response.status_code for response in responses] == [409, 409]
+    assert all("existing_tasks" in response.json()["detail"] for response in responses)
+
+
+def test_request_in_progress_is_rejected(
+    client, auth_headers, db_session, test_company
+):
+    # Arrange
+    SQLAlchemyTaskRepository(db_session).claim_idempotency_key(
+        test_company.company_uuid,
+        "erp-batch-5",
+        main._request_hash(
+            "/tasks/buyer/sign_single_invoice",
+            SingleInvoiceTaskRequest(**_single_invoice_request()),
+        ),
+        datetime.datetime.now(),
+    )
+
+    # Act
+    response = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request(),
+        headers={**auth_headers, "Idempotency-Key": "erp-batch-5"},
+    )
+
+    # Assert
+    assert response.status_code == 409
+    assert response.json()["code"] == "IDEMPOTENCY_KEY_IN_PROGRESS"
+    assert _company_tasks_count(db_session, test_company) == 0
+
+
+def test_expired_request_in_progress_is_taken_over(
+    client, auth_headers, db_session, test_company
+):
+    # Arrange
+    SQLAlchemyTaskRepository(db_session).claim_idempotency_key(
+        test_company.company_uuid,
+        "erp-batch-6",
+        main._request_hash(
+            "/tasks/buyer/sign_single_invoice",
+            SingleInvoiceTaskRequest(**_single_invoice_request()),
+        ),
+        datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        - datetime.timedelta(seconds=main.Config.IDEMPOTENCY_CLAIM_TIMEOUT + 1),
+    )
+    headers = {**auth_headers, "Idempotency-Key": "erp-batch-6"}
+
+    # Act
+    responses = [
+        client.post(
+            "/tasks/buyer/sign_single_invoice",
+            json=_single_invoice_request(),
+            headers=headers,
+        )
+        for _ in range(2)
+    ]
+
+    # Assert
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[1].headers["idempotent-replayed"] == "true"
+    assert _company_tasks_count(db_session, test_company) == 1
+
+
+def test_cancelled_request_releases_its_key(db_session, test_company):
+    # Arrange
+    db = ThreadpoolDatabaseSession(db_session)
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    async def created():
+        return Response(content="{}", media_type="application/json")
+
+    # Act
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(
+            main._run_idempotent(test_company, db, "erp-batch-7", "hash", cancelled)
+        )
+    retried = asyncio.run(
+        main._run_idempotent(test_company, db, "erp-batch-7", "hash", created)
+    )
+
+    # Assert
+    assert retried.status_code == 200
+    assert "idempotent-replayed" not in retried.headers
@@ -0,0 +1,98 @@
+import threading
+import time
+
+
+def _single_invoice_request(seria):
+    return {
+        "action_type": "BuyerSignInvoice",
+        "invoices": [
+            {
+                "my_company_idno": "123",
+                "person_name_certificate": "Person",
+                "seria": seria,
+                "number": "1",
+            }
+        ],
+    }
+
+
+def test_machine_tasks_without_wait_answers_at_once(client, auth_headers):
+    started = time.monotonic()
+
+    response = client.get("/machine/tasks", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "SingleInvoiceTask": {},
+        "MultipleInvoicesTask": {},
+        "next_cursor": None,
+    }
+    assert time.monotonic() - started < 1
+
+
+def test_machine_tasks_wait_returns_when_tasks_are_created(client, auth_headers):
+    # Arrange
+    poll = {}
+
+    def long_poll():
+        started = time.monotonic()
+        poll["response"] = client.get(
+            "/machine/tasks", params={"wait": 10}, headers=auth_headers
+        )
+        poll["elapsed"] = time.monotonic() - started
+
+    poller = threading.Thread(target=long_poll)
+
+    # Act
+    poller.start()
+    time.sleep(0.3)
+    create_response = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request("LP"),
+        headers=auth_headers,
+    )
+    poller.join(timeout=10)
+
+    # Assert
+    assert create_response.status_code == 200
+    assert poll["response"].status_code == 200
+    assert "Person" in poll["response"].json()["SingleInvoiceTask"]
+    assert poll["elapsed"] < 5
+
+
+def test_claim_wait_times_out_empty(client, auth_headers):
+    started = time.monotonic()
+
+    response = client.post(
+        "/machine/tasks/claim", params={"wait": 1}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["SingleInvoiceTask"] == {}
+    assert 0.9 < time.monotonic() - started < 5
+
+
+def test_claimed_task_lease_is_renewed(client, auth_headers):
+    # Arrange
+    client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoice_request("RN"),
+        headers=auth_headers,
+    )
+    claimed = client.post("/machine/tasks/claim", headers=auth_headers).json()
+    (task,) = claimed["SingleInvoiceTask"]["Person"]["123"]
+
+    # Act
+    renewed = client.post(
+        "/machine/tasks/lease",
+        json=[
+            {"task_uuid": task["task_uuid"], "attempt": task["attempt"]},
+            {"task_uuid": task["task_uuid"], "attempt": task["attempt"] + 1},
+        ],
+        headers=auth_headers,
+    )
+
+    # Assert
+    assert renewed.status_code == 200
+    assert renewed.json()["renewed"] == [task["task_uuid"]]
+    assert renewed.json()["lease_expires_at"] >= claimed["lease_expires_at"]
@@ -0,0 +1,70 @@
+def _create_single_invoice_tasks(client, auth_headers, count):
+    response = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json={
+            "action_type": "BuyerSignInvoice",
+            "invoices": [
+                {
+                    "my_company_idno": "123",
+                    "person_name_certificate": "Person",
+                    "seria": "CP",
+                    "number": str(number),
+                }
+                for number in range(count)
+            ],
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+
+def _page_tasks_uuid(page):
+    return [
+        task["task_uuid"]
+        for tasks in page["SingleInvoiceTask"].get("Person", {}).values()
+        for task in tasks
+    ]
+
+
+def test_machine_tasks_cursor_walks_every_task_once(client, auth_headers):
+    # Arrange
+    _create_single_invoice_tasks(client, auth_headers, 5)
+
+    # Act
+    pages = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/machine/tasks", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        if pages[-1]["next_cursor"] is None:
+            break
+        params["cursor"] = pages[-1]["next_cursor"]
+
+    # Assert
+    tasks_uuid = [task_uuid for page in pages for task_uuid in _page_tasks_uuid(page)]
+    assert [len(_page_tasks_uuid(page)) for page in pages] == [2, 2, 1]
+    assert len(set(tasks_uuid)) == 5
+
+
+def test_machine_tasks_limit_is_capped(client, auth_headers, monkeypatch):
+    # Arrange
+    monkeypatch.setattr("config.Config.MACHINE_TASKS_PAGE_SIZE", 3)
+    _create_single_invoice_tasks(client, auth_headers, 4)
+
+    # Act
+    response = client.get("/machine/tasks", params={"limit": 50}, headers=auth_headers)
+
+    # Assert
+    assert response.status_code == 200
+    assert len(_page_tasks_uuid(response.json())) == 3
+    assert response.json()["next_cursor"] is not None
+
+
+def test_machine_tasks_invalid_cursor(client, auth_headers):
+    response = client.get(
+        "/machine/tasks", params={"cursor": "not-a-cursor"}, headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_CURSOR"
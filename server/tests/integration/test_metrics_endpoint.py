@@ -0,0 +1,97 @@
+import pytest
+from infrastructure.monitoring.query_metrics import instrument_engine
+
+
+@pytest.fixture
+def metrics_client(client, engine):
+    # The test engine replaces main.engine, which is instrumented at import
+    instrument_engine(engine)
+    return client
+
+
+def _create_invoices(client, auth_headers, seria, count):
+    return client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json={
+            "action_type": "BuyerSignInvoice",
+            "invoices": [
+                {
+                    "my_company_idno": "123",
+                    "person_name_certificate": "Person",
+                    "seria": seria,
+                    "number": str(number),
+                }
+                for number in range(count)
+            ],
+        },
+        headers=auth_headers,
+    )
+
+
+def _samples(text, name):
+    return [line for line in text.splitlines() if line.startswith(name + "{")]
+
+
+def test_metrics_report_requests_by_route_and_status(metrics_client, auth_headers):
+    # Arrange
+    metrics_client.get("/machine/tasks", headers=auth_headers)
+    metrics_client.get("/machine/tasks", headers={"Authorization": "Bearer wrong"})
+
+    # Act
+    response = metrics_client.get("/metrics")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    requests = _samples(response.text, "http_requests_total")
+    assert any(
+        'method="GET",route="/machine/tasks",status="200"' in line for line in requests
+    )
+    assert any(
+        'method="GET",route="/machine/tasks",status="401"' in line for line in requests
+    )
+    assert any(
+        line.startswith(
+            'http_request_duration_seconds_count{method="GET",route="/machine/tasks"}'
+        )
+        for line in response.text.splitlines()
+    )
+
+
+def test_metrics_report_db_queries_per_request(metrics_client, auth_headers):
+    # Arrange
+    metrics_client.post("/metrics/unknown")
+    _create_invoices(metrics_client, auth_headers, "QM", 2)
+
+    # Act
+    response = metrics_client.get("/metrics")
+
+    # Assert
+    route_labels = 'method="POST",route="/tasks/buyer/sign_single_invoice"}'
+    query_counts = [
+        line
+        for line in response.text.splitlines()
+        if line.startswith("http_request_db_queries_count{" + route_labels)
+        or line.startswith("http_request_db_queries_sum{" + route_labels)
+    ]
+    assert len(query_counts) == 2
+    assert all(float(line.rsplit(" ", 1)[1]) > 0 for line in query_counts)
+    assert _samples(response.text, "http_requests_total")
+    assert any('route="unmatched"' in line for line in response.text.splitlines())
+
+
+def test_metrics_report_queue_depth_per_company(
+    metrics_client, auth_headers, test_company
+):
+    # Arrange
+    _create_invoices(metrics_client, auth_headers, "QD", 3)
+
+    # Act
+    response = metrics_client.get("/metrics")
+
+    # Assert
+    assert (
+        f'tasks_queue_depth{{company_uuid="{test_company.company_uuid}",'
+        'task_type="SingleInvoiceTask",status="WAITING"} 3'
+    ) in response.text.splitlines()
+    assert 'db_pool_checkouts_total{engine="sync"}' in response.text
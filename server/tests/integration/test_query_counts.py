@@ -0,0 +1,136 @@
+"""
+SQL statements run per endpoint.
+
+Every endpoint must run the same number of statements whatever the number of
+submitted items: one query per item is a regression even when the tests stay
+fast on SQLite.
+"""
+
+import pytest
+
+# Duplicate check, task data insert, company tasks insert
+SINGLE_INVOICE_BUDGET = 3
+MULTIPLE_INVOICES_BUDGET = 2
+STATUS_QUERY_BUDGET = 1
+# Ownership check, status events insert, status update
+STATUS_UPDATE_BUDGET = 3
+MACHINE_TASKS_BUDGET = 1
+MACHINE_CLAIM_BUDGET = 4
+
+
+def _single_invoices(seria, count):
+    return {
+        "action_type": "BuyerSignInvoice",
+        "invoices": [
+            {
+                "my_company_idno": "123",
+                "person_name_certificate": "Person",
+                "seria": seria,
+                "number": str(number),
+            }
+            for number in range(count)
+        ],
+    }
+
+
+def _multiple_invoices(count):
+    return {
+        "action_type": "SupplierSignAllDraftedInvoices",
+        "invoices": [
+            {
+                "my_company_idno": "123",
+                "person_name_certificate": "Person",
+                "buyer_idno": str(number),
+                "signature_type": "LONG",
+            }
+            for number in range(count)
+        ],
+    }
+
+
+@pytest.fixture
+def warm_client(client, auth_headers):
+    # The first request of a company looks up its token, later ones are cached
+    client.get("/machine/tasks", headers=auth_headers)
+    return client
+
+
+def _create_single_invoices(client, auth_headers, seria, count):
+    response = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json=_single_invoices(seria, count),
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    return response.json()["tasks_uuid"]
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_create_single_invoice_tasks_queries(
+    warm_client, auth_headers, assert_max_queries, count
+):
+    with assert_max_queries(SINGLE_INVOICE_BUDGET):
+        _create_single_invoices(warm_client, auth_headers, f"Q{count}", count)
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_create_multiple_invoices_tasks_queries(
+    warm_client, auth_headers, assert_max_queries, count
+):
+    with assert_max_queries(MULTIPLE_INVOICES_BUDGET):
+        response = warm_client.post(
+            "/tasks/supplier/sign_all_invoices",
+            json=_multiple_invoices(count),
+            headers=auth_headers,
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_single_invoice_status_queries(
+    warm_client, auth_headers, assert_max_queries, count
+):
+    _create_single_invoices(warm_client, auth_headers, "QS", count)
+    with assert_max_queries(STATUS_QUERY_BUDGET):
+        response = warm_client.post(
+            "/tasks/status/singleInvoice",
+            json=[
+                {"my_company_idno": "123", "seria": "QS", "number": str(number)}
+                for number in range(count)
+            ],
+            headers=auth_headers,
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_update_tasks_status_queries(
+    warm_client, auth_headers, assert_max_queries, count
+):
+    tasks_uuid = _create_single_invoices(warm_client, auth_headers, "QU", count)
+    with assert_max_queries(STATUS_UPDATE_BUDGET):
+        response = warm_client.put(
+            "/tasks/status",
+            json=[
+                {"task_uuid": task_uuid, "status": "COMPLETED"}
+                for task_uuid in tasks_uuid
+            ],
+            headers=auth_headers,
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_machine_tasks_queries(warm_client, auth_headers, assert_max_queries, count):
+    _create_single_invoices(warm_client, auth_headers, "QM", count)
+    with assert_max_queries(MACHINE_TASKS_BUDGET):
+        response = warm_client.get("/machine/tasks", headers=auth_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_claim_tasks_queries(warm_client, auth_headers, assert_max_queries, count):
+    _create_single_invoices(warm_client, auth_headers, "QC", count)
+    with assert_max_queries(MACHINE_CLAIM_BUDGET):
+        response = warm_client.post("/machine/tasks/claim", headers=auth_headers)
+    assert response.status_code == 200
@@ -0,0 +1,94 @@
+import datetime
+from uuid import uuid4
+import pytest
+from domain.company.models import CompanyModel
+from infrastructure.rate_limit.company_rate_limiter import (
+    InMemoryRateLimitStore,
+    RateLimitBudget,
+)
+
+
+@pytest.fixture
+def limited_client(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main.rate_limiter, "store", InMemoryRateLimitStore())
+    monkeypatch.setattr(
+        main.rate_limiter,
+        "budgets",
+        {
+            main.RATE_LIMIT_WRITE: RateLimitBudget(rate=0.01, burst=1),
+            main.RATE_LIMIT_STATUS: RateLimitBudget(rate=0.01, burst=1),
+            main.RATE_LIMIT_MACHINE: RateLimitBudget(rate=0.01, burst=2),
+        },
+    )
+    return client
+
+
+def test_machine_polling_over_budget_gets_429(limited_client, auth_headers):
+    # Act
+    responses = [
+        limited_client.get("/machine/tasks", headers=auth_headers) for _ in range(3)
+    ]
+
+    # Assert
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].json() == {
+        "message": "Too many requests",
+        "code": "RATE_LIMITED",
+        "budget": "machine",
+    }
+    assert 1 <= int(responses[2].headers["Retry-After"]) <= 100
+
+
+def test_budgets_are_separate_per_kind_of_request(limited_client, auth_headers):
+    # Arrange
+    for _ in range(2):
+        limited_client.post("/machine/tasks/claim", headers=auth_headers)
+
+    # Act
+    status_response = limited_client.post(
+        "/tasks/status/singleInvoice", json=[], headers=auth_headers
+    )
+    second_status_response = limited_client.post(
+        "/tasks/status/singleInvoice", json=[], headers=auth_headers
+    )
+    machine_response = limited_client.put(
+        "/tasks/status", json=[], headers=auth_headers
+    )
+
+    # Assert
+    assert status_response.status_code != 429
+    assert second_status_response.status_code == 429
+    assert machine_response.status_code == 429
+
+
+def test_other_companies_keep_their_budget(limited_client, auth_headers, db_session):
+    # Arrange
+    other_company = CompanyModel(
+        company_uuid=uuid4(),
+        name="Other Company_" + str(uuid4()),
+        auth_token=str(uuid4()),
+        created_at=datetime.datetime.now(),
+    )
+    db_session.add(other_company)
+    db_session.flush()
+    for _ in range(3):
+        limited_client.get("/machine/tasks", headers=auth_headers)
+
+    # Act
+    response = limited_client.get(
+        "/machine/tasks",
+        headers={"Authorization": f"Bearer {other_company.auth_token}"},
+    )
+
+    # Assert
+    assert response.status_code == 200
+
+
+def test_unauthenticated_requests_are_rejected_before_the_budget(limited_client):
+    response = limited_client.get(
+        "/machine/tasks", headers={"Authorization": "Bearer unknown"}
+    )
+
+    assert response.status_code == 401
@@ -0,0 +1,38 @@
+def test_large_machine_tasks_response_is_gzipped(client, auth_headers):
+    # Arrange
+    create_response = client.post(
+        "/tasks/buyer/sign_single_invoice",
+        json={
+            "action_type": "BuyerSignInvoice",
+            "invoices": [
+                {
+                    "my_company_idno": "123",
+                    "person_name_certificate": "Person",
+                    "seria": "GZ",
+                    "number": str(number),
+                }
+                for number in range(50)
+            ],
+        },
+        headers=auth_headers,
+    )
+
+    # Act
+    response = client.get(
+        "/machine/tasks", headers={**auth_headers, "Accept-Encoding": "gzip"}
+    )
+
+    # Assert
+    assert create_response.status_code == 200
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["SingleInvoiceTask"]["Person"]["123"]) == 50
+
+
+def test_small_response_is_not_gzipped(client, auth_headers):
+    response = client.get(
+        "/machine/tasks", headers={**auth_headers, "Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,90 @@
+import json
+
+
+def _ndjson_invoice(number, seria="IM"):
+    return json.dumps(
+        {
+            "my_company_idno": "123",
+            "person_name_certificate": "Person",
+            "seria": seria,
+            "number": str(number),
+        }
+    )
+
+
+def _import(client, auth_headers, body, content_type="application/x-ndjson"):
+    response = client.post(
+        "/tasks/buyer/sign_single_invoice/import",
+        content=body,
+        headers={**auth_headers, "Content-Type": content_type},
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_import_reports_every_line(client, auth_headers, monkeypatch):
+    # Arrange
+    monkeypatch.setattr("config.Config.IMPORT_CHUNK_SIZE", 2)
+    body = "\n".join(
+        [
+            _ndjson_invoice(1),
+            _ndjson_invoice(2),
+            "not json",
+            _ndjson_invoice(3),
+            _ndjson_invoice(3),
+            _ndjson_invoice(1),
+        ]
+    )
+
+    # Act
+    results = _import(client, auth_headers, body)
+
+    # Assert
+    by_line = {result["line"]: result for result in results if "line" in result}
+    assert {line: result["status"] for line, result in by_line.items()} == {
+        1: "created",
+        2: "created",
+        3: "invalid",
+        4: "created",
+        5: "duplicate",
+        6: "exists",
+    }
+    assert results[-1] == {
+        "summary": {"created": 3, "invalid": 1, "duplicate": 1, "exists": 1}
+    }
+
+
+def test_csv_import_creates_machine_tasks(client, auth_headers):
+    # Arrange
+    body = "my_company_idno,person_name_certificate,seria,number\n" + "".join(
+        f"123,Person,CSV,{number}\n" for number in range(5)
+    )
+
+    # Act
+    results = _import(client, auth_headers, body, content_type="text/csv")
+
+    # Assert
+    assert results[-1] == {"summary": {"created": 5}}
+    machine_tasks = client.get("/machine/tasks", headers=auth_headers).json()
+    assert len(machine_tasks["SingleInvoiceTask"]["Person"]["123"]) == 5
+    assert {result["task_uuid"] for result in results[:-1]} == {
+        task["task_uuid"]
+        for task in machine_tasks["SingleInvoiceTask"]["Person"]["123"]
+    }
+
+
+def test_import_numbers_with_leading_zeros_are_duplicates(client, auth_headers):
+    # Arrange
+    body = "\n".join(
+        _ndjson_invoice(number, seria="LZ") for number in ("7", "007", "8")
+    )
+
+    # Act
+    results = _import(client, auth_headers, body)
+
+    # Assert
+    assert [result["status"] for result in results[:-1]] == [
+        "created",
+        "duplicate",
+        "created",
+    ]
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import pytest
+import main
+from domain.company.company import Company
+from domain.task.schemas import (
+    SingleInvoiceAction,
+    SingleInvoiceData,
+    TaskStatusUpdateByUUIDRequest,
+)
+from infrastructure.persistence.database_session import ThreadpoolDatabaseSession
+from infrastructure.persistence.sqlalchemy_task_repository import (
+    SQLAlchemyTaskRepository,
+)
+
+
+@pytest.fixture
+def company(test_company):
+    return Company(
+        name=test_company.name,
+        auth_token=test_company.auth_token,
+        company_uuid=test_company.company_uuid,
+    )
+
+
+def _collect_events(company, db_session, last_event_id, count):
+    async def collect():
+        stream = main._stream_task_status_events(
+            company, ThreadpoolDatabaseSession(db_session), last_event_id, 0.05
+        )
+        chunks = []
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if len(chunks) == count:
+                    break
+        finally:
+            await stream.aclose()
+        return chunks
+
+    return asyncio.run(collect())
+
+
+def test_stream_resumes_after_last_event_id(db_session, company, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = repository.create_single_invoice_tasks(
+        company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="SSE",
+                number=str(number),
+            )
+            for number in range(2)
+        ],
+    )
+    last_event_id = repository.get_task_status_event_cursor(company.company_uuid)[1]
+    repository.update_tasks_status(
+        [
+            TaskStatusUpdateByUUIDRequest(task_uuid=task_uuid, status="COMPLETED")
+            for task_uuid in tasks_uuid
+        ]
+    )
+
+    # Act
+    retry, first, second, keepalive = _collect_events(
+        company, db_session, last_event_id, 4
+    )
+
+    # Assert
+    assert retry.startswith("retry:")
+    first_lines = first.strip().split("\n")
+    second_lines = second.strip().split("\n")
+    assert first_lines[0] == f"id: {last_event_id + 1}"
+    assert second_lines[0] == f"id: {last_event_id + 2}"
+    assert first_lines[1] == second_lines[1] == "event: task_status"
+    events = [
+        json.loads(lines[2][len("data: ") :]) for lines in (first_lines, second_lines)
+    ]
+    assert {event["task_uuid"] for event in events} == {
+        str(task_uuid) for task_uuid in tasks_uuid
+    }
+    assert all(event["status"] == "COMPLETED" for event in events)
+    assert keepalive == ": keep-alive\n\n"
+
+
+def test_stream_without_last_event_id_skips_history(db_session, company, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    repository = SQLAlchemyTaskRepository(db_session)
+    tasks_uuid = repository.create_single_invoice_tasks(
+        company.company_uuid,
+        SingleInvoiceAction.BUYER_SIGN_INVOICE.value,
+        [
+            SingleInvoiceData(
+                my_company_idno="123",
+                person_name_certificate="Person",
+                seria="SSE",
+                number="9",
+            )
+        ],
+    )
+    repository.update_tasks_status(
+        [TaskStatusUpdateByUUIDRequest(task_uuid=tasks_uuid[0], status="FAILED")]
+    )
+
+    # Act
+    _, keepalive = _collect_events(company, db_session, None, 2)
+
+    # Assert
+    assert keepalive == ": keep-alive\n\n"